@@ -0,0 +1,173 @@
+import subprocess
+import threading
+
+import numpy as np
+from whisper.audio import SAMPLE_RATE, load_audio
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError
+
+from .retries import download_retrying
+
+# YouTube throttles long un-ranged responses, so audio is fetched in ranges like yt-dlp does
+STREAM_CHUNK_SIZE = 10 * 1024 * 1024
+READ_SIZE = 64 * 1024
+STREAMABLE_PROTOCOLS = {"http", "https"}
+
+
+def decode_audio(chunks, sr=SAMPLE_RATE):
+    """
+    Decode compressed audio bytes to a mono float32 waveform without touching disk.
+
+    The bytes are piped into ffmpeg's stdin while its 16-bit PCM output is read
+    from stdout, so download and decoding overlap.
+
+    Args:
+        chunks (iterable): Iterable of bytes objects with the encoded audio
+        sr (int): Target sample rate (default: Whisper's 16 kHz)
+
+    Returns:
+        np.ndarray: Waveform in float32, as expected by Whisper's transcribe()
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the stream
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "pipe:1",
+    ]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    feed_errors = []
+    stderr = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg exited early; its exit code and stderr explain why
+            pass
+        except Exception as error:
+            feed_errors.append(error)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed, name="audio-feed", daemon=True)
+    reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+    feeder.start()
+    reader.start()
+
+    try:
+        pcm = process.stdout.read()
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        returncode = process.wait()
+        feeder.join()
+        reader.join()
+
+    if feed_errors:
+        raise feed_errors[0]
+    if returncode != 0:
+        raise RuntimeError(f"Failed to decode audio stream: {b''.join(stderr).decode(errors='replace')}")
+
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def stream_audio(ydl, info, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield the bytes of the selected audio format using ranged HTTP requests.
+
+    A range that fails with a transient error is requested again from the
+    first byte not yet yielded, so an interrupted transfer resumes instead of
+    starting over.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): The YoutubeDL instance that extracted `info`
+        info (dict): Info dict from extract_info(download=False) with a selected format
+        chunk_size (int): Bytes requested per range
+
+    Yields:
+        bytes: Consecutive pieces of the encoded audio
+    """
+    headers = info.get("http_headers") or {}
+    filesize = info.get("filesize")
+    position = 0
+
+    while filesize is None or position < filesize:
+        range_end = position + chunk_size
+        for attempt in download_retrying():
+            with attempt:
+                request = Request(info["url"], headers={**headers, "Range": f"bytes={position}-{range_end - 1}"})
+                try:
+                    response = ydl.urlopen(request)
+                except HTTPError as error:
+                    if error.status == 416 and position > 0:
+                        return  # Requested past the end of a file with unknown size
+                    raise
+
+                with response:
+                    while True:
+                        data = response.read(READ_SIZE)
+                        if not data:
+                            break
+                        position += len(data)
+                        yield data
+
+        if position < range_end:
+            return
+
+
+def is_streamable(info):
+    return info.get("protocol") in STREAMABLE_PROTOCOLS and bool(info.get("url"))
+
+
+def report_progress(chunks, total_bytes, progress_hook):
+    """
+    Pass chunks through while reporting the bytes seen so far to a yt-dlp style progress hook.
+    """
+    downloaded = 0
+    for chunk in chunks:
+        downloaded += len(chunk)
+        progress_hook({"status": "downloading", "downloaded_bytes": downloaded, "total_bytes": total_bytes})
+        yield chunk
+    progress_hook({"status": "finished", "downloaded_bytes": downloaded, "total_bytes": total_bytes or downloaded})
+
+
+def load_audio_from_info(ydl, info, progress_hook=None):
+    """
+    Fetch and decode the audio described by an extract_info(download=False) result.
+
+    Plain HTTP(S) formats are streamed straight into ffmpeg. Fragmented or
+    other protocols fall back to yt-dlp's downloader, which writes into the
+    scratch directory configured in the YoutubeDL `outtmpl`.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): The YoutubeDL instance that extracted `info`
+        info (dict): Info dict with a selected format
+        progress_hook (callable): Optional yt-dlp progress hook, called for both paths
+
+    Returns:
+        np.ndarray: Waveform in float32 at 16 kHz
+    """
+    if is_streamable(info):
+        chunks = stream_audio(ydl, info)
+        if progress_hook:
+            chunks = report_progress(chunks, info.get("filesize") or info.get("filesize_approx"), progress_hook)
+        return decode_audio(chunks)
+
+    if progress_hook:
+        ydl.add_progress_hook(progress_hook)
+    ydl.process_info(info)  # Downloads in place and records the final path
+    return load_audio(info.get("filepath") or ydl.prepare_filename(info))
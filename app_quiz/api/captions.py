@@ -0,0 +1,174 @@
+import html
+import re
+import xml.etree.ElementTree as ElementTree
+
+from django.conf import settings
+from yt_dlp.networking.exceptions import RequestError
+
+CAPTION_FORMATS = ("vtt", "srv3", "srv2", "srv1")
+VTT_TIMING = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})\s+-->\s+(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})")
+VTT_TAG = re.compile(r"<[^>]+>")
+ANNOTATION = re.compile(r"\[[^\]]*\]|\([^)]*\)|♪+")
+WORD = re.compile(r"\w+")
+
+
+def _vtt_seconds(hours, minutes, seconds, millis):
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+def parse_vtt(content):
+    """
+    Parse a WebVTT caption file into segments.
+
+    YouTube's automatic captions repeat the previous line in every cue to get a
+    rolling display; such repeated lines are emitted only once.
+
+    Returns:
+        list: Segments as dicts with start, end and text
+    """
+    segments = []
+    previous_lines = []
+    for block in re.split(r"\n\s*\n", content.replace("\r\n", "\n")):
+        lines = block.strip().split("\n")
+        for index, line in enumerate(lines):
+            timing = VTT_TIMING.search(line)
+            if timing:
+                break
+        else:
+            continue
+
+        start = _vtt_seconds(*timing.groups()[:4])
+        end = _vtt_seconds(*timing.groups()[4:])
+        cue_lines = [html.unescape(VTT_TAG.sub("", line)).strip() for line in lines[index + 1:]]
+        cue_lines = [line for line in cue_lines if line]
+
+        new_lines = [line for line in cue_lines if line not in previous_lines]
+        previous_lines = cue_lines
+        if new_lines:
+            segments.append({"start": start, "end": end, "text": " ".join(new_lines)})
+    return segments
+
+
+def parse_srv(content):
+    """
+    Parse YouTube's srv1/srv2/srv3 XML caption formats into segments.
+
+    Returns:
+        list: Segments as dicts with start, end and text
+    """
+    root = ElementTree.fromstring(content)
+    segments = []
+    for element in root.iter():
+        if element.tag == "text":  # srv1: seconds
+            start = float(element.get("start", 0))
+            end = start + float(element.get("dur", 0))
+        elif element.tag == "p":  # srv2/srv3: milliseconds
+            start = int(element.get("t", 0)) / 1000
+            end = start + int(element.get("d", 0)) / 1000
+        else:
+            continue
+        text = html.unescape("".join(element.itertext())).strip()
+        if text:
+            segments.append({"start": start, "end": end, "text": " ".join(text.split())})
+    return segments
+
+
+def _find_track(tracks, languages):
+    for language in languages:
+        formats = tracks.get(language)
+        if not formats:
+            continue
+        for ext in CAPTION_FORMATS:
+            for caption_format in formats:
+                if caption_format.get("ext") == ext and caption_format.get("url"):
+                    return language, caption_format
+    return None, None
+
+
+def select_caption_track(info, language=None):
+    """
+    Choose the caption track to use instead of running Whisper.
+
+    Creator-uploaded subtitles are preferred. Automatic captions are only used in
+    the video's original language (never YouTube's machine translations) and
+    only when settings.CAPTIONS_ALLOW_AUTOMATIC is enabled.
+
+    Args:
+        info (dict): yt-dlp info dict from extract_info(download=False)
+        language (str): Requested language, None to use the video's language
+
+    Returns:
+        dict: {"language", "kind", "ext", "url"} or None when no track is acceptable
+    """
+    language = language or info.get("language")
+    manual = info.get("subtitles") or {}
+
+    if language:
+        candidates = [language] + sorted(key for key in manual if key.split("-")[0] == language)
+    else:
+        # Without a known spoken language, only an unambiguous manual track is safe
+        candidates = list(manual) if len(manual) == 1 else []
+
+    found_language, track = _find_track(manual, candidates)
+    kind = "manual"
+
+    if track is None and language and settings.CAPTIONS_ALLOW_AUTOMATIC:
+        automatic = info.get("automatic_captions") or {}
+        found_language, track = _find_track(automatic, [f"{language}-orig", language])
+        kind = "automatic"
+
+    if track is None:
+        return None
+    return {"language": found_language, "kind": kind, "ext": track["ext"], "url": track["url"]}
+
+
+def caption_quality_ok(segments, duration):
+    """
+    Quality policy for caption tracks.
+
+    Rejects tracks that are mostly annotations such as [Music] or whose speech
+    density is below settings.CAPTIONS_MIN_WORDS_PER_MINUTE, which usually means
+    the captions only cover part of the video.
+    """
+    words = sum(len(WORD.findall(ANNOTATION.sub("", segment["text"]))) for segment in segments)
+    if not words:
+        return False
+    if not duration:
+        return True
+    return words / (duration / 60) >= settings.CAPTIONS_MIN_WORDS_PER_MINUTE
+
+
+def fetch_caption_transcript(ydl, info, language=None):
+    """
+    Download and parse an acceptable caption track for the video.
+
+    Args:
+        ydl (yt_dlp.YoutubeDL): YoutubeDL instance used for the request
+        info (dict): yt-dlp info dict from extract_info(download=False)
+        language (str): Requested language, None to use the video's language
+
+    Returns:
+        tuple: (segments, track) or (None, None) when Whisper has to be used
+    """
+    track = select_caption_track(info, language)
+    if track is None:
+        return None, None
+
+    try:
+        with ydl.urlopen(track["url"]) as response:
+            content = response.read().decode("utf-8", errors="replace")
+        segments = parse_vtt(content) if track["ext"] == "vtt" else parse_srv(content)
+    except (RequestError, ElementTree.ParseError):
+        # Captions are only a shortcut; any problem means falling back to Whisper
+        return None, None
+
+    if not caption_quality_ok(segments, info.get("duration")):
+        return None, None
+    return segments, track
+
+
+def segments_to_text(segments):
+    """
+    Join caption segments into plain transcript text without annotations.
+    """
+    return " ".join(" ".join(ANNOTATION.sub("", segment["text"]) for segment in segments).split())
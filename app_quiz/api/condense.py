@@ -0,0 +1,161 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+
+from .tokens import count_tokens, split_sentences
+
+# Pure hesitation sounds; words that can carry meaning ("like", "so", "er" in German) are left alone
+FILLER_PATTERN = re.compile(r"(?<!\w)(?:u+h+m*|u+m+|e+r+m+|h+m+|m+h+m+|ä+h+m*|ö+h+m*)(?!\w),?\s*", re.IGNORECASE)
+# "the the the": one word stuttered at least three times; "had had" and German "die die" are grammatical
+STUTTER_PATTERN = re.compile(r"\b([^\W\d]+)(?:[\s,]+\1\b){2,}", re.IGNORECASE)
+# "I think I think": a run of two to four words said again right away; numbers are never touched
+REPETITION_PATTERN = re.compile(r"\b([^\W\d]+(?:\s+[^\W\d]+){1,3})(?:[\s,]+\1\b)+", re.IGNORECASE)
+# Ad reads and channel housekeeping; kept narrow so topics like "subscribing to a feed" survive
+SPONSOR_PATTERN = re.compile(
+    r"\b(?:sponsored by|(?:today's|our|this video's) sponsor|promo code|discount code|use (?:my )?code|"
+    r"links? in the description|subscribe to (?:the|my|our|this) channel|hit the bell|patreon)\b",
+    re.IGNORECASE,
+)
+WORD_PATTERN = re.compile(r"\w+")
+# Longer "sentences" (unpunctuated automatic captions) are ranked and filtered as runs of this many words
+MAX_SENTENCE_WORDS = 30
+# Sentences sharing this much of their word pairs with a recent one count as repeated
+NEAR_DUPLICATE_SIMILARITY = 0.8
+NEAR_DUPLICATE_WINDOW = 50
+
+
+def remove_disfluencies(sentence):
+    """
+    Remove hesitation sounds and immediately repeated words or phrases.
+    """
+    sentence = FILLER_PATTERN.sub("", sentence)
+    sentence = STUTTER_PATTERN.sub(r"\1", sentence)
+    sentence = REPETITION_PATTERN.sub(_collapse_repetition, sentence)
+    sentence = re.sub(r"\s+([,.!?])", r"\1", sentence)
+    return re.sub(r"\s{2,}", " ", sentence).strip(" ,")
+
+
+def _collapse_repetition(match):
+    # Repeated names are usually meant: "New York, New York"
+    if all(word[0].isupper() for word in match.group(1).split()):
+        return match.group(0)
+    return match.group(1)
+
+
+def split_pieces(transcript):
+    """
+    Split a transcript into sentences, cutting sentences over MAX_SENTENCE_WORDS words into word runs.
+    """
+    pieces = []
+    for sentence in split_sentences(transcript):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            pieces.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return pieces
+
+
+def _shingles(words):
+    return set(zip(words, words[1:])) or set(words)
+
+
+def drop_repeated_sentences(sentences):
+    """
+    Drop sentences that repeat an earlier one exactly or nearly.
+
+    Exact repeats are found anywhere in the transcript; near-duplicates
+    (NEAR_DUPLICATE_SIMILARITY of their word pairs in common) only among the
+    last NEAR_DUPLICATE_WINDOW kept sentences, which is where Whisper's
+    repetition loops and recaps occur, so long transcripts stay linear.
+    """
+    kept, seen, recent = [], set(), []
+    for sentence in sentences:
+        words = WORD_PATTERN.findall(sentence.lower())
+        if not words:
+            continue
+        key = " ".join(words)
+        if key in seen:
+            continue
+        shingles = _shingles(words)
+        if any(len(shingles & other) / len(shingles | other) >= NEAR_DUPLICATE_SIMILARITY for other in recent):
+            continue
+        seen.add(key)
+        recent = [*recent[-(NEAR_DUPLICATE_WINDOW - 1):], shingles]
+        kept.append(sentence)
+    return kept
+
+
+def rank_sentences(sentences):
+    """
+    Score sentences by salience, highest first.
+
+    Topic words recur across several sentences without being everywhere: a
+    word occurring in df of n sentences weighs log(df) * log(n / df), which is
+    zero for words said once and for words in every sentence. That needs no
+    stop-word list and so works for any language. A sentence scores the
+    weights of its distinct words, damped by the square root of its length.
+
+    Returns:
+        list: Sentence indexes ordered from most to least salient
+    """
+    words = [WORD_PATTERN.findall(sentence.lower()) for sentence in sentences]
+    document_frequency = Counter(word for sentence_words in words for word in set(sentence_words))
+    total = len(sentences)
+
+    def score(index):
+        distinct = set(words[index])
+        if not distinct:
+            return 0.0
+        weight = sum(
+            math.log(document_frequency[word]) * math.log(total / document_frequency[word]) for word in distinct
+        )
+        return weight / math.sqrt(len(words[index]))
+
+    return sorted(range(total), key=lambda index: (-score(index), index))
+
+
+def condense_transcript(transcript, token_budget=None):
+    """
+    Shorten a transcript before it is sent to the LLM.
+
+    The transcript is split into sentences, or word runs where it has no
+    punctuation (see split_pieces). Hesitations, stuttered repetitions,
+    repeated pieces and sponsor reads are removed. If the rest is still over
+    `token_budget` tokens
+    (settings.QUIZ_CONDENSE_TOKEN_BUDGET by default, where None means no
+    limit), the most salient sentences (see rank_sentences) that fit are
+    kept, in their original order.
+
+    Args:
+        transcript (str): The transcript
+        token_budget (int): Maximum tokens of the result
+
+    Returns:
+        tuple: (condensed_text, stats) with stats holding input_tokens,
+        output_tokens and dropped_sentences (pieces left out of the result)
+    """
+    token_budget = settings.QUIZ_CONDENSE_TOKEN_BUDGET if token_budget is None else token_budget
+    pieces = split_pieces(transcript)
+    cleaned = [remove_disfluencies(piece) for piece in pieces if not SPONSOR_PATTERN.search(piece)]
+    cleaned = drop_repeated_sentences(cleaned)
+
+    tokens = [count_tokens(sentence) for sentence in cleaned]
+    if token_budget and sum(tokens) > token_budget:
+        chosen, used = set(), 0
+        for index in rank_sentences(cleaned):
+            if used + tokens[index] <= token_budget:
+                chosen.add(index)
+                used += tokens[index]
+        cleaned = [sentence for index, sentence in enumerate(cleaned) if index in chosen]
+
+    # Never hand an empty transcript on; the model can still make sense of the raw one
+    if not cleaned:
+        text, dropped = transcript, 0
+    else:
+        text, dropped = " ".join(cleaned), len(pieces) - len(cleaned)
+    return text, {
+        "input_tokens": count_tokens(transcript),
+        "output_tokens": count_tokens(text),
+        "dropped_sentences": dropped,
+    }
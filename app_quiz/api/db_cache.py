@@ -0,0 +1,85 @@
+import threading
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+
+class DatabaseCache:
+    """
+    Persistent cache backed by a model table.
+
+    Subclasses set `model`, the `value_fields` loaded on a hit and the key
+    built by `_key`, and wrap get/put with their own signatures. The model
+    needs `created_at`, `last_used_at` and `hits` fields. Entries older than
+    `max_age` seconds are treated as misses and removed; subclasses extend
+    `evict` for any other eviction policy. Hit and miss counts are kept per
+    process.
+    """
+
+    model = None
+    value_fields = ()
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        """
+        Look up an entry by its key fields and record the hit or miss.
+
+        Returns:
+            Model: The entry with `value_fields` loaded, or None on a miss
+        """
+        entry = self.model.objects.filter(**key).only("pk", "created_at", *self.value_fields).first()
+
+        if entry is not None and self._is_expired(entry):
+            entry.delete()
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        self.model.objects.filter(pk=entry.pk).update(last_used_at=timezone.now(), hits=F("hits") + 1)
+        return entry
+
+    def _put(self, key, values):
+        """
+        Store an entry under its key fields and evict what is over the limits.
+        """
+        try:
+            self.model.objects.update_or_create(defaults={**values, "last_used_at": timezone.now()}, **key)
+        except IntegrityError:
+            # Another worker stored the same entry concurrently
+            pass
+        self.evict()
+
+    def evict(self):
+        """
+        Remove expired entries.
+
+        Returns:
+            int: Number of removed entries
+        """
+        if not self.max_age:
+            return 0
+        cutoff = timezone.now() - timedelta(seconds=self.max_age)
+        return self.model.objects.filter(created_at__lt=cutoff).delete()[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _is_expired(self, entry):
+        return bool(self.max_age) and entry.created_at < timezone.now() - timedelta(seconds=self.max_age)
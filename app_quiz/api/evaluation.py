@@ -0,0 +1,38 @@
+import re
+
+WORD = re.compile(r"[\w']+")
+
+
+def normalize_words(text):
+    """
+    Split text into lowercase words without punctuation, for scoring transcripts.
+    """
+    return WORD.findall(text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word error rate of `hypothesis` against `reference`.
+
+    Computed as the word-level edit distance (substitutions, insertions and
+    deletions) divided by the number of reference words.
+
+    Returns:
+        float: 0.0 for a perfect match; can exceed 1.0 for long hypotheses
+    """
+    reference = normalize_words(reference)
+    hypothesis = normalize_words(hypothesis)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / len(reference)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from ..models import QuizGenerationJob, QuizJobEvent
+from .scheduler import FINISHED_STATUSES
+
+
+def authenticate_jwt(request):
+    """
+    Resolve the user of a plain Django request from its JWT access token.
+
+    The token is read from the Authorization header or, since browsers'
+    EventSource cannot send headers, from the access_token cookie set at login.
+
+    Returns:
+        User: The authenticated user, or None
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else request.COOKIES.get("access_token")
+    if not raw_token:
+        return None
+    try:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def format_event(event):
+    return f"id: {event.pk}\nevent: {event.kind}\ndata: {json.dumps(event.data)}\n\n"
+
+
+async def stream_job_events(job_id, last_event_id=0):
+    """
+    Yield the job's events as Server-Sent Events until the job is done or failed.
+
+    Events are read from the database, so the stream works no matter which
+    process runs the job. Events after `last_event_id` are replayed first, which
+    lets reconnecting clients continue where they left off.
+    """
+    yield "retry: 2000\n\n"  # Reconnect delay in milliseconds
+    idle_seconds = 0.0
+
+    while True:
+        events = [
+            event async for event in QuizJobEvent.objects.filter(job_id=job_id, pk__gt=last_event_id).order_by("pk")
+        ]
+        for event in events:
+            last_event_id = event.pk
+            yield format_event(event)
+            if event.kind == "status" and event.data.get("status") in FINISHED_STATUSES:
+                return
+
+        if events:
+            idle_seconds = 0.0
+        elif await QuizGenerationJob.objects.filter(pk=job_id, status__in=FINISHED_STATUSES).aexists():
+            # Finished before this client (re)connected and nothing is left to send
+            return
+
+        await asyncio.sleep(settings.QUIZ_EVENTS_POLL_SECONDS)
+        idle_seconds += settings.QUIZ_EVENTS_POLL_SECONDS
+        if idle_seconds >= settings.QUIZ_EVENTS_HEARTBEAT_SECONDS:
+            idle_seconds = 0.0
+            yield ": keep-alive\n\n"
+
+
+@require_GET
+async def job_events(request, pk):
+    """
+    Stream download progress, status changes and transcript segments of a job (text/event-stream).
+    """
+    user = await sync_to_async(authenticate_jwt)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    if not await QuizGenerationJob.objects.filter(pk=pk, owner=user).aexists():
+        return JsonResponse({"detail": "No QuizGenerationJob matches the given query."}, status=404)
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        last_event_id = 0
+
+    response = StreamingHttpResponse(stream_job_events(pk, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Tell nginx not to buffer the stream
+    return response
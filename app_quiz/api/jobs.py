@@ -0,0 +1,555 @@
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from ..models import QuizGenerationJob, QuizJobEvent
+from .condense import condense_transcript
+from .metrics import JOBS_FINISHED
+from .persistence import save_generated_quiz
+from .questions import generate_questions
+from .scheduler import FINISHED_STATUSES, claim_next_job
+from .utils import TranscriptionCancelled, download_and_transcribe
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# In-process mode: claimers submitted to the executor that have not returned yet
+_claimers = 0
+_claimers_lock = threading.Lock()
+_dispatcher = None
+
+# Stages that only feed the live event stream and are not kept in job.stats
+EVENT_STAGES = {"download", "segment"}
+
+# How often a process looks for events of finished jobs to delete
+EVENT_CLEANUP_INTERVAL_SECONDS = 60
+_events_cleaned_at = None
+_events_cleaned_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process-wide executor running quiz generation jobs.
+
+    The pool is bounded by settings.QUIZ_JOB_MAX_WORKERS so that long
+    downloads and transcriptions never take over the web workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_JOB_MAX_WORKERS,
+                thread_name_prefix="quiz-job",
+            )
+    return _executor
+
+
+def enqueue_job(job):
+    """
+    Schedule a job for background processing once the current transaction commits.
+
+    Jobs are not run in submission order: each free worker asks the scheduler
+    for the next job (see scheduler.claim_next_job), so short jobs and users
+    waiting for their turn go first. With settings.QUIZ_RUN_JOBS_IN_PROCESS
+    disabled nothing runs here; `manage.py run_quiz_workers` picks the job up.
+    """
+    if settings.QUIZ_RUN_JOBS_IN_PROCESS:
+        transaction.on_commit(_submit_claimer)
+
+
+def _submit_claimer():
+    global _claimers
+    with _claimers_lock:
+        _claimers += 1
+    get_executor().submit(_run_next_in_worker)
+
+
+def _run_next_in_worker():
+    global _claimers
+    try:
+        run_next_job()
+    finally:
+        with _claimers_lock:
+            _claimers -= 1
+        # Worker threads get their own DB connection; don't leak it between jobs
+        connection.close()
+
+
+def dispatch_queued_jobs():
+    """
+    Requeue jobs with expired leases and start a claimer for each queued job this process has room for.
+
+    In in-process mode every submission starts one claimer, which is lost
+    when the web process restarts. Dispatching again picks up the jobs queued
+    before the restart and those whose lease expired, without waiting for
+    new submissions.
+
+    Returns:
+        int: Number of claimers started
+    """
+    requeue_expired_leases()
+    queued = QuizGenerationJob.objects.filter(status=QuizGenerationJob.Status.QUEUED).count()
+    with _claimers_lock:
+        free = settings.QUIZ_JOB_MAX_WORKERS - _claimers
+    started = max(0, min(queued, free))
+    for _ in range(started):
+        _submit_claimer()
+    return started
+
+
+def start_job_dispatcher():
+    """
+    Start the thread calling dispatch_queued_jobs every settings.QUIZ_JOB_DISPATCH_SECONDS.
+
+    Called when a web process loads its WSGI or ASGI application; does
+    nothing when settings.QUIZ_RUN_JOBS_IN_PROCESS is off (run_quiz_workers
+    polls the queue itself) or the thread is already running.
+    """
+    global _dispatcher
+    if not settings.QUIZ_RUN_JOBS_IN_PROCESS:
+        return
+    with _claimers_lock:
+        if _dispatcher is not None and _dispatcher.is_alive():
+            return
+        _dispatcher = threading.Thread(target=_dispatch_forever, name="quiz-job-dispatcher", daemon=True)
+        _dispatcher.start()
+
+
+def _dispatch_forever():
+    while True:
+        try:
+            dispatch_queued_jobs()
+        except Exception:
+            # E.g. the database was locked or not migrated yet; try again on the next round
+            logger.exception("Could not dispatch queued quiz generation jobs")
+        finally:
+            connection.close()
+        time.sleep(settings.QUIZ_JOB_DISPATCH_SECONDS)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_next_job(worker=None):
+    """
+    Requeue jobs with expired leases, then claim the next queued job and run it.
+
+    Args:
+        worker (str): Identity recorded on the claimed job (default: host, pid and thread)
+
+    Returns:
+        int: Primary key of the job that ran, or None when the queue was empty
+    """
+    requeue_expired_leases()
+    delete_expired_events()
+    job_id = claim_next_job(worker or worker_name())
+    if job_id is not None:
+        run_job(job_id)
+    return job_id
+
+
+def run_worker(worker, stop):
+    """
+    Process queued jobs one at a time until `stop` is set.
+
+    Used by the processes of `manage.py run_quiz_workers`; an idle worker
+    checks the queue every settings.QUIZ_WORKER_POLL_SECONDS.
+
+    Args:
+        worker (str): Identity recorded on claimed jobs
+        stop (threading.Event): Set to finish the current job and return
+    """
+    while not stop.is_set():
+        try:
+            job_id = run_next_job(worker)
+        except Exception:
+            # E.g. the database was locked for too long; try again on the next poll
+            logger.exception("Worker %s could not run the next job", worker)
+            job_id = None
+        if job_id is None:
+            connection.close()
+            stop.wait(settings.QUIZ_WORKER_POLL_SECONDS)
+
+
+def requeue_expired_leases():
+    """
+    Put running jobs whose worker stopped renewing the lease back into the queue.
+
+    This happens when a worker process crashed or was killed. The job keeps its
+    checkpoint, so the next worker resumes where the last one stopped.
+
+    Returns:
+        list: Primary keys of the requeued jobs
+    """
+    now = timezone.now()
+    expired = list(
+        QuizGenerationJob.objects.exclude(status__in=FINISHED_STATUSES)
+        .filter(lease_expires_at__lt=now)
+        .values_list("id", flat=True)
+    )
+    requeued = []
+    for job_id in expired:
+        # Conditional on the lease still being expired, in case another worker requeued it first
+        if _requeue_job(job_id, lease_expires_at__lt=now):
+            logger.warning("Lease of job %s expired; queued it again", job_id)
+            requeued.append(job_id)
+    return requeued
+
+
+def _requeue_job(job_id, *conditions, **lookups):
+    """
+    Put an unfinished job back into the queue if it still matches the given filters.
+    """
+    updated = (
+        QuizGenerationJob.objects.filter(*conditions, pk=job_id, **lookups)
+        .exclude(status__in=FINISHED_STATUSES)
+        .update(
+            status=QuizGenerationJob.Status.QUEUED,
+            started_at=None,
+            worker="",
+            lease_expires_at=None,
+            updated_at=timezone.now(),
+        )
+    )
+    if updated:
+        publish_event(job_id, "status", status=QuizGenerationJob.Status.QUEUED, error="")
+    return bool(updated)
+
+
+def find_interrupted_jobs(stale_seconds=None):
+    """
+    Return started jobs that made no progress for settings.QUIZ_JOB_STALE_SECONDS and hold no live lease.
+
+    Such jobs belonged to a worker that died or was restarted, possibly before
+    leases were recorded. Queued jobs that were never started are only
+    waiting for their turn and are left alone.
+    """
+    return QuizGenerationJob.objects.filter(_interrupted(stale_seconds)).exclude(status__in=FINISHED_STATUSES)
+
+
+def _interrupted(stale_seconds):
+    stale_seconds = settings.QUIZ_JOB_STALE_SECONDS if stale_seconds is None else stale_seconds
+    now = timezone.now()
+    return (
+        Q(started_at__isnull=False, updated_at__lt=now - timedelta(seconds=stale_seconds))
+        & (Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now))
+    )
+
+
+def requeue_interrupted_jobs(stale_seconds=None):
+    """
+    Put interrupted jobs (see find_interrupted_jobs) back into the queue.
+
+    They are not run here: a worker claims them like any other queued job and
+    resumes from their checkpoint, so no job ever runs twice at once.
+
+    Returns:
+        list: Primary keys of the requeued jobs
+    """
+    requeued = []
+    for job_id in list(find_interrupted_jobs(stale_seconds).values_list("id", flat=True)):
+        # Conditional on the job still being interrupted, in case its worker came back
+        if _requeue_job(job_id, _interrupted(stale_seconds)):
+            requeued.append(job_id)
+    return requeued
+
+
+def set_job_status(job_id, status, **fields):
+    # A cancelled job keeps its status, whatever its worker reports afterwards
+    updated = (
+        QuizGenerationJob.objects.filter(pk=job_id)
+        .exclude(status=QuizGenerationJob.Status.CANCELLED)
+        .update(status=status, updated_at=timezone.now(), **fields)
+    )
+    if updated:
+        publish_event(job_id, "status", status=status, error=fields.get("error", ""))
+    return bool(updated)
+
+
+def cancel_job(job_id):
+    """
+    Cancel an unfinished job.
+
+    A queued job is never started. A running job's worker notices within
+    settings.QUIZ_CANCEL_POLL_SECONDS (see JobWatcher), stops its
+    download or transcription and removes its scratch files. The job stops
+    counting towards the admission limits right away.
+
+    Returns:
+        bool: False if the job had already finished
+    """
+    now = timezone.now()
+    updated = (
+        QuizGenerationJob.objects.filter(pk=job_id)
+        .exclude(status__in=FINISHED_STATUSES)
+        .update(status=QuizGenerationJob.Status.CANCELLED, finished_at=now, updated_at=now, checkpoint={})
+    )
+    if updated:
+        publish_event(job_id, "status", status=QuizGenerationJob.Status.CANCELLED, error="")
+    return bool(updated)
+
+
+class JobWatcher:
+    """
+    Watch a running job from a background thread: notice cancellation and keep its lease alive.
+
+    Cancellation usually arrives through another process, so the status is
+    polled every settings.QUIZ_CANCEL_POLL_SECONDS. Calling the watcher only
+    reads a flag, which keeps it cheap and safe from any thread, including the
+    ones feeding the download to ffmpeg. The job's lease is extended every
+    third of settings.QUIZ_JOB_LEASE_SECONDS for as long as this process lives.
+
+    Usage:
+        with JobWatcher(job_id) as cancelled:
+            download_and_transcribe(url, cancelled=cancelled)
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._cancelled = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __call__(self):
+        return self._cancelled.is_set()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._watch, name=f"quiz-job-{self.job_id}-cancel", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+        return False
+
+    def _watch(self):
+        lease = timedelta(seconds=settings.QUIZ_JOB_LEASE_SECONDS)
+        renewed = time.monotonic()
+        try:
+            while not self._stopped.wait(settings.QUIZ_CANCEL_POLL_SECONDS):
+                try:
+                    if time.monotonic() - renewed >= lease.total_seconds() / 3:
+                        QuizGenerationJob.objects.filter(pk=self.job_id, lease_expires_at__isnull=False).update(
+                            lease_expires_at=timezone.now() + lease
+                        )
+                        renewed = time.monotonic()
+                    cancelled = QuizGenerationJob.objects.filter(
+                        pk=self.job_id, status=QuizGenerationJob.Status.CANCELLED
+                    ).exists()
+                except DatabaseError as error:
+                    # A busy database must not end the watch; the next poll tries again
+                    logger.warning("Could not check job %s: %s", self.job_id, error)
+                    continue
+                if cancelled:
+                    self._cancelled.set()
+                    return
+        finally:
+            connection.close()
+
+
+def publish_event(job_id, kind, **data):
+    """
+    Record a progress event for clients following the job's event stream.
+    """
+    QuizJobEvent.objects.create(job_id=job_id, kind=kind, data=data)
+
+
+class EventBuffer:
+    """
+    Collect a job's download and segment events and write them together.
+
+    Events are written at most every `interval` seconds: the segments of all
+    Whisper windows in between are merged into one event and only the latest
+    download progress is kept, so a long video takes a few hundred rows (and
+    write locks) instead of one per window and tick. Leaving the context
+    writes what is left.
+
+    Usage:
+        with EventBuffer(job_id, settings.QUIZ_EVENTS_FLUSH_SECONDS) as events:
+            events.add("segment", segments=[...])
+    """
+
+    def __init__(self, job_id, interval):
+        self.job_id = job_id
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._download = None
+        self._segments = []
+        self._flushed_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+        return False
+
+    def add(self, kind, **data):
+        with self._lock:
+            if kind == "segment":
+                self._segments.extend(data["segments"])
+            else:
+                self._download = data
+            due = time.monotonic() - self._flushed_at >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the collected events now, e.g. before a status change that must follow them.
+        """
+        with self._lock:
+            events = []
+            if self._download is not None:
+                events.append(QuizJobEvent(job_id=self.job_id, kind="download", data=self._download))
+            if self._segments:
+                events.append(QuizJobEvent(job_id=self.job_id, kind="segment", data={"segments": self._segments}))
+            self._download, self._segments = None, []
+            self._flushed_at = time.monotonic()
+        if events:
+            QuizJobEvent.objects.bulk_create(events)
+
+
+def delete_expired_events(retention_seconds=None, force=False):
+    """
+    Delete the events of jobs that finished more than settings.QUIZ_EVENTS_RETENTION_SECONDS ago.
+
+    Clients replay a finished job's events only shortly after it ends, so they
+    are not kept forever. Called by every worker before it claims a job, but
+    runs at most every EVENT_CLEANUP_INTERVAL_SECONDS per process unless
+    `force` is set.
+
+    Returns:
+        int: Number of deleted events, None if the cleanup was skipped
+    """
+    global _events_cleaned_at
+    with _events_cleaned_lock:
+        now = time.monotonic()
+        if not force and _events_cleaned_at is not None and now - _events_cleaned_at < EVENT_CLEANUP_INTERVAL_SECONDS:
+            return None
+        _events_cleaned_at = now
+
+    retention_seconds = settings.QUIZ_EVENTS_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+    cutoff = timezone.now() - timedelta(seconds=retention_seconds)
+    deleted, _ = QuizJobEvent.objects.filter(
+        job__status__in=FINISHED_STATUSES, job__finished_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def run_job(job_id):
+    """
+    Download and transcribe a job's video, generate its questions and store the quiz.
+
+    The transcript is condensed (see condense.condense_transcript) before
+    questions are generated from it; the job keeps the full transcript.
+
+    Completed pipeline stages are saved in job.checkpoint as they finish, so
+    running an interrupted job again resumes after its last completed stage.
+    Finished jobs are left alone.
+
+    Args:
+        job_id (int): Primary key of the QuizGenerationJob to process
+    """
+    job = QuizGenerationJob.objects.select_related("owner").get(pk=job_id)
+    if job.status in FINISHED_STATUSES:
+        return
+    stats = dict(job.stats)
+    checkpoint = dict(job.checkpoint)
+    events = EventBuffer(job_id, settings.QUIZ_EVENTS_FLUSH_SECONDS)
+
+    def progress(stage, **info):
+        if stage == "checkpoint":
+            checkpoint.update(info)
+            QuizGenerationJob.objects.filter(pk=job_id).exclude(status=QuizGenerationJob.Status.CANCELLED).update(
+                updated_at=timezone.now(), checkpoint=checkpoint
+            )
+            return
+        if stage in EVENT_STAGES:
+            events.add(stage, **info)
+            return
+
+        events.flush()
+        fields = {}
+        if info:
+            stats.update(info)
+            fields["stats"] = stats
+        if stage in QuizGenerationJob.Status.values:
+            set_job_status(job_id, stage, **fields)
+        elif fields:
+            QuizGenerationJob.objects.filter(pk=job_id).update(updated_at=timezone.now(), **fields)
+
+    try:
+        with JobWatcher(job_id) as cancelled, events:
+            transcript, video_title = download_and_transcribe(
+                job.video_url,
+                model_name=job.model_name or None,
+                progress=progress,
+                checkpoint=dict(checkpoint),
+                cancelled=cancelled,
+            )
+            # No question generation calls for a job cancelled during or after transcription
+            if cancelled():
+                raise TranscriptionCancelled("Job was cancelled.")
+            condensed = transcript
+            if settings.QUIZ_CONDENSE_ENABLED:
+                condensed, condense_stats = condense_transcript(transcript)
+                progress("condense", **{f"condense_{key}": value for key, value in condense_stats.items()})
+            payload = generate_questions(condensed, video_title, progress=progress)
+    except TranscriptionCancelled:
+        logger.info("Quiz generation job %s was cancelled", job_id)
+        JOBS_FINISHED.inc(status=QuizGenerationJob.Status.CANCELLED)
+        return
+    except Exception as error:
+        logger.warning("Quiz generation job %s failed: %s", job_id, error)
+        failed = set_job_status(
+            job_id, QuizGenerationJob.Status.FAILED, error=str(error), finished_at=timezone.now(), checkpoint={}
+        )
+        if failed:
+            JOBS_FINISHED.inc(status=QuizGenerationJob.Status.FAILED)
+        return
+
+    try:
+        with transaction.atomic():
+            quiz, _ = save_generated_quiz(payload, job.video_url, owner=job.owner)
+            finished = set_job_status(
+                job_id,
+                QuizGenerationJob.Status.DONE,
+                transcript=transcript,
+                video_title=video_title[:200],
+                quiz=quiz,
+                finished_at=timezone.now(),
+                checkpoint={},
+            )
+            if not finished:
+                # Cancelled while its questions were generated; don't keep the quiz
+                transaction.set_rollback(True)
+    except ValidationError as error:
+        logger.warning("Quiz generation job %s produced an invalid quiz: %s", job_id, error.detail)
+        failed = set_job_status(
+            job_id,
+            QuizGenerationJob.Status.FAILED,
+            transcript=transcript,
+            error=f"Generated quiz is invalid: {error.detail}",
+            finished_at=timezone.now(),
+            checkpoint={},
+        )
+        if failed:
+            JOBS_FINISHED.inc(status=QuizGenerationJob.Status.FAILED)
+        return
+    if finished:
+        JOBS_FINISHED.inc(status=QuizGenerationJob.Status.DONE)
@@ -0,0 +1,72 @@
+from core.metrics import Counter, Histogram
+
+from ..models import QuizGenerationJob
+
+PIPELINE_STAGE_DURATION = Histogram(
+    "quizly_pipeline_stage_duration_seconds",
+    "Wall time of each stage of download_and_transcribe.",
+    ["stage"],
+)
+PIPELINE_RUNS = Counter(
+    "quizly_pipeline_runs_total",
+    "Transcripts produced by download_and_transcribe, by source and outcome.",
+    ["source", "outcome"],
+)
+YTDLP_ERRORS = Counter(
+    "quizly_ytdlp_errors_total",
+    "yt-dlp failures while loading metadata or downloading audio.",
+    ["stage"],
+)
+REALTIME_FACTOR = Histogram(
+    "quizly_transcription_realtime_factor",
+    "Transcription seconds per second of audio.",
+    ["model"],
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+JOBS_FINISHED = Counter(
+    "quizly_jobs_finished_total",
+    "Quiz generation jobs that finished, by final status.",
+    ["status"],
+)
+QUEUE_WAIT = Histogram(
+    "quizly_job_queue_wait_seconds",
+    "Time quiz generation jobs spent queued before a worker started them.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200),
+)
+QUESTION_GENERATIONS = Counter(
+    "quizly_question_generations_total",
+    "Question sets produced for transcripts, by backend and whether they came from the cache.",
+    ["backend", "source"],
+)
+QUESTION_GENERATION_DURATION = Histogram(
+    "quizly_question_generation_seconds",
+    "Wall time of question generation calls that missed the cache.",
+    ["backend"],
+)
+SCHEDULER_DECISIONS = Counter(
+    "quizly_scheduler_decisions_total",
+    "Jobs started by the scheduler, by whether the shortest job or an aged longer one won.",
+    ["reason"],
+)
+
+ACTIVE_STATUSES = (
+    QuizGenerationJob.Status.QUEUED,
+    QuizGenerationJob.Status.DOWNLOADING,
+    QuizGenerationJob.Status.TRANSCRIBING,
+    QuizGenerationJob.Status.GENERATING,
+)
+
+
+def job_queue_depth():
+    """
+    Gauge collector: unfinished jobs per status, read from the database at scrape time.
+    """
+    counts = dict.fromkeys(ACTIVE_STATUSES, 0)
+    rows = QuizGenerationJob.objects.filter(status__in=ACTIVE_STATUSES).values_list("status")
+    for (status,) in rows:
+        counts[status] += 1
+    return (
+        "quizly_jobs",
+        "Quiz generation jobs that are queued or running, by status.",
+        [({"status": status}, count) for status, count in counts.items()],
+    )
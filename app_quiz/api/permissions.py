@@ -5,6 +5,9 @@ class IsQuizOwner(BasePermission):
     """
     Custom permission to only allow owners of a quiz to edit or delete it.
     Assumes the model instance has an `owner` attribute.
+
+    QuizViewSet already limits its queryset to the user's own quizzes, so
+    other quizzes answer 404; this stays as a second line of defence.
     """
     message = "Only the quiz owner may edit or delete this quiz."
 
@@ -0,0 +1,51 @@
+from django.db import transaction
+
+from ..models import Question, Quiz
+from .serializers import GeneratedQuizSerializer, QuestionSerializer, QuizSerializer
+
+
+class _QuizWithoutQuestionsSerializer(QuizSerializer):
+    questions = None
+
+    class Meta(QuizSerializer.Meta):
+        fields = [name for name in QuizSerializer.Meta.fields if name != "questions"]
+
+
+def save_generated_quiz(payload, video_url, owner=None):
+    """
+    Validate a generated quiz and store it with its questions in one transaction.
+
+    The whole payload is validated first (GeneratedQuizSerializer), so an
+    invalid question never leaves a half-written quiz behind. The quiz is then
+    inserted with one query and all its questions with one bulk_create, instead
+    of a query and a write lock per question. The returned representation is
+    built from the inserted objects, without reading them back.
+
+    Args:
+        payload (dict): {"title", "description", "questions"}, as returned by
+            questions.generate_questions
+        video_url (str): URL of the quiz's video
+        owner (User): User the quiz belongs to
+
+    Returns:
+        tuple: (quiz, data) with the new Quiz and its QuizSerializer representation
+
+    Raises:
+        rest_framework.exceptions.ValidationError: If the payload is invalid
+    """
+    serializer = GeneratedQuizSerializer(data={**payload, "video_url": video_url})
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    with transaction.atomic():
+        quiz = Quiz.objects.create(
+            owner=owner, title=data["title"], description=data["description"], video_url=data["video_url"]
+        )
+        questions = Question.objects.bulk_create([Question(quiz=quiz, **question) for question in data["questions"]])
+
+    # Same shape as QuizSerializer(quiz).data, with the questions taken from the insert
+    data = {
+        **_QuizWithoutQuestionsSerializer(quiz).data,
+        "questions": QuestionSerializer(questions, many=True).data,
+    }
+    return quiz, data
@@ -0,0 +1,52 @@
+import hashlib
+import json
+
+from django.conf import settings
+
+from ..models import GeneratedQuestions
+from .db_cache import DatabaseCache
+
+
+def question_input_hash(transcript, title, count, options, chunk_tokens=None):
+    """
+    Hash everything a question prompt is built from, besides the prompt template itself.
+    """
+    data = json.dumps([transcript, title, count, options, chunk_tokens], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class QuestionStore(DatabaseCache):
+    """
+    Persistent cache of generated quiz payloads backed by the GeneratedQuestions table.
+
+    Identical input with the same prompt version and backend is answered from
+    the table instead of calling the LLM again. Entries older than `max_age`
+    seconds are treated as misses and removed. Hit and miss counts are kept
+    per process.
+    """
+
+    model = GeneratedQuestions
+    value_fields = ("payload",)
+
+    def get(self, input_hash, prompt_version, backend):
+        """
+        Look up a cached payload.
+
+        Returns:
+            dict: The payload or None on a miss
+        """
+        entry = self._get(self._key(input_hash, prompt_version, backend))
+        return entry.payload if entry is not None else None
+
+    def put(self, input_hash, prompt_version, backend, payload):
+        """
+        Store a payload and remove expired entries.
+        """
+        self._put(self._key(input_hash, prompt_version, backend), {"payload": payload})
+
+    @staticmethod
+    def _key(input_hash, prompt_version, backend):
+        return {"input_hash": input_hash, "prompt_version": prompt_version, "backend": backend}
+
+
+question_store = QuestionStore(max_age=settings.QUESTION_CACHE_MAX_AGE)
@@ -0,0 +1,444 @@
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import QUESTION_GENERATION_DURATION, QUESTION_GENERATIONS
+from .question_cache import question_input_hash, question_store
+from .tokens import chunk_text, count_tokens, split_sentences
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt or the schema changes, so cached questions are not reused
+PROMPT_VERSION = "2"
+
+PROMPT_TEMPLATE = """\
+You write multiple-choice quiz questions about a YouTube video, based on its transcript.
+
+Video title: {title}
+{part_note}
+Write exactly {count} questions that test understanding of the content of the video, in the \
+language of the transcript. Each question has exactly {options} distinct answer options and one \
+of them is correct; `answer` repeats the correct option word for word. Vary the position of the \
+correct option. Also write a description of one or two sentences saying what the quiz covers.
+
+Transcript:
+{transcript}
+"""
+
+MAX_ANSWER_LENGTH = 500  # Question.answer
+
+WORD_PATTERN = re.compile(r"\w{4,}")
+SIGNATURE_WORD_PATTERN = re.compile(r"\w+")
+# Questions from different chunks sharing this much of their wording count as duplicates
+DUPLICATE_SIMILARITY = 0.6
+LOCAL_MAX_SENTENCE_WORDS = 40
+LOCAL_FALLBACK_OPTIONS = ("always", "never", "nothing", "everything", "somewhere", "nobody")
+
+
+class QuestionGenerationError(Exception):
+    """The backend failed or returned no usable questions."""
+
+
+def quiz_schema(count, options):
+    """
+    JSON schema of the quiz payload the LLM has to return.
+    """
+    return {
+        "type": "object",
+        "properties": {
+            "description": {"type": "string"},
+            "questions": {
+                "type": "array",
+                "minItems": count,
+                "maxItems": count,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "question_title": {"type": "string"},
+                        "question_options": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": options,
+                            "maxItems": options,
+                        },
+                        "answer": {"type": "string"},
+                    },
+                    "required": ["question_title", "question_options", "answer"],
+                },
+            },
+        },
+        "required": ["description", "questions"],
+    }
+
+
+def build_prompt(transcript, title, count, options, part=None):
+    part_note = f"Transcript part: {part[0]} of {part[1]}; only ask about this part.\n" if part else ""
+    return PROMPT_TEMPLATE.format(
+        title=title or "Untitled Video", part_note=part_note, count=count, options=options, transcript=transcript
+    )
+
+
+def validate_payload(payload, title, count, options):
+    """
+    Check a generated quiz payload and keep only usable questions.
+
+    Questions need a title, exactly `options` distinct non-empty options and an
+    answer that is one of them. Malformed questions and repeated titles are
+    dropped, the rest is cut to `count`.
+
+    Returns:
+        dict: {"title", "description", "questions"} with the clean questions
+
+    Raises:
+        QuestionGenerationError: If no usable question is left
+    """
+    if not isinstance(payload, dict):
+        raise QuestionGenerationError("The generated quiz is not a JSON object.")
+
+    questions = []
+    seen_titles = set()
+    for item in payload.get("questions") or []:
+        if not isinstance(item, dict):
+            continue
+        question_title = item.get("question_title")
+        question_options = item.get("question_options")
+        answer = item.get("answer")
+        if not (isinstance(question_title, str) and isinstance(question_options, list) and isinstance(answer, str)):
+            continue
+        question_title = question_title.strip()
+        question_options = [option.strip() for option in question_options if isinstance(option, str)]
+        answer = answer.strip()
+
+        if (
+            not question_title
+            or question_title.casefold() in seen_titles
+            or len(question_options) != options
+            or not all(question_options)
+            or len({option.casefold() for option in question_options}) != options
+            or answer not in question_options
+            or len(answer) > MAX_ANSWER_LENGTH
+        ):
+            logger.debug("Dropping unusable generated question: %r", item)
+            continue
+        seen_titles.add(question_title.casefold())
+        questions.append({"question_title": question_title, "question_options": question_options, "answer": answer})
+
+    if not questions:
+        raise QuestionGenerationError("The generated quiz contains no usable questions.")
+
+    description = payload.get("description")
+    if not isinstance(description, str) or not description.strip():
+        description = f"Quiz about {title or 'the video'}"
+    return {
+        "title": (title or "Untitled Video")[:200],
+        "description": description.strip(),
+        "questions": questions[:count],
+    }
+
+
+class LocalBackend:
+    """
+    Deterministic offline stand-in for the LLM.
+
+    Builds fill-in-the-blank questions from sentences spread over the
+    transcript, with distractors taken from the transcript's own vocabulary.
+    The same transcript always yields the same quiz, so the whole pipeline can
+    be tested and load-tested without network access or API costs;
+    settings.QUIZ_LOCAL_BACKEND_LATENCY_SECONDS simulates the LLM round-trip.
+    """
+    name = "local"
+
+    def generate(self, transcript, title, count, options, part=None):
+        if settings.QUIZ_LOCAL_BACKEND_LATENCY_SECONDS:
+            time.sleep(settings.QUIZ_LOCAL_BACKEND_LATENCY_SECONDS)
+
+        # Unpunctuated transcripts (automatic captions) are cut into word runs instead
+        sentences = []
+        for sentence in split_sentences(transcript):
+            words = sentence.split()
+            for start in range(0, len(words), LOCAL_MAX_SENTENCE_WORDS):
+                part = " ".join(words[start:start + LOCAL_MAX_SENTENCE_WORDS])
+                if WORD_PATTERN.search(part):
+                    sentences.append(part)
+        if not sentences:
+            raise QuestionGenerationError("The transcript has no words to ask about.")
+
+        rng = random.Random(question_input_hash(transcript, title, count, options))
+        vocabulary = sorted({word.lower() for word in WORD_PATTERN.findall(transcript)})
+        step = len(sentences) / min(count, len(sentences))
+
+        questions = []
+        for index in range(min(count, len(sentences))):
+            sentence = sentences[int(index * step)]
+            # The longest word is the most likely to carry content
+            answer = max(WORD_PATTERN.findall(sentence), key=len)
+            blank = re.sub(rf"\b{re.escape(answer)}\b", "_____", sentence, count=1)
+
+            candidates = [word for word in vocabulary if word != answer.lower()]
+            distractors = rng.sample(candidates, min(options - 1, len(candidates)))
+            distractors += [word for word in LOCAL_FALLBACK_OPTIONS if word not in {answer.lower(), *distractors}]
+            question_options = [answer, *distractors[:options - 1]]
+            rng.shuffle(question_options)
+            questions.append({
+                "question_title": f'Which word completes the sentence "{blank}"?',
+                "question_options": question_options,
+                "answer": answer,
+            })
+
+        return {
+            "description": f"Fill-in-the-blank questions about {title or 'the video'}, taken from its transcript.",
+            "questions": questions,
+        }
+
+
+class GeminiBackend:
+    """
+    Question generation with Gemini, using structured JSON output.
+
+    The google-genai client keeps an HTTP connection pool for its lifetime, so
+    it is created once per process on first use and shared by all threads;
+    rate limits and server errors are retried by the client itself.
+    """
+
+    def __init__(self, model, api_key, timeout, retries):
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return f"gemini:{self.model}"
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                from google.genai import types
+
+                self._client = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(
+                        timeout=int(self.timeout * 1000),
+                        retry_options=types.HttpRetryOptions(attempts=self.retries),
+                    ),
+                )
+            return self._client
+
+    def generate(self, transcript, title, count, options, part=None):
+        import httpx
+        from google.genai import errors, types
+
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_json_schema=quiz_schema(count, options),
+            temperature=0.4,
+        )
+        try:
+            response = self.client.models.generate_content(
+                model=self.model, contents=build_prompt(transcript, title, count, options, part), config=config
+            )
+        except errors.APIError as error:
+            raise QuestionGenerationError(f"Gemini request failed: {error}") from error
+        except (httpx.HTTPError, OSError) as error:
+            # Timeouts and connection failures that outlasted the client's retries
+            raise QuestionGenerationError(f"Gemini request failed: {error!r}") from error
+
+        try:
+            return json.loads(response.text or "")
+        except ValueError as error:
+            raise QuestionGenerationError(f"Gemini returned invalid JSON: {error}") from error
+
+
+_backend = None
+_backend_config = None
+_backend_lock = threading.Lock()
+_llm_executor = None
+_llm_executor_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Return the process-wide question generation backend chosen by settings.QUIZ_QUESTION_BACKEND.
+    """
+    global _backend, _backend_config
+    config = (
+        settings.QUIZ_QUESTION_BACKEND,
+        settings.GEMINI_MODEL,
+        settings.GEMINI_API_KEY,
+        settings.GEMINI_TIMEOUT_SECONDS,
+        settings.GEMINI_RETRIES,
+    )
+    with _backend_lock:
+        if _backend is None or _backend_config != config:
+            if config[0] == "local":
+                _backend = LocalBackend()
+            elif config[0] == "gemini":
+                if not config[2]:
+                    raise ImproperlyConfigured("Set GEMINI_API_KEY to generate questions with Gemini")
+                _backend = GeminiBackend(*config[1:])
+            else:
+                raise ImproperlyConfigured(f"Unknown QUIZ_QUESTION_BACKEND {config[0]!r}")
+            _backend_config = config
+        return _backend
+
+
+def get_llm_executor():
+    """
+    Return the process-wide executor for LLM requests.
+
+    The pool is bounded by settings.QUIZ_QUESTION_MAX_CONCURRENCY, which caps
+    the requests in flight per process across all jobs.
+    """
+    global _llm_executor
+    with _llm_executor_lock:
+        if _llm_executor is None:
+            _llm_executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_QUESTION_MAX_CONCURRENCY,
+                thread_name_prefix="quiz-llm",
+            )
+    return _llm_executor
+
+
+def _reset_after_fork():
+    global _backend, _backend_config, _llm_executor
+    _backend, _backend_config, _llm_executor = None, None, None
+
+
+# A forked child must not share the parent's HTTP connections or pool threads
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def question_signature(question):
+    return frozenset(SIGNATURE_WORD_PATTERN.findall(f"{question['question_title']} {question['answer']}".lower()))
+
+
+def reduce_questions(payloads, count):
+    """
+    Merge the validated payloads of consecutive transcript chunks into one quiz.
+
+    Questions are picked round-robin over the chunks, so the quiz covers the
+    whole video rather than its beginning. A question sharing
+    DUPLICATE_SIMILARITY of its title and answer words with one already
+    picked is skipped.
+
+    Returns:
+        dict: {"title", "description", "questions"} with at most `count` questions
+    """
+    queues = [list(payload["questions"]) for payload in payloads]
+    picked, signatures = [], []
+    while len(picked) < count and any(queues):
+        for queue in queues:
+            if not queue or len(picked) >= count:
+                continue
+            question = queue.pop(0)
+            signature = question_signature(question)
+            if any(len(signature & other) / len(signature | other) >= DUPLICATE_SIMILARITY for other in signatures):
+                continue
+            picked.append(question)
+            signatures.append(signature)
+    return {"title": payloads[0]["title"], "description": payloads[0]["description"], "questions": picked}
+
+
+def _generate_payload(backend, chunks, title, count, options):
+    if len(chunks) == 1:
+        return validate_payload(backend.generate(chunks[0], title, count, options), title, count, options)
+
+    # Ask for some spare questions, the reduce step drops duplicates
+    per_chunk = max(1, min(count, math.ceil(count * settings.QUIZ_QUESTION_OVERSAMPLE / len(chunks))))
+
+    def generate_chunk(index, chunk):
+        payload = backend.generate(chunk, title, per_chunk, options, part=(index + 1, len(chunks)))
+        return validate_payload(payload, title, per_chunk, options)
+
+    executor = get_llm_executor()
+    futures = [executor.submit(generate_chunk, index, chunk) for index, chunk in enumerate(chunks)]
+    payloads = []
+    for index, future in enumerate(futures):
+        try:
+            payloads.append(future.result())
+        except QuestionGenerationError as error:
+            # The other parts still make a quiz, just with less coverage
+            logger.warning("Question generation failed for part %s of %s: %s", index + 1, len(chunks), error)
+        except ImproperlyConfigured:
+            raise
+        except Exception:
+            # Any other error of one request must not fail the job either
+            logger.exception("Question generation failed for part %s of %s", index + 1, len(chunks))
+    if not payloads:
+        raise QuestionGenerationError("Question generation failed for every part of the transcript.")
+    return reduce_questions(payloads, count)
+
+
+def generate_questions(transcript, title="", progress=None):
+    """
+    Turn a transcript into a validated quiz payload.
+
+    Transcripts longer than settings.QUIZ_QUESTION_CHUNK_TOKENS are split into
+    chunks of that size at sentence boundaries (map-reduce): each chunk gets
+    its own concurrent LLM request on the bounded executor of
+    get_llm_executor(), and reduce_questions() merges the candidates. Latency
+    then follows the slowest chunk instead of the transcript length.
+
+    Results are cached by a hash of the input, PROMPT_VERSION and the backend
+    (see question_cache.QuestionStore), so generating questions for the same
+    transcript again costs one database read.
+
+    Args:
+        transcript (str): The video transcript
+        title (str): The video title, used as quiz title and as context for the prompt
+        progress (callable): Optional progress(stage, **info) callback, as in download_and_transcribe
+
+    Returns:
+        dict: {"title", "description", "questions"}, each question with
+        question_title, question_options and answer
+
+    Raises:
+        QuestionGenerationError: If the backend failed or returned no usable questions
+    """
+    progress = progress or (lambda stage, **info: None)
+    backend = get_backend()
+    count, options = settings.QUIZ_QUESTION_COUNT, settings.QUIZ_QUESTION_OPTIONS
+    chunk_tokens = settings.QUIZ_QUESTION_CHUNK_TOKENS
+    input_hash = question_input_hash(transcript, title, count, options, chunk_tokens)
+
+    progress("generating")
+    payload = question_store.get(input_hash, PROMPT_VERSION, backend.name)
+    if payload is not None:
+        QUESTION_GENERATIONS.inc(backend=backend.name, source="cache")
+        progress("questions", question_backend=backend.name, question_source="cache")
+        return payload
+
+    started = time.perf_counter()
+    tokens = count_tokens(transcript)
+    chunks = chunk_text(transcript, chunk_tokens) if tokens > chunk_tokens else [transcript]
+    try:
+        with QUESTION_GENERATION_DURATION.time(backend=backend.name):
+            payload = _generate_payload(backend, chunks, title, count, options)
+    except QuestionGenerationError:
+        QUESTION_GENERATIONS.inc(backend=backend.name, source="error")
+        raise
+    QUESTION_GENERATIONS.inc(backend=backend.name, source="backend")
+    question_store.put(input_hash, PROMPT_VERSION, backend.name, payload)
+    progress(
+        "questions",
+        question_backend=backend.name,
+        question_source="backend",
+        question_tokens=tokens,
+        question_chunks=len(chunks),
+        question_seconds=round(time.perf_counter() - started, 2),
+    )
+    return payload
+
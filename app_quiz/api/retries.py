@@ -0,0 +1,81 @@
+import logging
+import urllib.error
+
+import yt_dlp
+from django.conf import settings
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from yt_dlp.networking.exceptions import CertificateVerifyError, HTTPError, TransportError
+from yt_dlp.utils import ExtractorError
+
+logger = logging.getLogger(__name__)
+
+# 403 is included because YouTube answers expired or throttled format URLs with it
+TRANSIENT_HTTP_STATUSES = {403, 408, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(error):
+    """
+    Tell whether a yt-dlp or network error is worth retrying.
+
+    DownloadError and ExtractorError wrap the original exception; the chain is
+    followed down to the HTTP status or transport error that caused it.
+    Errors yt-dlp marks as expected (private, removed or age-restricted videos)
+    never are.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, ExtractorError) and error.expected:
+            return False
+        if isinstance(error, HTTPError):
+            return error.status in TRANSIENT_HTTP_STATUSES
+        if isinstance(error, urllib.error.HTTPError):
+            return error.code in TRANSIENT_HTTP_STATUSES
+        if isinstance(error, CertificateVerifyError):
+            return False
+        if isinstance(error, (TransportError, urllib.error.URLError, ConnectionError, TimeoutError)):
+            return True
+
+        if isinstance(error, yt_dlp.DownloadError) and error.exc_info:
+            error = error.exc_info[1]
+        else:
+            error = getattr(error, "cause", None) or error.__cause__
+    return False
+
+
+def _log_retry(retry_state):
+    logger.warning(
+        "Transient download error (attempt %s), retrying in %.1fs: %s",
+        retry_state.attempt_number,
+        retry_state.next_action.sleep,
+        retry_state.outcome.exception(),
+    )
+
+
+def download_retrying():
+    """
+    Build the retry policy for metadata and media requests.
+
+    Transient errors are retried up to settings.QUIZ_DOWNLOAD_RETRIES attempts
+    with exponential backoff and jitter, starting at
+    settings.QUIZ_DOWNLOAD_RETRY_BACKOFF_SECONDS; the last error is re-raised.
+
+    Usage:
+        for attempt in download_retrying():
+            with attempt:
+                ...
+
+    Returns:
+        tenacity.Retrying: The retry controller
+    """
+    return Retrying(
+        retry=retry_if_exception(is_transient_error),
+        stop=stop_after_attempt(settings.QUIZ_DOWNLOAD_RETRIES),
+        wait=wait_exponential_jitter(
+            initial=settings.QUIZ_DOWNLOAD_RETRY_BACKOFF_SECONDS,
+            max=settings.QUIZ_DOWNLOAD_RETRY_MAX_BACKOFF_SECONDS,
+            jitter=settings.QUIZ_DOWNLOAD_RETRY_BACKOFF_SECONDS,
+        ),
+        before_sleep=_log_retry,
+        reraise=True,
+    )
@@ -0,0 +1,147 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from ..models import QuizGenerationJob
+from .metrics import QUEUE_WAIT, SCHEDULER_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {
+    QuizGenerationJob.Status.DONE,
+    QuizGenerationJob.Status.FAILED,
+    QuizGenerationJob.Status.CANCELLED,
+}
+
+
+def estimate_job_seconds(duration, model_name):
+    """
+    Expected processing time of a job, from its video length and Whisper model.
+
+    Uses the realtime factors of settings.WHISPER_MODEL_REALTIME_FACTORS (the
+    slowest one for unknown models) plus settings.QUIZ_JOB_OVERHEAD_SECONDS.
+    """
+    factors = settings.WHISPER_MODEL_REALTIME_FACTORS or {}
+    factor = factors.get(model_name) or max(factors.values(), default=0.1)
+    return (duration or 0) * factor + settings.QUIZ_JOB_OVERHEAD_SECONDS
+
+
+def job_priority(expected_seconds, waited_seconds):
+    """
+    Shortest-job-first priority with aging; lower runs first.
+
+    Every second spent waiting takes settings.QUIZ_SCHEDULER_AGING_RATE seconds
+    off the expected processing time, so a long job overtakes newer short ones
+    after a bounded wait and is never starved.
+    """
+    return expected_seconds - settings.QUIZ_SCHEDULER_AGING_RATE * waited_seconds
+
+
+def choose_next_job(queued, running, last_started, now):
+    """
+    Pick the job to run next.
+
+    Users take turns: the user with the fewest running jobs goes first, ties go
+    to whoever was served least recently, then to whoever waits longest. Within
+    that user's queued jobs the lowest job_priority() wins.
+
+    Args:
+        queued (list): Queued jobs as dicts with id, owner_id, duration, model_name and created_at
+        running (dict): Running job count per owner id
+        last_started (dict): Start time of each owner's most recent job
+        now (datetime): Current time
+
+    Returns:
+        tuple: (job, decision) with the chosen job dict and a dict describing the
+        decision, or (None, None) when nothing is queued
+    """
+    if not queued:
+        return None, None
+
+    oldest = {}
+    for job in queued:
+        oldest[job["owner_id"]] = min(job["created_at"], oldest.get(job["owner_id"], job["created_at"]))
+
+    def user_turn(owner_id):
+        started = last_started.get(owner_id)
+        return running.get(owner_id, 0), started is not None, started or now, oldest[owner_id], owner_id
+
+    owner_id = min({job["owner_id"] for job in queued}, key=user_turn)
+    candidates = []
+    for job in queued:
+        if job["owner_id"] != owner_id:
+            continue
+        expected = estimate_job_seconds(job["duration"], job["model_name"])
+        waited = (now - job["created_at"]).total_seconds()
+        candidates.append((job_priority(expected, waited), expected, job["created_at"], job["id"], job, waited))
+
+    priority, expected, _, _, job, waited = min(candidates)
+    shortest = min(candidate[1] for candidate in candidates)
+    decision = {
+        "reason": "aged" if expected > shortest else "shortest",
+        "priority": round(priority, 1),
+        "expected_seconds": round(expected, 1),
+        "queue_wait_seconds": round(waited, 1),
+        "queued_jobs": len(queued),
+        "queued_users": len({queued_job["owner_id"] for queued_job in queued}),
+    }
+    return job, decision
+
+
+def claim_next_job(worker=""):
+    """
+    Choose the next queued job and lease it to a worker.
+
+    The claim is a conditional update on started_at, so a job is only ever
+    handed to one worker even when several processes pick at the same time;
+    a single UPDATE is atomic on SQLite too. The lease lasts
+    settings.QUIZ_JOB_LEASE_SECONDS and is renewed while the job runs. The
+    decision is logged, counted in the scheduler metrics and stored in
+    job.stats["scheduler"].
+
+    Args:
+        worker (str): Identity of the claiming worker, e.g. "host:pid"
+
+    Returns:
+        int: Primary key of the claimed job, or None when the queue is empty
+    """
+    while True:
+        now = timezone.now()
+        queued = list(
+            QuizGenerationJob.objects.filter(status=QuizGenerationJob.Status.QUEUED, started_at__isnull=True)
+            .values("id", "owner_id", "duration", "model_name", "created_at")
+        )
+        owners = (
+            QuizGenerationJob.objects.filter(owner_id__in={job["owner_id"] for job in queued})
+            .order_by()
+            .values("owner_id")
+            .annotate(
+                running=Count("id", filter=Q(started_at__isnull=False) & ~Q(status__in=FINISHED_STATUSES)),
+                last_started=Max("started_at"),
+            )
+        )
+        running = {row["owner_id"]: row["running"] for row in owners}
+        last_started = {row["owner_id"]: row["last_started"] for row in owners if row["last_started"]}
+
+        job, decision = choose_next_job(queued, running, last_started, now)
+        if job is None:
+            return None
+
+        claimed = QuizGenerationJob.objects.filter(pk=job["id"], started_at__isnull=True).update(
+            started_at=now,
+            updated_at=now,
+            worker=worker,
+            lease_expires_at=now + timedelta(seconds=settings.QUIZ_JOB_LEASE_SECONDS),
+        )
+        if not claimed:
+            continue  # Another worker took it first; decide again
+
+        stats = QuizGenerationJob.objects.values_list("stats", flat=True).get(pk=job["id"])
+        QuizGenerationJob.objects.filter(pk=job["id"]).update(stats={**stats, "scheduler": decision})
+        QUEUE_WAIT.observe(decision["queue_wait_seconds"])
+        SCHEDULER_DECISIONS.inc(reason=decision["reason"])
+        logger.info("Scheduled job %s: %s", job["id"], decision)
+        return job["id"]
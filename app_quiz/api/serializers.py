@@ -1,5 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
-from ..models import Quiz, Question
+from rest_framework.reverse import reverse
+from ..models import Quiz, Question, QuizGenerationBatch, QuizGenerationJob
+from .scheduler import FINISHED_STATUSES
+from .utils import normalize_playlist_url, normalize_youtube_url
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -22,5 +26,122 @@ class CreateQuizQuestionSerializer(serializers.Serializer):
         fields = ['id', 'question_title', 'question_options', 'answer', 'created_at', 'updated_at']
 
 
+class GeneratedQuestionSerializer(serializers.ModelSerializer):
+    question_options = serializers.ListField(child=serializers.CharField(), min_length=2)
+
+    class Meta:
+        model = Question
+        fields = ['question_title', 'question_options', 'answer']
+
+    def validate(self, attrs):
+        options = attrs['question_options']
+        if len({option.casefold() for option in options}) != len(options):
+            raise serializers.ValidationError({'question_options': "Options must be distinct."})
+        if attrs['answer'] not in options:
+            raise serializers.ValidationError({'answer': "The answer must be one of the options."})
+        return attrs
+
+
+class GeneratedQuizSerializer(serializers.ModelSerializer):
+    """
+    Validates a whole generated quiz (quiz fields and all its questions) before anything is stored.
+    """
+    questions = GeneratedQuestionSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Quiz
+        fields = ['title', 'description', 'video_url', 'questions']
+
+
 class CreateQuizFromUrlSerializer(serializers.Serializer):
-    url = serializers.URLField(help_text="YouTube URL to create quiz from")
\ No newline at end of file
+    url = serializers.URLField(help_text="YouTube URL to create quiz from")
+
+    def validate_url(self, value):
+        try:
+            return normalize_youtube_url(value)
+        except ValueError:
+            raise serializers.ValidationError("Enter a valid YouTube video URL.")
+
+
+class QuizGenerationJobSerializer(serializers.ModelSerializer):
+    quiz_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizGenerationJob
+        fields = [
+            'id', 'status', 'video_url', 'video_id', 'video_title', 'duration', 'model_name',
+            'transcript', 'error', 'stats',
+            'quiz', 'quiz_url', 'created_at', 'updated_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_quiz_url(self, obj):
+        if obj.quiz_id is None:
+            return None
+        return reverse('quiz-detail', args=[obj.quiz_id], request=self.context.get('request'))
+
+
+class CreateQuizBatchSerializer(serializers.Serializer):
+    urls = serializers.ListField(
+        child=serializers.URLField(), required=False, allow_empty=False,
+        max_length=settings.QUIZ_BATCH_MAX_VIDEOS,
+        help_text="YouTube video URLs to create quizzes from",
+    )
+    playlist_url = serializers.URLField(required=False, help_text="YouTube playlist URL to create quizzes from")
+
+    def validate_urls(self, value):
+        normalized = []
+        for url in value:
+            try:
+                url = normalize_youtube_url(url)
+            except ValueError:
+                raise serializers.ValidationError(f"Enter valid YouTube video URLs: {url}")
+            if url not in normalized:
+                normalized.append(url)
+        return normalized
+
+    def validate_playlist_url(self, value):
+        try:
+            return normalize_playlist_url(value)
+        except ValueError:
+            raise serializers.ValidationError("Enter a valid YouTube playlist URL.")
+
+    def validate(self, attrs):
+        if ("urls" in attrs) == ("playlist_url" in attrs):
+            raise serializers.ValidationError("Provide either urls or playlist_url.")
+        return attrs
+
+
+class QuizGenerationBatchJobSerializer(serializers.ModelSerializer):
+    job_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizGenerationJob
+        fields = ['id', 'status', 'video_url', 'video_id', 'video_title', 'error', 'quiz', 'job_url']
+        read_only_fields = fields
+
+    def get_job_url(self, obj):
+        return reverse('quiz_job_detail', args=[obj.pk], request=self.context.get('request'))
+
+
+class QuizGenerationBatchSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    jobs = QuizGenerationBatchJobSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = QuizGenerationBatch
+        fields = ['id', 'playlist_url', 'title', 'progress', 'jobs', 'created_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        counts = dict.fromkeys(QuizGenerationJob.Status.values, 0)
+        for job in obj.jobs.all():
+            counts[job.status] += 1
+        total = sum(counts.values())
+        finished = sum(counts[status] for status in FINISHED_STATUSES)
+        return {
+            'total': total,
+            'finished': finished,
+            'percent': round(100 * finished / total) if total else 100,
+            **counts,
+        }
@@ -0,0 +1,118 @@
+import logging
+import threading
+from concurrent.futures import CancelledError, Future, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls for the same key within a process.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception). Progress events the
+    leader emits are broadcast to every attached caller, and late joiners get
+    the most recent event replayed so they know which stage the work is in.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn, listener=None, cancelled=None, poll_seconds=1.0):
+        """
+        Run fn(broadcast) once per key at a time and return its result.
+
+        Args:
+            key (hashable): Identity of the work, e.g. (video_id, model_name, language)
+            fn (callable): Work to run; receives a broadcast(stage, **info) callable
+            listener (callable): Optional progress callback for this caller
+            cancelled (callable): Optional check returning True once this caller
+                no longer needs the result; see cancelled()
+            poll_seconds (float): How often a waiting caller runs its `cancelled` check
+
+        Returns:
+            The result of fn, shared between all callers for the key
+
+        Raises:
+            CancelledError: If this caller was cancelled while waiting for another one's work
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"future": Future(), "listeners": [], "cancel_checks": [], "last_event": None}
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.shared += 1
+            if listener is not None:
+                call["listeners"].append(listener)
+            call["cancel_checks"].append(cancelled)
+            last_event = call["last_event"]
+
+        if not leader:
+            if listener is not None and last_event is not None:
+                listener(last_event[0], **last_event[1])
+            return self._wait(key, call, listener, cancelled, poll_seconds)
+
+        def broadcast(stage, **info):
+            with self._lock:
+                call["last_event"] = (stage, info)
+                listeners = list(call["listeners"])
+            for callback in listeners:
+                try:
+                    callback(stage, **info)
+                except Exception:
+                    # A broken listener must not fail the work shared by everyone else
+                    logger.exception("Progress listener failed for %s", key)
+
+        try:
+            result = fn(broadcast)
+        except BaseException as error:
+            call["future"].set_exception(error)
+            raise
+        else:
+            call["future"].set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _wait(self, key, call, listener, cancelled, poll_seconds):
+        """
+        Wait for the leader's result, giving up once this caller is cancelled.
+
+        A cancelled caller detaches from the call, so it gets no more progress
+        events and no longer keeps the work alive for the others.
+        """
+        while True:
+            try:
+                return call["future"].result(timeout=poll_seconds if cancelled is not None else None)
+            except TimeoutError:
+                if not cancelled():
+                    continue
+            with self._lock:
+                if listener is not None:
+                    call["listeners"].remove(listener)
+                call["cancel_checks"].remove(cancelled)
+            logger.info("Caller waiting for %s was cancelled", key)
+            raise CancelledError(f"Waiting for {key} was cancelled.")
+
+    def cancelled(self, key):
+        """
+        Tell whether every caller waiting for the key has given up on it.
+
+        Work shared with a caller that still wants the result is never
+        cancelled; callers that passed no `cancelled` check never give up.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            checks = list(call["cancel_checks"]) if call else []
+        return bool(checks) and all(check is not None and check() for check in checks)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,85 @@
+import math
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from ..models import QuizGenerationJob
+from .scheduler import FINISHED_STATUSES, estimate_job_seconds
+
+
+class JobAdmissionThrottle(BaseThrottle):
+    """
+    Admission control for new quiz generation jobs.
+
+    A request is refused while its user has settings.QUIZ_MAX_ACTIVE_JOBS_PER_USER
+    jobs queued or running, or while settings.QUIZ_MAX_ACTIVE_JOBS jobs are
+    active overall, before any metadata is fetched (see admission_wait). Views
+    with `batch_admission = True` are checked against the batch limit instead.
+    Views creating several jobs check the admitted count again with
+    admission_wait once they know it.
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if not request.user.is_authenticated:
+            return True
+        self.wait_seconds = admission_wait(request.user, batch=getattr(view, "batch_admission", False))
+        return self.wait_seconds is None
+
+    def wait(self):
+        return math.ceil(self.wait_seconds) if self.wait_seconds is not None else None
+
+
+def admission_wait(user, new_jobs=1, batch=False):
+    """
+    Check whether `new_jobs` more jobs of `user` fit within the admission limits.
+
+    Single videos count against settings.QUIZ_MAX_ACTIVE_JOBS_PER_USER and
+    settings.QUIZ_MAX_ACTIVE_JOBS. Batch jobs only take a worker once they
+    run, and the scheduler's per-user turns keep a long batch from starving
+    other users, so queued batch jobs don't count there; running ones do.
+    Batches have their own limit instead: a user may have
+    settings.QUIZ_MAX_ACTIVE_BATCH_JOBS_PER_USER batch jobs queued or running.
+
+    The estimate is the expected time for the jobs ahead in the queue to free
+    enough slots, spread over settings.QUIZ_JOB_MAX_WORKERS workers.
+
+    Args:
+        user (User): The user submitting the jobs
+        new_jobs (int): Number of jobs about to be created
+        batch (bool): Whether the jobs belong to a batch
+
+    Returns:
+        float: Seconds to wait before retrying, None if the jobs are admitted
+    """
+    # Oldest first, a conservative stand-in for the scheduler's order
+    active = list(
+        QuizGenerationJob.objects.exclude(status__in=FINISHED_STATUSES)
+        .order_by("created_at", "id")
+        .values_list("owner_id", "duration", "model_name", "batch_id", "started_at")
+    )
+
+    if batch:
+        counted = [index for index, job in enumerate(active) if job[3] is not None]
+        limits = [(settings.QUIZ_MAX_ACTIVE_BATCH_JOBS_PER_USER, True)]
+    else:
+        counted = [index for index, job in enumerate(active) if job[3] is None or job[4] is not None]
+        limits = [(settings.QUIZ_MAX_ACTIVE_JOBS_PER_USER, True), (settings.QUIZ_MAX_ACTIVE_JOBS, False)]
+
+    blocking = []
+    for limit, per_user in limits:
+        jobs = [index for index in counted if active[index][0] == user.pk] if per_user else counted
+        excess = len(jobs) + new_jobs - limit
+        if excess > 0:
+            # The oldest counted jobs have to finish, and everything queued before them
+            blocking.append(active[:jobs[min(excess, len(jobs)) - 1] + 1] if jobs else [])
+    if not blocking:
+        return None
+
+    workers = max(settings.QUIZ_JOB_MAX_WORKERS, 1)
+    return max(
+        sum(estimate_job_seconds(duration, model_name) for _, duration, model_name, _, _ in jobs) / workers
+        for jobs in blocking
+    )
@@ -0,0 +1,100 @@
+import logging
+import re
+import threading
+
+import tiktoken
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+# Rough stand-in for BPE tokens: words and punctuation marks
+APPROXIMATE_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """
+    Return the tiktoken encoding named by settings.QUIZ_TOKEN_ENCODING, loaded once per process.
+
+    tiktoken downloads the encoding on first use and caches it on disk
+    (TIKTOKEN_CACHE_DIR). When that is impossible, e.g. on an offline host
+    with an empty cache, None is returned and token counts are estimated.
+    """
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            try:
+                _encoding = tiktoken.get_encoding(settings.QUIZ_TOKEN_ENCODING)
+            except Exception as error:
+                logger.warning(
+                    "Could not load tiktoken encoding %s, estimating token counts instead: %s",
+                    settings.QUIZ_TOKEN_ENCODING, error,
+                )
+                _encoding = None
+            _encoding_loaded = True
+        return _encoding
+
+
+def count_tokens(text):
+    """
+    Count the tokens of `text`, or estimate them when the encoding is unavailable.
+    """
+    encoding = get_encoding()
+    if encoding is None:
+        return len(APPROXIMATE_TOKEN_PATTERN.findall(text))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_sentences(text):
+    """
+    Split text at sentence ends, dropping empty pieces.
+    """
+    return [sentence.strip() for sentence in SENTENCE_END_PATTERN.split(text) if sentence.strip()]
+
+
+def chunk_text(text, max_tokens):
+    """
+    Split text into consecutive chunks of at most `max_tokens` tokens.
+
+    Chunks end at sentence boundaries; a single sentence longer than
+    `max_tokens` (unpunctuated transcripts) is cut between words.
+
+    Args:
+        text (str): The text to split
+        max_tokens (int): Token limit per chunk
+
+    Returns:
+        list: The chunks, in order
+    """
+    pieces = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            pieces.append((sentence, tokens))
+            continue
+        words, current = [], 0
+        for word in sentence.split():
+            word_tokens = count_tokens(f" {word}")
+            if words and current + word_tokens > max_tokens:
+                pieces.append((" ".join(words), current))
+                words, current = [], 0
+            words.append(word)
+            current += word_tokens
+        if words:
+            pieces.append((" ".join(words), current))
+
+    chunks, current, size = [], [], 0
+    for piece, tokens in pieces:
+        # The joining space is usually merged into the next token, so sizes simply add up
+        if current and size + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
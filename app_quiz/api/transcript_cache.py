@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.db.models import Sum
+
+from ..models import Transcript
+from .db_cache import DatabaseCache
+
+
+class TranscriptStore(DatabaseCache):
+    """
+    Persistent transcript cache backed by the Transcript table.
+
+    Entries older than `max_age` seconds are treated as misses and removed.
+    When the stored text exceeds `max_bytes`, least recently used entries are
+    evicted first. Hit and miss counts are kept per process.
+    """
+
+    model = Transcript
+    value_fields = ("text", "video_title")
+
+    def __init__(self, max_bytes=None, max_age=None):
+        super().__init__(max_age=max_age)
+        self.max_bytes = max_bytes
+
+    def get(self, video_id, model_name, language=None):
+        """
+        Look up a cached transcript.
+
+        Returns:
+            tuple: (transcript_text, video_title) or None on a miss
+        """
+        entry = self._get(self._key(video_id, model_name, language))
+        if entry is None:
+            return None
+        return entry.text, entry.video_title
+
+    def put(self, video_id, model_name, language, text, video_title=""):
+        """
+        Store a transcript and evict old entries if the store is over budget.
+        """
+        self._put(self._key(video_id, model_name, language), {
+            "text": text,
+            "video_title": video_title[:200],
+            "size": len(text.encode("utf-8")),
+        })
+
+    def evict(self):
+        """
+        Remove expired entries, then least recently used ones until under `max_bytes`.
+
+        Returns:
+            int: Number of removed entries
+        """
+        removed = super().evict()
+
+        if self.max_bytes:
+            total = Transcript.objects.aggregate(total=Sum("size"))["total"] or 0
+            excess = total - self.max_bytes
+            if excess > 0:
+                stale = []
+                for pk, size in Transcript.objects.order_by("last_used_at").values_list("pk", "size").iterator():
+                    if excess <= 0:
+                        break
+                    stale.append(pk)
+                    excess -= size
+                removed += Transcript.objects.filter(pk__in=stale).delete()[0]
+        return removed
+
+    @staticmethod
+    def _key(video_id, model_name, language):
+        return {"video_id": video_id, "model_name": model_name, "language": language or ""}
+
+
+transcript_store = TranscriptStore(
+    max_bytes=settings.TRANSCRIPT_CACHE_MAX_BYTES,
+    max_age=settings.TRANSCRIPT_CACHE_MAX_AGE,
+)
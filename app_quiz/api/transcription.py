@@ -0,0 +1,315 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+from django.conf import settings
+from whisper.audio import SAMPLE_RATE, load_audio
+
+from .vad import FRAME_SECONDS, frame_energy
+from .whisper_models import configure_cpu_threads, model_registry, transcribe_options
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def find_cut_points(audio, chunk_seconds, search_seconds, sr=SAMPLE_RATE, first_chunk_seconds=None):
+    """
+    Choose sample offsets that split the audio into chunks of roughly `chunk_seconds`.
+
+    Each cut is moved to the quietest frame within `search_seconds` of its
+    nominal position, so chunks preferably end in a pause rather than mid-word.
+    A shorter `first_chunk_seconds` makes the first chunk finish early, so
+    streamed segments show up quickly.
+
+    Returns:
+        list: Sample offsets starting with 0 and ending with len(audio)
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * sr)
+    first = int(first_chunk_seconds * sr) if first_chunk_seconds else chunk
+    if total <= first:
+        return [0, total]
+
+    energy = frame_energy(audio, sr)
+    frame = int(sr * FRAME_SECONDS)
+    search_frames = int(search_seconds / FRAME_SECONDS)
+    cuts = [0]
+
+    nominal = first
+    while nominal < total - min(first, chunk) // 2:
+        center = nominal // frame
+        low = max(cuts[-1] // frame + 1, center - search_frames)
+        high = min(len(energy), center + search_frames + 1)
+        if low < high:
+            cut = (low + int(np.argmin(energy[low:high]))) * frame
+        else:
+            cut = nominal
+        cuts.append(cut)
+        nominal = cut + chunk
+    cuts.append(total)
+    return cuts
+
+
+def make_windows(cuts, overlap_seconds, total, sr=SAMPLE_RATE):
+    """
+    Turn cut points into overlapping windows.
+
+    Returns:
+        list: (window_start, window_end, core_start, core_end) in samples; the core
+        is the part of the window this chunk is responsible for when stitching
+    """
+    overlap = int(overlap_seconds * sr)
+    return [
+        (max(0, start - overlap), min(total, end + overlap), start, end)
+        for start, end in zip(cuts, cuts[1:])
+    ]
+
+
+def stitch_segments(window_results, windows, sr=SAMPLE_RATE):
+    """
+    Merge per-window segments into one timeline without duplicates.
+
+    Segment timestamps are shifted to absolute positions; a segment is kept only
+    by the window whose core region contains its midpoint, which drops the copies
+    transcribed twice in the overlaps.
+
+    Returns:
+        list: Segments with absolute start/end in seconds, ordered by start
+    """
+    stitched = []
+    for segments, (window_start, _, core_start, core_end) in zip(window_results, windows):
+        offset = window_start / sr
+        for segment in segments:
+            start = segment["start"] + offset
+            end = segment["end"] + offset
+            midpoint = (start + end) / 2
+            if core_start / sr <= midpoint < core_end / sr:
+                stitched.append({**segment, "start": start, "end": end})
+    stitched.sort(key=lambda segment: segment["start"])
+    for index, segment in enumerate(stitched):
+        segment["id"] = index
+    return stitched
+
+
+def _init_worker(threads):
+    if settings.WHISPER_CPU_PROFILE:
+        configure_cpu_threads(settings.WHISPER_PARALLEL_WORKERS)
+        return
+
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _transcribe_window(model_name, language, audio):
+    # Runs inside a pool process; each process keeps its own copy of the model
+    model = model_registry.get(model_name)
+    result = model.transcribe(audio, language=language, **transcribe_options(model))
+    return result["segments"], result.get("language")
+
+
+def get_process_pool():
+    """
+    Return the long-lived process pool used for parallel chunk transcription.
+
+    Processes are spawned rather than forked so they don't inherit torch thread
+    pools or open database connections, and torch intra-op threads are split
+    evenly between them to avoid oversubscribing the cores.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.WHISPER_PARALLEL_WORKERS
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+    return _pool
+
+
+def find_weak_regions(segments, logprob_threshold, no_speech_threshold, merge_gap_seconds):
+    """
+    Find the stretches of a transcript the model was unsure about.
+
+    A segment is weak when its avg_logprob is below `logprob_threshold`, unless
+    its no_speech_prob is above `no_speech_threshold` (then it is most likely
+    silence or music, which a larger model would not improve). Weak segments
+    separated by less than `merge_gap_seconds` are merged into one region so the
+    larger model sees whole sentences.
+
+    Returns:
+        list: (start, end) tuples in seconds, in order
+    """
+    regions = []
+    for segment in segments:
+        if segment.get("avg_logprob", 0.0) >= logprob_threshold:
+            continue
+        if segment.get("no_speech_prob", 0.0) > no_speech_threshold:
+            continue
+        if regions and segment["start"] - regions[-1][1] < merge_gap_seconds:
+            regions[-1][1] = max(regions[-1][1], segment["end"])
+        else:
+            regions.append([segment["start"], segment["end"]])
+    return [(start, end) for start, end in regions]
+
+
+def escalate_weak_segments(audio, result, model_name, language=None, sr=SAMPLE_RATE):
+    """
+    Re-transcribe low-confidence parts of a result with a larger model.
+
+    Every weak region (see find_weak_regions) is cut out of the waveform with
+    settings.WHISPER_ESCALATION_PADDING_SECONDS of context on both sides and
+    transcribed by `model_name`. Its segments replace the original ones whose
+    midpoint lies inside the region; the rest of the transcript is untouched.
+
+    Args:
+        audio (np.ndarray): 16 kHz float32 waveform the result was produced from
+        result (dict): Whisper-style result of the first pass
+        model_name (str): Larger Whisper model used for the weak regions
+        language (str): Spoken language, None to use the language of the first pass
+
+    Returns:
+        dict: Whisper-style result with an additional "escalated_seconds" entry
+    """
+    regions = find_weak_regions(
+        result["segments"],
+        settings.WHISPER_ESCALATION_LOGPROB_THRESHOLD,
+        settings.WHISPER_ESCALATION_NO_SPEECH_THRESHOLD,
+        settings.WHISPER_ESCALATION_MERGE_GAP_SECONDS,
+    )
+    if not regions:
+        return {**result, "escalated_seconds": 0.0}
+
+    language = language or result.get("language")
+    padding = int(settings.WHISPER_ESCALATION_PADDING_SECONDS * sr)
+    windows = [
+        (max(0, int(start * sr) - padding), min(len(audio), int(end * sr) + padding), int(start * sr), int(end * sr))
+        for start, end in regions
+    ]
+
+    if settings.WHISPER_PARALLEL_WORKERS > 1:
+        pool = get_process_pool()
+        futures = [pool.submit(_transcribe_window, model_name, language, audio[start:end]) for start, end, _, _ in windows]
+        window_results = [future.result()[0] for future in futures]
+    else:
+        with model_registry.acquire(model_name) as model:
+            window_results = [
+                model.transcribe(audio[start:end], language=language, **transcribe_options(model))["segments"]
+                for start, end, _, _ in windows
+            ]
+
+    def in_region(segment):
+        midpoint = (segment["start"] + segment["end"]) / 2
+        return any(start <= midpoint <= end for start, end in regions)
+
+    kept = [segment for segment in result["segments"] if not in_region(segment)]
+    replacements = stitch_segments(window_results, windows, sr)
+    segments = sorted(kept + replacements, key=lambda segment: segment["start"])
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+
+    return {
+        **result,
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "escalated_seconds": sum(end - start for start, end in regions),
+    }
+
+
+def transcribe_audio(audio, model_name=None, language=None, on_segments=None):
+    """
+    Transcribe a waveform, splitting long audio across the process pool.
+
+    Audio longer than settings.WHISPER_CHUNK_SECONDS is cut at quiet points into
+    overlapping windows that are transcribed in parallel when
+    settings.WHISPER_PARALLEL_WORKERS is greater than 1. Otherwise the shared
+    in-process model transcribes the whole file.
+
+    With `on_segments` the windows are handed over as soon as each one is done,
+    in order, starting with a short first window
+    (settings.WHISPER_STREAM_FIRST_CHUNK_SECONDS). Without a process pool the
+    windows are then transcribed one after another by the shared model.
+
+    When settings.WHISPER_ESCALATION_MODEL names a different model, low-confidence
+    segments of that first pass are re-transcribed with it afterwards.
+
+    Args:
+        audio (np.ndarray | str): 16 kHz float32 waveform or path to an audio file
+        model_name (str): Whisper model to use (default: settings.WHISPER_MODEL_NAME)
+        language (str): Spoken language, None to auto-detect
+        on_segments (callable): Optional callback receiving the list of final
+            first-pass segments of every window, with absolute timestamps
+
+    Returns:
+        dict: Whisper-style result with "text", "segments" and "language", plus
+        "escalated_seconds" when escalation is enabled
+    """
+    model_name = model_name or settings.WHISPER_MODEL_NAME
+    escalation_model = settings.WHISPER_ESCALATION_MODEL
+    if escalation_model and escalation_model != model_name and isinstance(audio, str):
+        # The weak regions are cut out of the waveform later on
+        audio = load_audio(audio)
+
+    result = _transcribe_first_pass(audio, model_name, language, on_segments)
+
+    if escalation_model and escalation_model != model_name:
+        result = escalate_weak_segments(audio, result, escalation_model, language)
+    return result
+
+
+def _transcribe_first_pass(audio, model_name, language, on_segments):
+    workers = settings.WHISPER_PARALLEL_WORKERS
+
+    if workers <= 1 and on_segments is None:
+        with model_registry.acquire(model_name) as model:
+            return model.transcribe(audio, language=language, **transcribe_options(model))
+
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+
+    cuts = find_cut_points(
+        audio,
+        settings.WHISPER_CHUNK_SECONDS,
+        settings.WHISPER_CHUNK_SEARCH_SECONDS,
+        first_chunk_seconds=settings.WHISPER_STREAM_FIRST_CHUNK_SECONDS if on_segments else None,
+    )
+    windows = make_windows(cuts, settings.WHISPER_CHUNK_OVERLAP_SECONDS, len(audio))
+
+    if workers <= 1:
+        outcomes = []
+        with model_registry.acquire(model_name) as model:
+            for window in windows:
+                result = model.transcribe(audio[window[0]:window[1]], language=language, **transcribe_options(model))
+                # Keep the language detected in the first window for the rest of the file
+                language = language or result.get("language")
+                outcomes.append((result["segments"], result.get("language")))
+                on_segments(stitch_segments([result["segments"]], [window]))
+    else:
+        pool = get_process_pool()
+        futures = [
+            pool.submit(_transcribe_window, model_name, language, audio[start:end])
+            for start, end, _, _ in windows
+        ]
+        outcomes = []
+        try:
+            for future, window in zip(futures, windows):
+                outcomes.append(future.result())
+                if on_segments:
+                    on_segments(stitch_segments([outcomes[-1][0]], [window]))
+        except BaseException:
+            # E.g. a cancelled job: windows that have not started yet don't take up the pool
+            for future in futures:
+                future.cancel()
+            raise
+
+    segments = stitch_segments([segments for segments, _ in outcomes], windows)
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language or outcomes[0][1],
+    }
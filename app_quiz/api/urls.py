@@ -1,11 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import QuizViewSet, CreateQuizFromUrlView
+from .events import job_events
+from .views import (
+    QuizViewSet,
+    CreateQuizFromUrlView,
+    QuizGenerationJobDetailView,
+    CreateQuizBatchView,
+    QuizGenerationBatchDetailView,
+)
 
 router = DefaultRouter()
 router.register(r"quizzes", QuizViewSet, basename="quiz")
 
 urlpatterns = [
     path("createQuiz/", CreateQuizFromUrlView.as_view(), name="create_quiz_from_url"),
+    path("createQuizBatch/", CreateQuizBatchView.as_view(), name="create_quiz_batch"),
+    path("jobs/<int:pk>/", QuizGenerationJobDetailView.as_view(), name="quiz_job_detail"),
+    path("jobs/<int:pk>/events/", job_events, name="quiz_job_events"),
+    path("batches/<int:pk>/", QuizGenerationBatchDetailView.as_view(), name="quiz_batch_detail"),
     path("", include(router.urls)),
 ]
\ No newline at end of file
@@ -1,39 +1,174 @@
 import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
 import yt_dlp
-import whisper
+from django.conf import settings
+from whisper.audio import SAMPLE_RATE, load_audio
+
+from .audio import load_audio_from_info
+from .captions import fetch_caption_transcript, segments_to_text
+from .metrics import PIPELINE_RUNS, PIPELINE_STAGE_DURATION, REALTIME_FACTOR, YTDLP_ERRORS
+from .retries import download_retrying
+from .singleflight import SingleFlight
+from .transcript_cache import transcript_store
+from .transcription import transcribe_audio
+from .vad import trim_silence
+
+YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtu.be"}
+YOUTUBE_PATH_PREFIXES = ("/shorts/", "/embed/", "/live/", "/v/")
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+# Concurrent requests for the same video share one download and transcription
+inflight_transcriptions = SingleFlight()
+
+LIVE_STATUSES = {"is_live", "is_upcoming", "post_live"}
+PLAYLIST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{10,64}$")
+
+# Long-lived YoutubeDL instances for metadata requests, one per thread
+_metadata_clients = threading.local()
+
+# Probes of batch requests, bounded by settings.QUIZ_PROBE_MAX_CONCURRENCY
+_probe_executor = None
+_probe_executor_lock = threading.Lock()
 
 
-def download_and_transcribe(url, media_root="media"):
+def extract_video_id(url):
     """
-    Download audio from a YouTube video and transcribe it to text.
+    Extract the 11-character video id from any common YouTube URL shape.
 
-    This function:
-    - Downloads the audio from the provided YouTube URL as VIDEO_ID.m4a/mp3/webm
-    - Uses the Whisper 'tiny' model to transcribe the audio into text
-    - Deletes the audio file after transcription
-    - Returns both transcript and video title
+    Supports youtube.com/watch?v=, youtu.be/, m.youtube.com, music.youtube.com,
+    /shorts/, /embed/ and /live/ URLs, with or without protocol and extra
+    query parameters such as ?si= or &t=.
 
     Args:
-        url (str): The URL of the YouTube video
-        media_root (str): Directory to save temporary audio files (default: "media")
+        url (str): The YouTube URL
 
     Returns:
-        tuple: (transcript_text, video_title)
+        str: The video id
 
     Raises:
-        yt_dlp.utils.DownloadError: If the video cannot be downloaded
-        RuntimeError: If transcription fails
+        ValueError: If the URL is not a YouTube video URL
+    """
+    if not url or not isinstance(url, str):
+        raise ValueError("URL must be a non-empty string.")
+
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host not in YOUTUBE_HOSTS:
+        raise ValueError(f"Not a YouTube URL: {url}")
+
+    video_id = None
+    if host == "youtu.be":
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    elif parsed.path == "/watch":
+        video_id = parse_qs(parsed.query).get("v", [None])[0]
+    else:
+        for prefix in YOUTUBE_PATH_PREFIXES:
+            if parsed.path.startswith(prefix):
+                video_id = parsed.path[len(prefix):].split("/")[0]
+                break
+
+    if not video_id or not VIDEO_ID_PATTERN.match(video_id):
+        raise ValueError(f"Invalid YouTube video id in URL: {url}")
+    return video_id
+
+
+def normalize_youtube_url(url):
+    """
+    Return the canonical https://www.youtube.com/watch?v=VIDEO_ID form of a YouTube URL.
+
+    Raises:
+        ValueError: If the URL is not a YouTube video URL
+    """
+    return f"https://www.youtube.com/watch?v={extract_video_id(url)}"
+
+
+def validate_youtube_url(url):
     """
-    
-    # Create media folder if not existing
-    os.makedirs(media_root, exist_ok=True)
-    
+    Check whether the URL points to a YouTube video.
+
+    Returns:
+        bool: True for a valid YouTube video URL, False otherwise
+    """
+    try:
+        extract_video_id(url)
+    except ValueError:
+        return False
+    return True
+
+
+def extract_playlist_id(url):
+    """
+    Extract the playlist id from a YouTube playlist URL (youtube.com/playlist?list=).
+
+    Raises:
+        ValueError: If the URL is not a YouTube playlist URL
+    """
+    if not url or not isinstance(url, str):
+        raise ValueError("URL must be a non-empty string.")
+
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    if (parsed.hostname or "").lower() not in YOUTUBE_HOSTS or parsed.path != "/playlist":
+        raise ValueError(f"Not a YouTube playlist URL: {url}")
+
+    playlist_id = parse_qs(parsed.query).get("list", [None])[0]
+    if not playlist_id or not PLAYLIST_ID_PATTERN.match(playlist_id):
+        raise ValueError(f"Invalid YouTube playlist id in URL: {url}")
+    return playlist_id
+
+
+def normalize_playlist_url(url):
+    """
+    Return the canonical https://www.youtube.com/playlist?list=PLAYLIST_ID form of a playlist URL.
+
+    Raises:
+        ValueError: If the URL is not a YouTube playlist URL
+    """
+    return f"https://www.youtube.com/playlist?list={extract_playlist_id(url)}"
+
+
+class VideoRejectedError(ValueError):
+    """Raised when a video exceeds the configured admission limits."""
+
+
+class TranscriptionCancelled(Exception):
+    """Raised when every caller waiting for a transcription has cancelled it."""
+
+
+def get_ydl_options(scratch_dir=None):
+    """
+    Build the yt-dlp options shared by the metadata probe and the download.
+
+    Args:
+        scratch_dir (str): Directory for downloaded files, None for metadata-only use
+
+    Returns:
+        dict: Options for yt_dlp.YoutubeDL
+    """
+    streaming = settings.WHISPER_STREAMING
+
     # yt-dlp options - elegant and automatic
     ydl_opts = {
-        'format': 'm4a/bestaudio/best',  # Try m4a first, fallback to best audio
+        # Streaming prefers webm: unlike m4a it can be decoded from a non-seekable pipe
+        'format': 'bestaudio[ext=webm]/m4a/bestaudio/best' if streaming else 'm4a/bestaudio/best',
         "quiet": True,
         "noplaylist": True,
-        'outtmpl': os.path.join(media_root, '%(id)s.%(ext)s'),  # Save as VIDEO_ID.ext
+        "continuedl": True,  # Resume partial downloads left by an interrupted attempt
         'http_headers': {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept-Language': 'en-US,en;q=0.8',
@@ -42,34 +177,559 @@ def download_and_transcribe(url, media_root="media"):
             'Origin': 'https://www.youtube.com'
         },
     }
-    
-    audio_filename = None
+    if scratch_dir:
+        ydl_opts['outtmpl'] = os.path.join(scratch_dir, '%(id)s.%(ext)s')  # Save as VIDEO_ID.ext
+    return ydl_opts
+
+
+def get_metadata_client(flat=False):
+    """
+    Return this thread's long-lived YoutubeDL for metadata requests.
+
+    Creating a YoutubeDL loads all extractors, and each instance caches YouTube's
+    player data, so probes reuse one instance per thread instead of building a
+    new one per request (YoutubeDL is not thread-safe). Downloads keep their own
+    instance because they need a per-run scratch directory.
+
+    Args:
+        flat (bool): Return the instance that lists playlist entries without resolving them
+
+    Returns:
+        yt_dlp.YoutubeDL: The shared instance
+    """
+    key = "flat" if flat else "video"
+    ydl = getattr(_metadata_clients, key, None)
+    if ydl is None:
+        ydl_opts = get_ydl_options()
+        if flat:
+            ydl_opts.update({
+                "noplaylist": False,
+                "extract_flat": "in_playlist",
+                "playlistend": settings.QUIZ_BATCH_MAX_VIDEOS,
+            })
+        ydl = yt_dlp.YoutubeDL(ydl_opts)
+        setattr(_metadata_clients, key, ydl)
+    return ydl
+
+
+def select_model_for_duration(duration):
+    """
+    Pick the most accurate Whisper model whose expected runtime fits the budget.
+
+    settings.WHISPER_MODEL_REALTIME_FACTORS lists models from most to least
+    accurate with their processing seconds per audio second. The first one that
+    finishes `duration` seconds of audio within
+    settings.QUIZ_TRANSCRIPTION_BUDGET_SECONDS wins; otherwise the fastest is used.
+
+    Args:
+        duration (float): Audio length in seconds
+
+    Returns:
+        str: Whisper model name
+    """
+    factors = settings.WHISPER_MODEL_REALTIME_FACTORS
+    if not factors or not duration:
+        return settings.WHISPER_MODEL_NAME
+    for model_name, factor in factors.items():
+        if duration * factor <= settings.QUIZ_TRANSCRIPTION_BUDGET_SECONDS:
+            return model_name
+    return min(factors, key=factors.get)
+
+
+def probe_video(url):
+    """
+    Fetch video metadata without downloading and check it against the admission limits.
+
+    Rejects live streams, videos of unknown or excessive duration
+    (settings.QUIZ_MAX_VIDEO_SECONDS) and audio larger than
+    settings.QUIZ_MAX_AUDIO_BYTES, before any media bytes are fetched.
+
+    Args:
+        url (str): The URL of the YouTube video
+
+    Returns:
+        dict: video_id, title, duration, filesize and the selected model_name
+
+    Raises:
+        VideoRejectedError: If the video exceeds a limit or cannot be probed
+    """
+    try:
+        info = get_metadata_client().extract_info(url, download=False)
+    except yt_dlp.DownloadError as error:
+        raise VideoRejectedError(f"Video metadata could not be loaded: {error}")
+
+    return admit_video(info)
+
+
+def get_probe_executor():
+    """
+    Return the process-wide executor for metadata probes.
+
+    Its threads live as long as the process, so each keeps its YoutubeDL
+    instance (see get_metadata_client) across requests.
+    """
+    global _probe_executor
+    with _probe_executor_lock:
+        if _probe_executor is None:
+            _probe_executor = ThreadPoolExecutor(
+                max_workers=settings.QUIZ_PROBE_MAX_CONCURRENCY,
+                thread_name_prefix="quiz-probe",
+            )
+    return _probe_executor
+
+
+def _reset_probe_executor_after_fork():
+    global _probe_executor
+    _probe_executor = None
+
+
+# A forked child has none of the parent's pool threads
+os.register_at_fork(after_in_child=_reset_probe_executor_after_fork)
+
+
+def probe_videos(urls):
+    """
+    Probe several videos concurrently (see probe_video).
+
+    A batch request probes up to settings.QUIZ_BATCH_MAX_VIDEOS URLs; one
+    after another that could exceed the WSGI timeout, so they run on the
+    shared probe pool.
+
+    Args:
+        urls (list): Video URLs
+
+    Returns:
+        list: One (url, video, error) tuple per URL in input order, where
+        exactly one of video and error (a VideoRejectedError) is set
+    """
+    def probe(url):
+        try:
+            return url, probe_video(url), None
+        except VideoRejectedError as error:
+            return url, None, error
+
+    return list(get_probe_executor().map(probe, urls))
+
+
+def admit_video(info):
+    """
+    Check video metadata against the admission limits.
+
+    Args:
+        info (dict): yt-dlp info dict, or a flat playlist entry
+
+    Returns:
+        dict: video_id, title, duration, filesize and the selected model_name
+
+    Raises:
+        VideoRejectedError: If the video exceeds a limit
+    """
+    if info.get("is_live") or info.get("live_status") in LIVE_STATUSES:
+        raise VideoRejectedError("Live streams are not supported.")
+
+    duration = info.get("duration")
+    if not duration:
+        raise VideoRejectedError("Video duration is unknown.")
+    if duration > settings.QUIZ_MAX_VIDEO_SECONDS:
+        raise VideoRejectedError(
+            f"Video is too long ({int(duration) // 60} min); "
+            f"the limit is {settings.QUIZ_MAX_VIDEO_SECONDS // 60} min."
+        )
+
+    filesize = info.get("filesize") or info.get("filesize_approx")
+    if filesize and filesize > settings.QUIZ_MAX_AUDIO_BYTES:
+        raise VideoRejectedError(
+            f"Audio is too large ({int(filesize) // 2**20} MB); "
+            f"the limit is {settings.QUIZ_MAX_AUDIO_BYTES // 2**20} MB."
+        )
+
+    return {
+        "video_id": info.get("id", ""),
+        "title": info.get("title", "Untitled Video"),
+        "duration": duration,
+        "filesize": filesize,
+        "model_name": select_model_for_duration(duration),
+    }
+
+
+def expand_playlist(url):
+    """
+    List the videos of a playlist with a single flat yt-dlp request.
+
+    Only the playlist page is fetched; entries carry id, title and duration,
+    which is enough for the admission limits. At most
+    settings.QUIZ_BATCH_MAX_VIDEOS entries are returned.
+
+    Args:
+        url (str): Canonical playlist URL
+
+    Returns:
+        tuple: (playlist_title, entries) where entries are flat info dicts with a
+        canonical video "url"
+
+    Raises:
+        VideoRejectedError: If the playlist cannot be loaded
+    """
+    try:
+        info = get_metadata_client(flat=True).extract_info(url, download=False)
+    except yt_dlp.DownloadError as error:
+        raise VideoRejectedError(f"Playlist could not be loaded: {error}")
+
+    entries = []
+    for entry in info.get("entries") or []:
+        video_id = (entry or {}).get("id")
+        if not video_id or not VIDEO_ID_PATTERN.match(video_id):
+            continue  # Deleted or private videos show up without a usable id
+        entries.append({**entry, "url": normalize_youtube_url(f"youtu.be/{video_id}")})
+    return info.get("title", ""), entries[:settings.QUIZ_BATCH_MAX_VIDEOS]
+
+
+def download_and_transcribe(
+    url, media_root=None, model_name=None, language=None, progress=None, checkpoint=None, cancelled=None
+):
+    """
+    Download audio from a YouTube video and transcribe it to text.
+
+    This function:
+    - Returns the stored transcript right away if the video was transcribed before
+    - Attaches to an in-flight transcription of the same video instead of starting another
+    - Uses existing YouTube captions when an acceptable track exists (settings.CAPTIONS_ENABLED)
+    - Streams the audio from the provided YouTube URL straight into the decoder
+      (settings.WHISPER_STREAMING), or downloads it into a private scratch directory
+    - Retries metadata and media requests failing with transient errors, with
+      exponential backoff; interrupted downloads resume where they stopped
+    - Optionally cuts silence and music out before transcription (settings.WHISPER_VAD_ENABLED)
+    - Uses the shared Whisper model (default 'tiny') to transcribe the audio into text
+    - Re-transcribes low-confidence segments with settings.WHISPER_ESCALATION_MODEL, if set
+    - Stops between download chunks and transcription windows once cancelled
+    - Deletes any scratch files after transcription
+    - Returns both transcript and video title
+
+    Args:
+        url (str): The URL of the YouTube video
+        media_root (str): Directory for per-run scratch directories
+            (default: settings.QUIZ_SCRATCH_DIR, or the system temp dir when unset)
+        model_name (str): Whisper model to use (default: settings.WHISPER_MODEL_NAME)
+        language (str): Spoken language passed to Whisper, None to auto-detect
+        progress (callable): Optional callback invoked as progress(stage, **info)
+            when the pipeline enters a new stage ("downloading", "transcribing");
+            `info` carries per-run measurements such as source, skipped_seconds
+            and escalated_seconds. The "download" (byte counts) and "segment"
+            (newly transcribed segments) stages report live progress only
+        checkpoint (dict): Enables checkpointing when not None. Completed stages
+            (scratch_dir, metadata, audio, segments) are reported to this caller's
+            `progress` as progress("checkpoint", **state); passing the merged state
+            of an interrupted run resumes after its last completed stage
+        cancelled (callable): Optional check returning True once the caller no
+            longer needs the result. A run shared with other callers is only
+            stopped when all of them have cancelled
+
+    Returns:
+        tuple: (transcript_text, video_title)
+
+    Raises:
+        yt_dlp.utils.DownloadError: If the video cannot be downloaded
+        RuntimeError: If transcription fails
+        TranscriptionCancelled: If the run was cancelled
+    """
+    model_name = model_name or settings.WHISPER_MODEL_NAME
+
+    # Same video under any URL shape maps to the same cache entry
+    try:
+        video_id = extract_video_id(url)
+    except ValueError:
+        video_id = None
+
+    if video_id:
+        cached = transcript_store.get(video_id, model_name, language)
+        if cached is not None:
+            PIPELINE_RUNS.inc(source="cache", outcome="ok")
+            return cached
+
+    # Checkpoints go to the leading caller only, callers attached to its run share the result
+    save_checkpoint = None
+    if checkpoint is not None and progress is not None:
+        def save_checkpoint(**state):
+            progress("checkpoint", **state)
+
+    key = (video_id or url, model_name, language or "")
+
+    def check_cancelled():
+        if inflight_transcriptions.cancelled(key):
+            raise TranscriptionCancelled("Transcription was cancelled.")
+
+    try:
+        return inflight_transcriptions.do(
+            key,
+            lambda broadcast: _download_and_transcribe(
+                url, video_id, media_root, model_name, language, broadcast, checkpoint or {}, save_checkpoint,
+                check_cancelled,
+            ),
+            listener=progress,
+            cancelled=cancelled,
+            poll_seconds=settings.QUIZ_CANCEL_POLL_SECONDS,
+        )
+    except CancelledError:
+        # This caller gave up waiting for a run another caller leads
+        raise TranscriptionCancelled("Transcription was cancelled.") from None
+
+
+def _download_and_transcribe(
+    url, video_id, media_root, model_name, language, progress, checkpoint, save_checkpoint, check_cancelled
+):
+    checkpointing = save_checkpoint is not None
+    if not checkpointing:
+        def save_checkpoint(**state):
+            pass
+
+    # Every run gets its own private scratch directory, so concurrent downloads of
+    # the same video in other processes never overwrite or delete each other's file.
+    # A resumed run reuses the directory of the interrupted one, with its partial download
+    scratch_dir = checkpoint.get("scratch_dir")
+    if not scratch_dir or not os.path.isdir(scratch_dir):
+        media_root = media_root or settings.QUIZ_SCRATCH_DIR
+        if media_root:
+            os.makedirs(media_root, exist_ok=True)
+        scratch_dir = tempfile.mkdtemp(prefix=f"{video_id or 'audio'}-", dir=media_root)
+        save_checkpoint(scratch_dir=scratch_dir)
+    streaming = settings.WHISPER_STREAMING
+    ydl_opts = get_ydl_options(scratch_dir)
+
     transcript = ""
     video_title = ""
-    
+    source = "asr"
+    stage = "metadata"
+    started = time.perf_counter()
+
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Extract info and download in one step
-            info = ydl.extract_info(url, download=True)  # yt-dlp handles URL normalization!
-            
-            # Get the exact filename that yt-dlp created
-            audio_filename = ydl.prepare_filename(info)
-            
+            progress("downloading")
+
+            # Audio from an earlier run of this job makes metadata, captions and download unnecessary
+            audio = _load_checkpointed_audio(checkpoint)
+            if audio is not None and checkpoint.get("metadata"):
+                info = checkpoint["metadata"]
+            else:
+                audio = None
+                # Metadata first; yt-dlp handles URL normalization!
+                with PIPELINE_STAGE_DURATION.time(stage=stage):
+                    info = _extract_info(ydl, url)
+                save_checkpoint(metadata={"title": info.get("title"), "duration": info.get("duration")})
+
             # Get video title from info
-            video_title = info.get("title", "Untitled Video")
-            
-            # Load Whisper model and transcribe
-            model = whisper.load_model("tiny")
-            result = model.transcribe(audio_filename)
-            transcript = result["text"].strip()
+            video_title = info.get("title") or "Untitled Video"
+
+            check_cancelled()
+
+            # Fast path: existing captions are far cheaper than audio download plus Whisper
+            segments, track = None, None
+            if audio is None and settings.CAPTIONS_ENABLED:
+                stage = "captions"
+                with PIPELINE_STAGE_DURATION.time(stage=stage):
+                    segments, track = fetch_caption_transcript(ydl, info, language)
+
+            if segments:
+                source = "captions"
+                progress(
+                    "transcribing", source="captions", caption_language=track["language"], caption_kind=track["kind"]
+                )
+                progress("segment", segments=_segment_events(segments))
+                transcript = segments_to_text(segments)
+            else:
+                progress("downloading", source="asr")
+                if audio is None:
+                    stage = "download"
+                    with PIPELINE_STAGE_DURATION.time(stage=stage):
+                        audio = _download_audio(
+                            ydl, url, info, streaming, _download_progress_hook(progress, check_cancelled)
+                        )
+                    if checkpointing:
+                        save_checkpoint(audio=_save_audio(audio, scratch_dir))
 
+                # Segments transcribed before an interruption are kept; only the rest is transcribed
+                done_segments = list(checkpoint.get("segments") or [])
+                offset = checkpoint.get("transcribed_seconds") or 0.0
+                if offset:
+                    if isinstance(audio, str):
+                        audio = load_audio(audio)
+                    audio = audio[int(offset * SAMPLE_RATE):]
+
+                def on_segments(segments):
+                    # Whisper can only be stopped between windows
+                    check_cancelled()
+                    events = _segment_events(_shift_segments(segments, offset))
+                    if not events:
+                        return
+                    if settings.WHISPER_STREAM_SEGMENTS:
+                        progress("segment", segments=events)
+                    if checkpointing:
+                        done_segments.extend(events)
+                        save_checkpoint(segments=done_segments, transcribed_seconds=events[-1]["end"])
+
+                if not settings.WHISPER_STREAM_SEGMENTS and not checkpointing:
+                    on_segments = None
+
+                check_cancelled()
+                stage = "transcribe"
+                resumed_text = " ".join(segment["text"] for segment in checkpoint.get("segments") or [])
+                transcribe_started = time.perf_counter()
+                with PIPELINE_STAGE_DURATION.time(stage=stage):
+                    if settings.WHISPER_VAD_ENABLED:
+                        result = _transcribe_speech(audio, model_name, language, progress, on_segments)
+                    else:
+                        # Transcribe with the shared model, in parallel chunks for long audio
+                        progress("transcribing")
+                        result = transcribe_audio(audio, model_name, language, on_segments)
+                transcript = f"{resumed_text} {result['text'].strip()}".strip()
+                if info.get("duration") and not offset:
+                    REALTIME_FACTOR.observe(
+                        (time.perf_counter() - transcribe_started) / info["duration"],
+                        model=model_name or settings.WHISPER_MODEL_NAME,
+                    )
+
+                if "escalated_seconds" in result:
+                    progress(
+                        "escalation",
+                        escalation_model=settings.WHISPER_ESCALATION_MODEL,
+                        escalated_seconds=round(result["escalated_seconds"], 1),
+                    )
+
+    except TranscriptionCancelled:
+        PIPELINE_RUNS.inc(source=source, outcome="cancelled")
+        raise
     except yt_dlp.DownloadError as error:
+        YTDLP_ERRORS.inc(stage=stage)
+        PIPELINE_RUNS.inc(source=source, outcome="error")
         raise RuntimeError(f"yt-dlp download failed: {str(error)}")
     except Exception as error:
+        PIPELINE_RUNS.inc(source=source, outcome="error")
         raise RuntimeError(f"Unexpected error: {str(error)}")
     finally:
-        # Always cleanup audio file after transcription
-        if audio_filename and os.path.exists(audio_filename):
-            os.remove(audio_filename)
-    
-    return transcript, video_title
\ No newline at end of file
+        # Always cleanup scratch files after transcription
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    PIPELINE_RUNS.inc(source=source, outcome="ok")
+    PIPELINE_STAGE_DURATION.observe(time.perf_counter() - started, stage="total")
+    return _store_transcript(video_id, model_name, language, transcript, video_title)
+
+
+def _extract_info(ydl, url):
+    for attempt in download_retrying():
+        with attempt:
+            return ydl.extract_info(url, download=False)
+
+
+def _download_audio(ydl, url, info, streaming, download_hook):
+    """
+    Fetch the audio of the video, retrying transient failures.
+
+    Format URLs expire and YouTube answers stale ones with 403, so every retry
+    extracts fresh metadata first. yt-dlp continues its partial download in the
+    scratch directory; streamed ranges resume inside stream_audio().
+
+    Returns:
+        np.ndarray or str: Decoded waveform when streaming, otherwise the downloaded file path
+    """
+    if not streaming:
+        ydl.add_progress_hook(download_hook)
+    for attempt in download_retrying():
+        with attempt:
+            if attempt.retry_state.attempt_number > 1:
+                info = ydl.extract_info(url, download=False)
+            if streaming:
+                # Decode to 16 kHz PCM in memory while the bytes are still arriving
+                return load_audio_from_info(ydl, info, download_hook)
+            # Download into the scratch directory and use the exact filename yt-dlp created
+            ydl.process_info(info)
+            return info.get("filepath") or ydl.prepare_filename(info)
+
+
+def _save_audio(audio, scratch_dir):
+    # Downloaded files are checkpointed as they are; streamed audio only exists in memory
+    if isinstance(audio, str):
+        return audio
+    path = os.path.join(scratch_dir, "audio.npy")
+    # Decoded samples are exact multiples of 1/32768, so int16 storage is lossless at half the size
+    np.save(path, np.round(audio * 32768).astype(np.int16))
+    return path
+
+
+def _load_checkpointed_audio(checkpoint):
+    path = checkpoint.get("audio")
+    if not path or not os.path.exists(path):
+        return None
+    if path.endswith(".npy"):
+        return np.load(path).astype(np.float32) / 32768.0
+    return path
+
+
+def _shift_segments(segments, offset):
+    if not offset:
+        return segments
+    return [{**segment, "start": segment["start"] + offset, "end": segment["end"] + offset} for segment in segments]
+
+
+def _store_transcript(video_id, model_name, language, transcript, video_title):
+    # Store before the in-flight entry is released so later requests hit the cache
+    if video_id:
+        transcript_store.put(video_id, model_name, language, transcript, video_title)
+    return transcript, video_title
+
+
+def _download_progress_hook(progress, check_cancelled):
+    """
+    Build a yt-dlp progress hook that reports download progress at most once per
+    settings.QUIZ_DOWNLOAD_PROGRESS_INTERVAL seconds, and aborts the download
+    once the run is cancelled.
+    """
+    last_report = [0.0]
+
+    def hook(status):
+        check_cancelled()
+        if status.get("status") not in ("downloading", "finished"):
+            return
+        now = time.monotonic()
+        if status["status"] == "downloading" and now - last_report[0] < settings.QUIZ_DOWNLOAD_PROGRESS_INTERVAL:
+            return
+        last_report[0] = now
+        progress(
+            "download",
+            downloaded_bytes=status.get("downloaded_bytes"),
+            total_bytes=status.get("total_bytes") or status.get("total_bytes_estimate"),
+        )
+
+    return hook
+
+
+def _segment_events(segments):
+    return [
+        {"start": round(segment["start"], 2), "end": round(segment["end"], 2), "text": segment["text"].strip()}
+        for segment in segments
+    ]
+
+
+def _transcribe_speech(audio, model_name, language, progress, on_segments=None):
+    """
+    Transcribe only the speech regions of the audio, keeping original timestamps.
+    """
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+
+    speech, timeline, skipped_seconds = trim_silence(
+        audio, min_silence_seconds=settings.WHISPER_VAD_MIN_SILENCE_SECONDS
+    )
+    progress(
+        "transcribing",
+        audio_seconds=round(len(audio) / SAMPLE_RATE, 1),
+        skipped_seconds=round(skipped_seconds, 1),
+    )
+
+    if not len(speech):
+        return {"text": "", "segments": [], "language": language}
+
+    def on_speech_segments(segments):
+        on_segments(timeline.restore_segments(segments))
+
+    result = transcribe_audio(speech, model_name, language, on_speech_segments if on_segments else None)
+    result["segments"] = timeline.restore_segments(result["segments"])
+    return result
@@ -0,0 +1,132 @@
+import numpy as np
+from whisper.audio import SAMPLE_RATE
+
+FRAME_SECONDS = 0.1
+VAD_FRAME_SECONDS = 0.03
+SPEECH_BAND_HZ = (300, 3400)
+
+
+def frame_energy(audio, sr=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    """
+    Return the RMS energy of consecutive non-overlapping frames of the waveform.
+    """
+    frame = max(1, int(sr * frame_seconds))
+    count = len(audio) // frame
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def detect_speech_regions(
+    audio,
+    sr=SAMPLE_RATE,
+    margin_db=10.0,
+    min_level_db=-45.0,
+    min_band_ratio=0.35,
+    min_speech_seconds=0.25,
+    min_silence_seconds=1.0,
+    padding_seconds=0.2,
+):
+    """
+    Find the parts of a waveform that likely contain speech.
+
+    A 30 ms frame counts as speech when its level is at least `margin_db` above
+    the estimated noise floor (and above `min_level_db` dBFS), and when enough of
+    its energy lies in the speech band, which rejects most rumble and hiss-like
+    music beds. Everything is computed on whole frame matrices in NumPy, so a
+    one-hour file takes well under a second.
+
+    Returns:
+        list: (start_sample, end_sample) tuples of speech regions, in order
+    """
+    frame = int(sr * VAD_FRAME_SECONDS)
+    count = len(audio) // frame
+    if count == 0:
+        return []
+
+    frames = audio[:count * frame].reshape(count, frame).astype(np.float32)
+    spectrum = np.square(np.abs(np.fft.rfft(frames * np.hanning(frame), axis=1)))
+    freqs = np.fft.rfftfreq(frame, 1 / sr)
+    band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+    total_energy = spectrum.sum(axis=1) + 1e-12
+    band_ratio = spectrum[:, band].sum(axis=1) / total_energy
+
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    level_db = 20 * np.log10(rms + 1e-9)
+    noise_floor = np.percentile(level_db, 10)
+    threshold = max(noise_floor + margin_db, min_level_db)
+
+    speech = (level_db >= threshold) & (band_ratio >= min_band_ratio)
+
+    # Frame flags -> runs of consecutive speech frames
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    regions = []
+    max_gap = int(min_silence_seconds / VAD_FRAME_SECONDS)
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] <= max_gap:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    min_frames = int(min_speech_seconds / VAD_FRAME_SECONDS)
+    padding = int(padding_seconds * sr)
+    result = []
+    for start, end in regions:
+        if end - start < min_frames:
+            continue
+        start_sample = max(0, start * frame - padding)
+        end_sample = min(len(audio), end * frame + padding)
+        if result and start_sample <= result[-1][1]:
+            result[-1] = (result[-1][0], end_sample)
+        else:
+            result.append((start_sample, end_sample))
+    return result
+
+
+class SpeechTimeline:
+    """
+    Maps timestamps in speech-only audio back to the original recording.
+    """
+
+    def __init__(self, regions, sr=SAMPLE_RATE):
+        self.sr = sr
+        self.regions = regions
+        lengths = [end - start for start, end in regions]
+        self.compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / sr if regions else np.zeros(0)
+        self.original_starts = np.array([start for start, _ in regions]) / sr
+
+    def to_original(self, seconds):
+        if not self.regions:
+            return seconds
+        index = max(0, int(np.searchsorted(self.compact_starts, seconds, side="right")) - 1)
+        return float(self.original_starts[index] + seconds - self.compact_starts[index])
+
+    def restore_segments(self, segments):
+        return [
+            {**segment, "start": self.to_original(segment["start"]), "end": self.to_original(segment["end"])}
+            for segment in segments
+        ]
+
+
+def trim_silence(audio, sr=SAMPLE_RATE, **options):
+    """
+    Cut non-speech parts out of a waveform.
+
+    Args:
+        audio (np.ndarray): 16 kHz float32 waveform
+        **options: Passed on to detect_speech_regions()
+
+    Returns:
+        tuple: (speech_audio, SpeechTimeline, skipped_seconds)
+    """
+    regions = detect_speech_regions(audio, sr, **options)
+    if regions:
+        speech = np.concatenate([audio[start:end] for start, end in regions])
+    else:
+        speech = audio[:0]
+    skipped_seconds = (len(audio) - len(speech)) / sr
+    return speech, SpeechTimeline(regions, sr), skipped_seconds
@@ -1,54 +1,203 @@
+import math
+
+from django.db import transaction
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from rest_framework import viewsets, status
+from rest_framework import generics, viewsets, status
 from rest_framework.exceptions import MethodNotAllowed, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Quiz
+from ..models import Quiz, QuizGenerationBatch, QuizGenerationJob
+from .jobs import cancel_job, enqueue_job
 from .permissions import IsQuizOwner
-from .serializers import QuizSerializer, CreateQuizFromUrlSerializer
-from .utils import download_and_transcribe
+from .serializers import (
+    QuizSerializer,
+    CreateQuizFromUrlSerializer,
+    QuizGenerationJobSerializer,
+    CreateQuizBatchSerializer,
+    QuizGenerationBatchSerializer,
+)
+from .throttles import JobAdmissionThrottle, admission_wait
+from .utils import VideoRejectedError, admit_video, expand_playlist, probe_video, probe_videos
 
 @extend_schema(
     tags=['Quiz Management'],
-    description="Create a quiz from a video URL.",
+    description="Start creating a quiz from a video URL. Processing runs in the background; "
+                "poll the returned job for its status.",
+    request=CreateQuizFromUrlSerializer,
     responses={
-        201: QuizSerializer,
-        400: OpenApiResponse(description="Bad Request - Invalid URL or processing error"),
+        202: QuizGenerationJobSerializer,
+        400: OpenApiResponse(description="Bad Request - Invalid URL, live stream or video over the size limits"),
         401: OpenApiResponse(description="Unauthorized - Authentication credentials were not provided"),
+        429: OpenApiResponse(description="Too Many Requests - Too many active jobs; retry after the "
+                                         "number of seconds in the Retry-After header"),
     }
 )
 class CreateQuizFromUrlView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [JobAdmissionThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = CreateQuizFromUrlSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         video_url = serializer.validated_data["url"]
 
+        # Cheap metadata probe: reject oversized videos before any bytes are fetched
         try:
-            # Download audio and transcribe with Whisper (yt-dlp handles URL normalization)
-            transcript, video_title = download_and_transcribe(video_url)
-            
-            # For testing: return transcript and video info
-            return Response({
-                "message": "Video successfully transcribed",
-                "video_title": video_title,
-                "transcript": transcript,
-                "url": video_url
-            }, status=status.HTTP_200_OK)
-            
-        except RuntimeError as error:
-            raise ValidationError({"url": f"Processing failed: {str(error)}"})
-
-        # TODO: Next steps after successful transcription:
-        # 1) Gemini → Fragen + Antworten aus transcript generieren
-        # 2) Quiz + Questions in DB speichern
-        # 3) Cleanup: os.remove(audio_file_path)
-
-        # quiz = ...  # erstelltes Quiz-Objekt
-        # return Response(QuizSerializer(quiz).data, status=status.HTTP_201_CREATED)
+            video = probe_video(video_url)
+        except VideoRejectedError as error:
+            raise ValidationError({"url": str(error)})
+
+        # Download and transcription take minutes, so hand them to the job executor
+        job = QuizGenerationJob.objects.create(
+            owner=request.user,
+            video_url=video_url,
+            video_id=video["video_id"][:11],
+            video_title=video["title"][:200],
+            duration=int(video["duration"]),
+            model_name=video["model_name"],
+        )
+        enqueue_job(job)
+
+        job_serializer = QuizGenerationJobSerializer(job, context={"request": request})
+        return Response(job_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(
+    tags=['Quiz Management'],
+    description="Start creating quizzes for several video URLs or a whole playlist. One job per "
+                "video is scheduled in the background; poll the returned batch for aggregate progress. "
+                "Videos over the admission limits are skipped and listed under `rejected`.",
+    request=CreateQuizBatchSerializer,
+    responses={
+        202: QuizGenerationBatchSerializer,
+        400: OpenApiResponse(description="Bad Request - Invalid URLs, playlist not found or no admissible video"),
+        401: OpenApiResponse(description="Unauthorized - Authentication credentials were not provided"),
+        429: OpenApiResponse(description="Too Many Requests - The batch's jobs would exceed the user's batch job "
+                                         "limit; retry after the number of seconds in the Retry-After header"),
+    }
+)
+class CreateQuizBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [JobAdmissionThrottle]
+    batch_admission = True
+
+    def post(self, request, *args, **kwargs):
+        serializer = CreateQuizBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        playlist_url = serializer.validated_data.get("playlist_url", "")
+
+        if playlist_url:
+            # One flat request lists the whole playlist, durations included
+            try:
+                title, entries = expand_playlist(playlist_url)
+            except VideoRejectedError as error:
+                raise ValidationError({"playlist_url": str(error)})
+        else:
+            title = ""
+            entries = [{"url": url} for url in serializer.validated_data["urls"]]
+
+        if playlist_url:
+            results = []
+            for entry in entries:
+                try:
+                    results.append((entry["url"], admit_video(entry), None))
+                except VideoRejectedError as error:
+                    results.append((entry["url"], None, error))
+        else:
+            results = probe_videos([entry["url"] for entry in entries])
+
+        accepted, rejected = [], []
+        for url, video, error in results:
+            if error:
+                rejected.append({"url": url, "error": str(error)})
+            else:
+                accepted.append((url, video))
+
+        if not accepted:
+            field = "playlist_url" if playlist_url else "urls"
+            raise ValidationError({field: "None of the videos can be processed.", "rejected": rejected})
+
+        # The throttle admitted one job; the batch has to fit as a whole
+        wait = admission_wait(request.user, len(accepted), batch=True)
+        if wait is not None:
+            self.throttled(request, math.ceil(wait))
+
+        # Jobs are handed to the shared executor once the whole batch is committed
+        with transaction.atomic():
+            batch = QuizGenerationBatch.objects.create(owner=request.user, playlist_url=playlist_url, title=title[:200])
+            for video_url, video in accepted:
+                job = QuizGenerationJob.objects.create(
+                    owner=request.user,
+                    batch=batch,
+                    video_url=video_url,
+                    video_id=video["video_id"][:11],
+                    video_title=video["title"][:200],
+                    duration=int(video["duration"]),
+                    model_name=video["model_name"],
+                )
+                enqueue_job(job)
+
+        batch_serializer = QuizGenerationBatchSerializer(batch, context={"request": request})
+        return Response({**batch_serializer.data, "rejected": rejected}, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(
+    tags=['Quiz Management'],
+    description="Get the aggregate progress of a batch of quiz generation jobs.",
+    responses={
+        200: QuizGenerationBatchSerializer,
+        401: OpenApiResponse(description="Unauthorized - Authentication credentials were not provided"),
+        404: OpenApiResponse(description="Batch not Found"),
+    }
+)
+class QuizGenerationBatchDetailView(generics.RetrieveAPIView):
+    serializer_class = QuizGenerationBatchSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return QuizGenerationBatch.objects.filter(owner=self.request.user).prefetch_related("jobs")
+
+
+class QuizGenerationJobDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = QuizGenerationJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return QuizGenerationJob.objects.filter(owner=self.request.user)
+
+    @extend_schema(
+        tags=['Quiz Management'],
+        description="Get the status of a quiz generation job.",
+        responses={
+            200: QuizGenerationJobSerializer,
+            401: OpenApiResponse(description="Unauthorized - Authentication credentials were not provided"),
+            404: OpenApiResponse(description="Job not Found"),
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    @extend_schema(
+        tags=['Quiz Management'],
+        description="Cancel a queued or running quiz generation job. The job's status changes to `cancelled` "
+                    "right away. A download stops within about a second; a transcription stops once its "
+                    "current window finishes, which takes up to the time to transcribe "
+                    "`WHISPER_CHUNK_SECONDS` (5 minutes) of audio. No questions are generated for a "
+                    "cancelled job and its scratch files are removed.",
+        responses={
+            204: OpenApiResponse(description="Job cancelled"),
+            401: OpenApiResponse(description="Unauthorized - Authentication credentials were not provided"),
+            404: OpenApiResponse(description="Job not Found"),
+            409: OpenApiResponse(description="Conflict - The job has already finished"),
+        }
+    )
+    def delete(self, request, *args, **kwargs):
+        job = self.get_object()
+        if not cancel_job(job.pk):
+            return Response({"detail": "The job has already finished."}, status=status.HTTP_409_CONFLICT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @extend_schema(
@@ -56,11 +205,14 @@ class CreateQuizFromUrlView(APIView):
     description="Manage quizzes created by users.",
 )
 class QuizViewSet(viewsets.ModelViewSet):
-    queryset = Quiz.objects.all().prefetch_related("questions")
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated, IsQuizOwner]
     http_method_names = ['get', 'patch', 'delete', 'head', 'options']
 
+    def get_queryset(self):
+        # Served by the (owner, -created_at) index in Meta.ordering
+        return Quiz.objects.filter(owner=self.request.user).prefetch_related("questions")
+
     @extend_schema(exclude=True)
     def create(self, request, *args, **kwargs):
         """
@@ -89,8 +241,7 @@ class QuizViewSet(viewsets.ModelViewSet):
             200: QuizSerializer,
             400: OpenApiResponse(description="Bad Request"),
             401: OpenApiResponse(description="User is unauthorized"),
-            403: OpenApiResponse(description="User is not the quiz owner"),
-            404: OpenApiResponse(description="Quiz not Found"),
+            404: OpenApiResponse(description="Quiz not Found or owned by another user"),
         }
     )
     def partial_update(self, request, *args, **kwargs):
@@ -100,8 +251,7 @@ class QuizViewSet(viewsets.ModelViewSet):
         responses={
             204: OpenApiResponse(description="Quiz deleted successfully"),
             401: OpenApiResponse(description="User is unauthorized"),
-            403: OpenApiResponse(description="User is not the quiz owner"),
-            404: OpenApiResponse(description="Quiz not Found"),
+            404: OpenApiResponse(description="Quiz not Found or owned by another user"),
         }
     )
     def destroy(self, request, *args, **kwargs):
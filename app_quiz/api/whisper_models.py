@@ -0,0 +1,236 @@
+import gc
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import whisper
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_threads_configured = False
+
+
+def configure_cpu_threads(concurrency=1):
+    """
+    Pin torch's intra-op and inter-op thread counts for this process.
+
+    Without this every concurrent transcription starts one thread per core and
+    parallel requests oversubscribe the CPU. The intra-op count defaults to the
+    cores divided by `concurrency`, the number of transcriptions this process
+    runs at the same time. Inter-op threads can only be set once per process,
+    before torch runs any parallel work.
+    """
+    global _threads_configured
+    import torch
+
+    threads = settings.WHISPER_CPU_THREADS or max(1, (os.cpu_count() or 1) // max(1, concurrency))
+    torch.set_num_threads(threads)
+    if not _threads_configured:
+        try:
+            torch.set_num_interop_threads(settings.WHISPER_CPU_INTEROP_THREADS)
+        except RuntimeError:
+            logger.warning("Torch inter-op threads were already initialized; keeping the current setting")
+        _threads_configured = True
+
+
+def quantize_model(model):
+    """
+    Apply int8 dynamic quantization to the Linear layers of a Whisper model.
+
+    Whisper uses its own Linear subclass, which torch's quantizer does not match,
+    so those layers are swapped for plain nn.Linear layers sharing the same
+    weights first. The result only runs on CPU.
+    """
+    import torch
+    from whisper.model import Linear
+
+    def to_plain_linear(module):
+        for name, child in module.named_children():
+            if isinstance(child, Linear):
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+            else:
+                to_plain_linear(child)
+
+    to_plain_linear(model)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_model(name, device=None):
+    """
+    Load a Whisper model, applying the CPU inference profile when enabled.
+
+    With settings.WHISPER_CPU_PROFILE the model is always loaded on CPU, its
+    Linear layers are quantized to int8 (settings.WHISPER_CPU_QUANTIZE) and the
+    torch thread counts are pinned for the configured job concurrency.
+    """
+    if not settings.WHISPER_CPU_PROFILE:
+        return whisper.load_model(name, device=device)
+
+    configure_cpu_threads(settings.QUIZ_JOB_MAX_WORKERS)
+    model = whisper.load_model(name, device="cpu")
+    if settings.WHISPER_CPU_QUANTIZE:
+        model = quantize_model(model)
+    return model
+
+
+def transcribe_options(model):
+    """
+    Decoding options matching the model's device.
+
+    Whisper defaults to fp16 and only falls back to fp32 on CPU with a warning,
+    so the precision is chosen explicitly.
+    """
+    return {"fp16": model.device.type == "cuda"}
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide registry of loaded Whisper models.
+
+    Models are loaded lazily, once per process, and keyed by (model name, device).
+    Models that have not been used for `idle_timeout` seconds are dropped so their
+    memory can be reclaimed. Load, hit and eviction counts are tracked so reuse
+    can be verified via `stats()`.
+
+    Whisper installs kv-cache hooks on the model for the duration of a decode,
+    so a single model instance must not run two transcriptions at once. Use
+    `acquire()` for inference; it serializes access per model.
+    """
+
+    def __init__(self, loader=None, idle_timeout=None):
+        self._loader = loader or load_model
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load_locks = {}
+        self._reaper = None
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, name=None, device=None):
+        """
+        Return the loaded model for (name, device), loading it on first use.
+
+        Args:
+            name (str): Whisper model name, defaults to settings.WHISPER_MODEL_NAME
+            device (str): Torch device, defaults to settings.WHISPER_DEVICE
+
+        Returns:
+            whisper.Whisper: The loaded model
+        """
+        return self._get_entry(name, device)["model"]
+
+    @contextmanager
+    def acquire(self, name=None, device=None):
+        """
+        Context manager yielding a model reserved for the calling thread.
+        """
+        entry = self._get_entry(name, device)
+        with entry["lock"]:
+            try:
+                yield entry["model"]
+            finally:
+                entry["last_used"] = time.monotonic()
+
+    def warmup(self, names, device=None):
+        """
+        Load the given models ahead of the first request.
+        """
+        for name in names:
+            self.get(name, device)
+
+    def evict_idle(self):
+        """
+        Drop models that have been idle for longer than `idle_timeout`.
+
+        Returns:
+            int: Number of evicted models
+        """
+        if not self.idle_timeout:
+            return 0
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [
+                key for key, entry in self._entries.items()
+                if entry["last_used"] < deadline and not entry["lock"].locked()
+            ]
+            for key in idle:
+                del self._entries[key]
+                self.evictions += 1
+                logger.info("Evicted idle Whisper model %s on %s", *key)
+        if idle:
+            gc.collect()
+        return len(idle)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "loaded": [f"{name}@{device or 'auto'}" for name, device in self._entries],
+            }
+
+    def _get_entry(self, name, device):
+        key = (name or settings.WHISPER_MODEL_NAME, device or settings.WHISPER_DEVICE)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                entry["last_used"] = time.monotonic()
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Loading happens outside the registry lock so other models stay available;
+        # concurrent callers for the same key wait here and reuse the result.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    entry["last_used"] = time.monotonic()
+                    return entry
+
+            started = time.monotonic()
+            model = self._loader(key[0], device=key[1])
+            entry = {"model": model, "lock": threading.Lock(), "last_used": time.monotonic()}
+
+            with self._lock:
+                self._entries[key] = entry
+                self.loads += 1
+            logger.info(
+                "Loaded Whisper model %s on %s in %.1fs", key[0], key[1] or "auto", time.monotonic() - started
+            )
+
+        self._start_reaper()
+        return entry
+
+    def _start_reaper(self):
+        if not self.idle_timeout or self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_forever, name="whisper-model-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_forever(self):
+        interval = min(self.idle_timeout, 60)
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+
+
+model_registry = WhisperModelRegistry(idle_timeout=settings.WHISPER_MODEL_IDLE_TIMEOUT)
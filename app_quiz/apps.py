@@ -1,5 +1,26 @@
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class QuizAppConfig(AppConfig):
     name = 'app_quiz'
+
+    def ready(self):
+        from core.metrics import REGISTRY
+        from .api.metrics import job_queue_depth
+
+        REGISTRY.register_collector(job_queue_depth)
+
+        if settings.WHISPER_PRELOAD_MODELS:
+            from .api.whisper_models import model_registry
+
+            # Warm up in the background so startup is not blocked; early requests
+            # simply wait for the load in progress instead of starting their own.
+            threading.Thread(
+                target=model_registry.warmup,
+                args=(settings.WHISPER_PRELOAD_MODELS,),
+                name="whisper-warmup",
+                daemon=True,
+            ).start()
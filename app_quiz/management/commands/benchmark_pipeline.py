@@ -0,0 +1,230 @@
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from importlib import metadata
+from pathlib import Path
+
+import yt_dlp
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from whisper.audio import SAMPLE_RATE
+
+from app_quiz.api.audio import READ_SIZE, decode_audio
+from app_quiz.api.transcription import transcribe_audio
+from app_quiz.api.utils import get_ydl_options
+from app_quiz.api.vad import trim_silence
+from app_quiz.api.whisper_models import model_registry
+
+from .benchmark_whisper import AUDIO_EXTENSIONS
+
+STAGES = ("metadata", "download", "decode", "vad", "model_load", "inference")
+PACKAGES = ("yt-dlp", "torch", "openai-whisper", "numpy", "Django")
+
+
+@contextmanager
+def timed(timings, stage):
+    started = time.perf_counter()
+    yield
+    timings.setdefault(stage, []).append(time.perf_counter() - started)
+
+
+def synthesize_fixture(directory, seconds):
+    """
+    Write a `seconds` long Opus/WebM file, like the audio YouTube serves.
+
+    A tone that pauses for a moment every five seconds, so cut point search
+    and silence trimming have something to work with.
+    """
+    path = Path(directory) / f"synthetic-{seconds}s.webm"
+    expression = "0.5*sin(2*PI*220*t)*gt(sin(2*PI*0.2*t),-0.3)"
+    subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+            "-f", "lavfi", "-i", f"aevalsrc='{expression}':s={SAMPLE_RATE}:d={seconds}",
+            "-c:a", "libopus", "-b:a", "48k", str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        ffmpeg = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout.split("\n")[0]
+    except OSError:
+        ffmpeg = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg,
+        "packages": versions,
+    }
+
+
+def compare_results(previous, current, tolerance):
+    """
+    Compare stage timings of two benchmark reports.
+
+    Fixtures are matched by name; a stage regressed when it got slower by more
+    than `tolerance` (0.2 = 20 %).
+
+    Returns:
+        list: (fixture, stage, previous_seconds, current_seconds) of regressed stages
+    """
+    previous_results = {result["fixture"]: result for result in previous["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous_results.get(result["fixture"])
+        if before is None:
+            continue
+        for stage, seconds in result["stages"].items():
+            old = before["stages"].get(stage)
+            if old and seconds > old * (1 + tolerance):
+                regressions.append((result["fixture"], stage, old, seconds))
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every stage of the video-to-transcript pipeline offline on local audio fixtures: "
+        "metadata extraction, download, ffmpeg decode, silence trimming, model load and inference. "
+        "yt-dlp reads the fixtures through file:// URLs instead of the network."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fixtures", help="Directory with audio fixtures (default: synthesize them)")
+        parser.add_argument(
+            "--lengths", default="30,120,600",
+            help="Comma separated lengths in seconds of the synthesized fixtures",
+        )
+        parser.add_argument("--model", default=settings.WHISPER_MODEL_NAME, help="Whisper model name")
+        parser.add_argument("--repeat", type=int, default=1, help="Runs per fixture; the median is reported")
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Relative slowdown per stage counted as a regression (default: 0.2)",
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory(prefix="quizly-benchmark-") as directory:
+            if options["fixtures"]:
+                fixtures = sorted(
+                    path for path in Path(options["fixtures"]).glob("*") if path.suffix.lower() in AUDIO_EXTENSIONS
+                )
+            else:
+                lengths = [int(length) for length in options["lengths"].split(",") if length.strip()]
+                fixtures = [synthesize_fixture(directory, length) for length in lengths]
+            if not fixtures:
+                raise CommandError(f"No audio fixtures found in {options['fixtures']}")
+
+            # Shortest first, so the process-wide peak RSS grows with the fixture length
+            results = [self.benchmark(path, options["model"], options["repeat"]) for path in fixtures]
+            results.sort(key=lambda result: result["audio_seconds"])
+
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "model": options["model"],
+            "environment": environment(),
+            "settings": {
+                name: getattr(settings, name)
+                for name in (
+                    "WHISPER_DEVICE", "WHISPER_CPU_PROFILE", "WHISPER_PARALLEL_WORKERS", "WHISPER_CHUNK_SECONDS",
+                    "WHISPER_STREAM_SEGMENTS", "WHISPER_VAD_ENABLED", "WHISPER_ESCALATION_MODEL",
+                )
+            },
+            "results": results,
+        }
+        self.print_report(results)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text())
+            regressions = compare_results(previous, report, options["tolerance"])
+            for fixture, stage, old, new in regressions:
+                self.stdout.write(self.style.ERROR(f"{fixture} {stage}: {old:.3f}s -> {new:.3f}s"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} stage(s) regressed by more than {options['tolerance']:.0%}")
+            self.stdout.write(self.style.SUCCESS("No regressions"))
+
+    def benchmark(self, path, model_name, repeat):
+        timings = {}
+        for _ in range(repeat):
+            ydl_opts = {**get_ydl_options(), "enable_file_urls": True}
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                with timed(timings, "metadata"):
+                    info = ydl.extract_info(path.as_uri(), download=False)
+
+                with timed(timings, "download"):
+                    with ydl.urlopen(info["url"]) as response:
+                        data = response.read()
+
+            chunks = [data[offset:offset + READ_SIZE] for offset in range(0, len(data), READ_SIZE)]
+            with timed(timings, "decode"):
+                audio = decode_audio(chunks)
+            audio_seconds = len(audio) / SAMPLE_RATE
+
+            if settings.WHISPER_VAD_ENABLED:
+                with timed(timings, "vad"):
+                    audio, _, _ = trim_silence(audio, min_silence_seconds=settings.WHISPER_VAD_MIN_SILENCE_SECONDS)
+
+            # Drop loaded models so every run measures a load from disk
+            model_registry.clear()
+            gc.collect()
+            with timed(timings, "model_load"):
+                model_registry.get(model_name)
+
+            with timed(timings, "inference"):
+                transcribe_audio(audio, model_name)
+
+        stages = {stage: statistics.median(timings[stage]) for stage in STAGES if stage in timings}
+        total = sum(stages.values())
+        return {
+            "fixture": path.name,
+            "audio_seconds": round(audio_seconds, 2),
+            "stages": {stage: round(seconds, 4) for stage, seconds in stages.items()},
+            "throughput": {
+                stage: round(audio_seconds / seconds, 2) for stage, seconds in stages.items() if seconds > 0
+            },
+            "total_seconds": round(total, 4),
+            "total_throughput": round(audio_seconds / total, 2) if total else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "children_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+        }
+
+    def print_report(self, results):
+        stages = [stage for stage in STAGES if any(stage in result["stages"] for result in results)]
+        self.stdout.write(
+            f"{'fixture':<28} {'audio s':>8} " + " ".join(f"{stage:>10}" for stage in stages)
+            + f" {'total':>9} {'x realtime':>10} {'peak MB':>8}"
+        )
+        for result in results:
+            cells = " ".join(f"{result['stages'].get(stage, 0):>10.3f}" for stage in stages)
+            self.stdout.write(
+                f"{result['fixture']:<28} {result['audio_seconds']:>8.1f} {cells} "
+                f"{result['total_seconds']:>9.3f} {result['total_throughput'] or 0:>10.1f} {result['peak_rss_mb']:>8.1f}"
+            )
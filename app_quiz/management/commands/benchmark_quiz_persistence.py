@@ -0,0 +1,118 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from app_quiz.api.persistence import save_generated_quiz
+from app_quiz.models import Question, Quiz
+
+TITLE_PREFIX = "benchmark-persistence"
+
+
+def synthetic_payload(index, questions):
+    return {
+        "title": f"{TITLE_PREFIX} {index}",
+        "description": "Synthetic quiz written by benchmark_quiz_persistence",
+        "questions": [
+            {
+                "question_title": f"Question {number} of quiz {index}?",
+                "question_options": [f"Option {option}" for option in "ABCD"],
+                "answer": "Option A",
+            }
+            for number in range(questions)
+        ],
+    }
+
+
+def save_quiz_naive(payload, video_url):
+    """
+    The path save_generated_quiz replaces: one save() per row, each in its own autocommit transaction.
+    """
+    quiz = Quiz.objects.create(title=payload["title"], description=payload["description"], video_url=video_url)
+    for question in payload["questions"]:
+        Question.objects.create(quiz=quiz, **question)
+    return quiz
+
+
+def save_quiz_bulk(payload, video_url):
+    return save_generated_quiz(payload, video_url)[0]
+
+
+PATHS = {"naive": save_quiz_naive, "bulk": save_quiz_bulk}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare storing generated quizzes row by row with save_generated_quiz (validation, one transaction "
+        "and bulk_create) on the configured database. Optionally from several threads at once, like parallel "
+        "batch jobs. Quizzes written by the benchmark are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quizzes", type=int, default=200, help="Quizzes written per path and run")
+        parser.add_argument("--questions", type=int, default=10, help="Questions per quiz")
+        parser.add_argument("--threads", type=int, default=1, help="Concurrent writers, like parallel jobs")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the median is reported")
+
+    def handle(self, *args, **options):
+        if min(options["quizzes"], options["questions"], options["threads"], options["repeat"]) < 1:
+            raise CommandError("--quizzes, --questions, --threads and --repeat must be at least 1")
+
+        payloads = [synthetic_payload(index, options["questions"]) for index in range(options["quizzes"])]
+        try:
+            results = {
+                name: self.benchmark(save, payloads, options["threads"], options["repeat"])
+                for name, save in PATHS.items()
+            }
+        finally:
+            Quiz.objects.filter(title__startswith=TITLE_PREFIX).delete()
+
+        self.stdout.write(
+            f"{options['quizzes']} quizzes x {options['questions']} questions, {options['threads']} thread(s), "
+            f"{connection.vendor}"
+        )
+        self.stdout.write(f"{'path':<8} {'seconds':>9} {'quizzes/s':>10} {'ms/quiz':>9} {'queries/quiz':>13}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<8} {result['seconds']:>9.3f} {result['quizzes_per_second']:>10.1f} "
+                f"{result['ms_per_quiz']:>9.2f} {result['queries_per_quiz']:>13}"
+            )
+        speedup = results["naive"]["seconds"] / results["bulk"]["seconds"]
+        self.stdout.write(self.style.SUCCESS(f"bulk is {speedup:.1f}x as fast as naive"))
+
+    def benchmark(self, save, payloads, threads, repeat):
+        def write(chunk):
+            try:
+                for payload in chunk:
+                    save(payload, "https://www.youtube.com/watch?v=TxHM390wrRk")
+            finally:
+                if threads > 1:
+                    connection.close()
+
+        with CaptureQueriesContext(connection) as queries:
+            save(payloads[0], "https://www.youtube.com/watch?v=TxHM390wrRk")
+
+        timings = []
+        for _ in range(repeat):
+            chunks = [payloads[index::threads] for index in range(threads)]
+            started = time.perf_counter()
+            if threads == 1:
+                write(chunks[0])
+            else:
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    list(executor.map(write, chunks))
+            timings.append(time.perf_counter() - started)
+            Quiz.objects.filter(title__startswith=TITLE_PREFIX).delete()
+            # With DEBUG on every query is logged; don't let the log grow over the runs
+            reset_queries()
+
+        seconds = statistics.median(timings)
+        return {
+            "seconds": seconds,
+            "quizzes_per_second": len(payloads) / seconds,
+            "ms_per_quiz": 1000 * seconds / len(payloads),
+            "queries_per_quiz": len(queries),
+        }
@@ -0,0 +1,72 @@
+import time
+from pathlib import Path
+
+import whisper
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from whisper.audio import SAMPLE_RATE, load_audio
+
+from app_quiz.api.evaluation import word_error_rate
+from app_quiz.api.whisper_models import configure_cpu_threads, quantize_model, transcribe_options
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".webm", ".flac", ".ogg"}
+DEFAULT_FIXTURES = Path(settings.BASE_DIR) / "app_quiz" / "fixtures" / "audio"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the CPU inference profile (int8, pinned threads) with the fp32 baseline. "
+        "Reports real-time factor and word error rate for every audio fixture; a .txt file "
+        "next to the audio is used as reference transcript when present."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=settings.WHISPER_MODEL_NAME, help="Whisper model name")
+        parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES), help="Directory with audio fixtures")
+        parser.add_argument("--language", default=None, help="Spoken language, auto-detected when omitted")
+
+    def handle(self, *args, **options):
+        fixtures = sorted(
+            path for path in Path(options["fixtures"]).glob("*") if path.suffix.lower() in AUDIO_EXTENSIONS
+        )
+        if not fixtures:
+            raise CommandError(f"No audio fixtures found in {options['fixtures']}")
+
+        clips = [(path, load_audio(str(path))) for path in fixtures]
+        language = options["language"]
+
+        # Baseline first, before the profile pins torch's thread counts
+        baseline = whisper.load_model(options["model"], device="cpu")
+        baseline_results = [self.run(baseline, audio, language) for _, audio in clips]
+        del baseline
+
+        configure_cpu_threads(settings.QUIZ_JOB_MAX_WORKERS)
+        tuned = whisper.load_model(options["model"], device="cpu")
+        if settings.WHISPER_CPU_QUANTIZE:
+            tuned = quantize_model(tuned)
+        tuned_results = [self.run(tuned, audio, language) for _, audio in clips]
+
+        self.stdout.write(
+            f"{'fixture':<30} {'seconds':>8} {'fp32 RTF':>9} {'cpu RTF':>9} "
+            f"{'fp32 WER':>9} {'cpu WER':>9} {'cpu/fp32':>9}"
+        )
+        for (path, audio), (fp32_text, fp32_time), (cpu_text, cpu_time) in zip(
+            clips, baseline_results, tuned_results
+        ):
+            seconds = len(audio) / SAMPLE_RATE
+            reference = path.with_suffix(".txt")
+            if reference.exists():
+                reference_text = reference.read_text()
+                fp32_wer = f"{word_error_rate(reference_text, fp32_text):.3f}"
+                cpu_wer = f"{word_error_rate(reference_text, cpu_text):.3f}"
+            else:
+                fp32_wer = cpu_wer = "-"
+            self.stdout.write(
+                f"{path.name:<30} {seconds:>8.1f} {fp32_time / seconds:>9.3f} {cpu_time / seconds:>9.3f} "
+                f"{fp32_wer:>9} {cpu_wer:>9} {word_error_rate(fp32_text, cpu_text):>9.3f}"
+            )
+
+    def run(self, model, audio, language):
+        started = time.perf_counter()
+        result = model.transcribe(audio, language=language, **transcribe_options(model))
+        return result["text"], time.perf_counter() - started
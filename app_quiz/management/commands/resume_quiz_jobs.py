@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app_quiz.api.jobs import find_interrupted_jobs, requeue_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue quiz generation jobs again that were interrupted by a worker crash or restart. "
+        "The next free worker claims each job and resumes it from its last checkpoint (metadata, "
+        "audio, transcribed segments) instead of starting over. Jobs with an expired lease are "
+        "queued again automatically; this also catches started jobs without a lease."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-seconds", type=int, default=settings.QUIZ_JOB_STALE_SECONDS,
+            help="Started jobs without progress for this long count as interrupted",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only list the interrupted jobs")
+
+    def handle(self, *args, **options):
+        jobs = list(find_interrupted_jobs(options["stale_seconds"]))
+        for job in jobs:
+            stages = ", ".join(key for key in ("metadata", "audio", "segments") if job.checkpoint.get(key)) or "none"
+            self.stdout.write(f"Job {job.pk} ({job.status}), checkpoints: {stages}")
+        if options["dry_run"] or not jobs:
+            return
+
+        requeued = requeue_interrupted_jobs(options["stale_seconds"])
+        self.stdout.write(self.style.SUCCESS(f"Queued {len(requeued)} job(s) again"))
@@ -0,0 +1,136 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app_quiz.api.jobs import run_worker
+from app_quiz.api.tokens import get_encoding
+from app_quiz.api.whisper_models import configure_cpu_threads, model_registry
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is not restarted right away
+RESTART_BACKOFF_SECONDS = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Run quiz generation jobs in dedicated worker processes instead of the web processes. "
+        "Whisper models are loaded once and shared copy-on-write by the forked workers, which "
+        "claim jobs from the database with renewable leases; jobs of a worker that dies are "
+        "queued again once their lease expires. Set QUIZ_RUN_JOBS_IN_PROCESS = False for the web processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=settings.QUIZ_JOB_MAX_WORKERS,
+            help="Number of worker processes, each running one job at a time",
+        )
+        parser.add_argument(
+            "--models", default=",".join(settings.WHISPER_PRELOAD_MODELS or [settings.WHISPER_MODEL_NAME]),
+            help="Comma separated Whisper models to load before forking",
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(os, "fork"):
+            raise CommandError("run_quiz_workers needs os.fork(), which this platform does not provide")
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        if settings.WHISPER_PARALLEL_WORKERS > 1:
+            self.stderr.write(self.style.WARNING(
+                "WHISPER_PARALLEL_WORKERS > 1 loads the model again in every pool process; "
+                "with dedicated workers 1 keeps the weights shared"
+            ))
+
+        models = [name.strip() for name in options["models"].split(",") if name.strip()]
+        if models:
+            started = time.monotonic()
+            model_registry.warmup(models)
+            self.stdout.write(f"Loaded {', '.join(models)} in {time.monotonic() - started:.1f}s")
+        # The tokenizer used to split transcripts for question generation is shared the same way
+        get_encoding()
+
+        # Forked children must not share the parent's database connections or inherit
+        # threads mid-flight; the app's background warmup has to be done before forking
+        for thread in threading.enumerate():
+            if thread.name == "whisper-warmup":
+                thread.join()
+        connections.close_all()
+        # Objects that exist now are never touched by the collector again, so their
+        # pages (the model weights above all) stay shared with the children
+        gc.freeze()
+
+        self.stopping = False
+        self.children = {}
+        signal.signal(signal.SIGTERM, self.shutdown)
+        signal.signal(signal.SIGINT, self.shutdown)
+
+        for index in range(workers):
+            self.spawn(index, workers)
+        self.stdout.write(self.style.SUCCESS(f"Started {workers} worker(s); press Ctrl+C to stop"))
+        self.supervise(workers)
+
+    def spawn(self, index, workers):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (index, time.monotonic())
+            return
+
+        # Child process
+        exit_code = 0
+        try:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+            signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+            configure_cpu_threads(workers)
+            run_worker(f"{socket.gethostname()}:{os.getpid()}", stop)
+        except BaseException:
+            logger.exception("Quiz worker %s crashed", index)
+            exit_code = 1
+        finally:
+            connections.close_all()
+            os._exit(exit_code)
+
+    def supervise(self, workers):
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            index, started = self.children.pop(pid, (None, None))
+            if index is None or self.stopping:
+                continue
+
+            self.stderr.write(self.style.WARNING(
+                f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting"
+            ))
+            if time.monotonic() - started < RESTART_BACKOFF_SECONDS:
+                time.sleep(RESTART_BACKOFF_SECONDS)
+            if not self.stopping:
+                self.spawn(index, workers)
+
+    def shutdown(self, signum, frame):
+        if self.stopping:
+            # Second signal: don't wait for running jobs, their leases expire and they are resumed elsewhere
+            self.signal_children(signal.SIGKILL)
+            return
+        self.stopping = True
+        self.stdout.write("Stopping workers after their current job (signal again to stop now)")
+        self.signal_children(signal.SIGTERM)
+
+    def signal_children(self, signum):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
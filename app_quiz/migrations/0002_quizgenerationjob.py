@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizGenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_url', models.URLField(max_length=500)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('transcribing', 'Transcribing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('video_title', models.CharField(blank=True, max_length=200)),
+                ('transcript', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_jobs', to=settings.AUTH_USER_MODEL)),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generation_jobs', to='app_quiz.quiz')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
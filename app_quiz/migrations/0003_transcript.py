@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0002_quizgenerationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transcript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=11)),
+                ('model_name', models.CharField(max_length=50)),
+                ('language', models.CharField(blank=True, max_length=16)),
+                ('video_title', models.CharField(blank=True, max_length=200)),
+                ('text', models.TextField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='app_quiz_tr_last_us_f01f69_idx')],
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model_name', 'language'), name='unique_transcript_key')],
+            },
+        ),
+    ]
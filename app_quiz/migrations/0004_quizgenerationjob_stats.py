@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0003_transcript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='stats',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
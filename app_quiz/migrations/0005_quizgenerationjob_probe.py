@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0004_quizgenerationjob_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='duration',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='model_name',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='video_id',
+            field=models.CharField(blank=True, max_length=11),
+        ),
+    ]
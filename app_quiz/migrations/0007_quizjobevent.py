@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 22:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0006_quizgenerationbatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizJobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='app_quiz.quizgenerationjob')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
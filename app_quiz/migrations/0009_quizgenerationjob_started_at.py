@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0008_quizgenerationjob_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0009_quizgenerationjob_started_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizgenerationjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('transcribing', 'Transcribing'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='queued', max_length=20),
+        ),
+    ]
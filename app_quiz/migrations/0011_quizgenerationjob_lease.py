@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0010_quizgenerationjob_cancelled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizgenerationjob',
+            name='worker',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+    ]
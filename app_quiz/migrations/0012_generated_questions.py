@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 00:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0011_quizgenerationjob_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizgenerationjob',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('downloading', 'Downloading'), ('transcribing', 'Transcribing'), ('generating', 'Generating questions'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='queued', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='GeneratedQuestions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('backend', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Generated questions',
+                'indexes': [models.Index(fields=['last_used_at'], name='app_quiz_ge_last_us_a58905_idx')],
+                'constraints': [models.UniqueConstraint(fields=('input_hash', 'prompt_version', 'backend'), name='unique_generated_questions_key')],
+            },
+        ),
+    ]
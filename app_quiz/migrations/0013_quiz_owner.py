@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 00:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_owner_from_jobs(apps, schema_editor):
+    """
+    Give existing quizzes the owner of the job that generated them.
+    """
+    Quiz = apps.get_model('app_quiz', 'Quiz')
+    QuizGenerationJob = apps.get_model('app_quiz', 'QuizGenerationJob')
+    owners = QuizGenerationJob.objects.filter(quiz=OuterRef('pk')).order_by('created_at').values('owner')[:1]
+    Quiz.objects.filter(owner__isnull=True).update(owner=Subquery(owners))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_quiz', '0012_generated_questions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='quizzes', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['owner', '-created_at'], name='quiz_owner_created_idx'),
+        ),
+        migrations.RunPython(set_owner_from_jobs, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class Quiz(models.Model):
+    # Null only for quizzes created before owners were recorded; those are not listed by the API
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='quizzes'
+    )
     title = models.CharField(max_length=200)
     description = models.TextField()
     video_url = models.URLField(max_length=500)
@@ -11,6 +17,10 @@ class Quiz(models.Model):
     class Meta:
         verbose_name_plural = "Quizzes"
         ordering = ['-created_at']
+        indexes = [
+            # Serves the owner's quiz list in Meta.ordering without a sort
+            models.Index(fields=['owner', '-created_at'], name='quiz_owner_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -29,3 +39,129 @@ class Question(models.Model):
 
     def __str__(self):
         return f"Question {self.id}: {self.question_title[:50]}..."
+
+
+class QuizGenerationBatch(models.Model):
+    """
+    A group of quiz generation jobs created together, from a list of URLs or a playlist.
+    """
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_batches')
+    playlist_url = models.URLField(max_length=500, blank=True)
+    title = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Quiz generation batches"
+
+    def __str__(self):
+        return f"Batch {self.id}: {self.title or self.playlist_url or 'URL list'}"
+
+
+class QuizGenerationJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        DOWNLOADING = 'downloading', 'Downloading'
+        TRANSCRIBING = 'transcribing', 'Transcribing'
+        GENERATING = 'generating', 'Generating questions'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+        CANCELLED = 'cancelled', 'Cancelled'
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_jobs')
+    video_url = models.URLField(max_length=500)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    video_id = models.CharField(max_length=11, blank=True)
+    video_title = models.CharField(max_length=200, blank=True)
+    duration = models.PositiveIntegerField(null=True, blank=True)
+    model_name = models.CharField(max_length=50, blank=True)
+    transcript = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    stats = models.JSONField(default=dict, blank=True)
+    checkpoint = models.JSONField(default=dict, blank=True)  # completed pipeline stages, for resuming
+    quiz = models.ForeignKey(Quiz, on_delete=models.SET_NULL, null=True, blank=True, related_name='generation_jobs')
+    batch = models.ForeignKey(
+        QuizGenerationBatch, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)  # set when the scheduler hands the job to a worker
+    worker = models.CharField(max_length=100, blank=True)  # host:pid of the worker holding the lease
+    lease_expires_at = models.DateTimeField(null=True, blank=True)  # renewed while the worker is alive
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status}): {self.video_url}"
+
+
+class QuizJobEvent(models.Model):
+    """
+    Live progress event of a quiz generation job, as delivered by the event stream.
+    """
+    job = models.ForeignKey(QuizGenerationJob, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"Event {self.id} ({self.kind}) of job {self.job_id}"
+
+
+class Transcript(models.Model):
+    """
+    Cached Whisper transcript of a YouTube video, keyed by canonical video id,
+    model name and language ('' for auto-detected).
+    """
+    video_id = models.CharField(max_length=11)
+    model_name = models.CharField(max_length=50)
+    language = models.CharField(max_length=16, blank=True)
+    video_title = models.CharField(max_length=200, blank=True)
+    text = models.TextField()
+    size = models.PositiveIntegerField(default=0)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['video_id', 'model_name', 'language'], name='unique_transcript_key'),
+        ]
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"Transcript {self.video_id} ({self.model_name})"
+
+
+class GeneratedQuestions(models.Model):
+    """
+    Cached question generation result, keyed by a hash of the prompt input
+    (transcript, video title, question count), the prompt version and the backend.
+    """
+    input_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=20)
+    backend = models.CharField(max_length=100)
+    payload = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['input_hash', 'prompt_version', 'backend'], name='unique_generated_questions_key'),
+        ]
+        indexes = [
+            models.Index(fields=['last_used_at']),
+        ]
+        verbose_name_plural = "Generated questions"
+
+    def __str__(self):
+        return f"Questions {self.input_hash[:12]} ({self.backend}, prompt v{self.prompt_version})"
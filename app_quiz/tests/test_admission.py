@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..models import QuizGenerationBatch, QuizGenerationJob
+
+User = get_user_model()
+
+VIDEO = {"video_id": "TxHM390wrRk", "title": "Test Video", "duration": 120, "filesize": None, "model_name": "tiny"}
+
+
+@override_settings(
+    QUIZ_MAX_ACTIVE_JOBS_PER_USER=2,
+    QUIZ_MAX_ACTIVE_JOBS=4,
+    QUIZ_JOB_MAX_WORKERS=2,
+    QUIZ_JOB_OVERHEAD_SECONDS=10,
+    WHISPER_MODEL_REALTIME_FACTORS={'base': 0.5, 'tiny': 0.25},
+)
+class JobAdmissionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.url = reverse('create_quiz_from_url')
+        self.client.force_authenticate(user=self.user)
+
+    def create_jobs(self, owner, count, status=QuizGenerationJob.Status.QUEUED, duration=120):
+        for _ in range(count):
+            QuizGenerationJob.objects.create(
+                owner=owner, video_url='https://www.youtube.com/watch?v=TxHM390wrRk',
+                status=status, duration=duration, model_name='tiny')
+
+    def post(self):
+        with patch('app_quiz.api.views.probe_video', return_value=VIDEO) as probe, \
+                patch('app_quiz.api.views.enqueue_job'):
+            response = self.client.post(self.url, {'url': 'https://www.youtube.com/watch?v=TxHM390wrRk'})
+        return response, probe
+
+    def test_accepts_below_limits(self):
+        """Test that a job is accepted while the user and the server have capacity"""
+        self.create_jobs(self.user, 1)
+        self.create_jobs(self.user, 5, status=QuizGenerationJob.Status.DONE)
+
+        response, _ = self.post()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_rejects_over_user_limit(self):
+        """Test that a user with too many active jobs gets a fast 429 with Retry-After"""
+        self.create_jobs(self.other, 1, duration=400)
+        self.create_jobs(self.user, 2)
+
+        response, probe = self.post()
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        probe.assert_not_called()
+        # The other user's job and the user's oldest job: (110 + 40) / 2 workers
+        self.assertEqual(response['Retry-After'], '75')
+        self.assertEqual(QuizGenerationJob.objects.filter(owner=self.user).count(), 2)
+
+    def test_rejects_over_global_limit(self):
+        """Test that new work is refused when the server is saturated by other users"""
+        self.create_jobs(self.other, 4)
+
+        response, _ = self.post()
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One job has to finish before a slot is free: 40 / 2 workers
+        self.assertEqual(response['Retry-After'], '20')
+
+    def post_batch(self, count):
+        urls = [f'https://youtu.be/{index:011d}' for index in range(count)]
+        with patch('app_quiz.api.utils.probe_video', return_value=VIDEO), \
+                patch('app_quiz.api.views.enqueue_job'):
+            return self.client.post(reverse('create_quiz_batch'), {'urls': urls}, format='json')
+
+    def create_batch_jobs(self, owner, count, started=False):
+        batch = QuizGenerationBatch.objects.create(owner=owner)
+        for _ in range(count):
+            QuizGenerationJob.objects.create(
+                owner=owner, batch=batch, video_url='https://www.youtube.com/watch?v=TxHM390wrRk',
+                status=QuizGenerationJob.Status.TRANSCRIBING if started else QuizGenerationJob.Status.QUEUED,
+                started_at=timezone.now() if started else None, duration=120, model_name='tiny')
+
+    def test_batch_larger_than_interactive_limits(self):
+        """Test that a 10-video batch is accepted and its queued jobs don't block single submissions"""
+        response = self.post_batch(10)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(QuizGenerationJob.objects.filter(owner=self.user, batch__isnull=False).count(), 10)
+
+        response, _ = self.post()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_running_batch_jobs_count_against_interactive_limits(self):
+        """Test that batch jobs holding a worker count against the per-user limit"""
+        self.create_batch_jobs(self.user, 2, started=True)
+
+        response, probe = self.post()
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        probe.assert_not_called()
+
+    @override_settings(QUIZ_MAX_ACTIVE_BATCH_JOBS_PER_USER=4)
+    def test_batch_counts_its_jobs(self):
+        """Test that a batch whose jobs would exceed the user's batch quota gets a 429 and creates nothing"""
+        self.create_jobs(self.other, 1, duration=400)
+        self.create_batch_jobs(self.user, 3)
+
+        response = self.post_batch(2)
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # The other user's job and the user's oldest batch job: (110 + 40) / 2 workers
+        self.assertEqual(response['Retry-After'], '75')
+        self.assertEqual(QuizGenerationJob.objects.filter(owner=self.user).count(), 3)
+
+        self.assertEqual(self.post_batch(1).status_code, status.HTTP_202_ACCEPTED)
+
+    @override_settings(QUIZ_MAX_ACTIVE_BATCH_JOBS_PER_USER=4)
+    def test_full_batch_quota_refused_before_probing(self):
+        """Test that a user at the batch quota is refused before any video is probed"""
+        self.create_batch_jobs(self.user, 4)
+
+        with patch('app_quiz.api.utils.probe_video', return_value=VIDEO) as probe:
+            response = self.client.post(
+                reverse('create_quiz_batch'), {'urls': ['https://youtu.be/00000000000']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        probe.assert_not_called()
+
+    def test_batch_ignores_other_users_batches(self):
+        """Test that other users' queued batch jobs don't count against the user's batch quota"""
+        self.create_batch_jobs(self.other, 10)
+
+        self.assertEqual(self.post_batch(10).status_code, status.HTTP_202_ACCEPTED)
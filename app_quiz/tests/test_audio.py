@@ -0,0 +1,87 @@
+import io
+import shutil
+import unittest
+import wave
+
+import numpy as np
+from yt_dlp.networking.exceptions import HTTPError
+
+from ..api.audio import decode_audio, is_streamable, stream_audio
+
+
+class FakeResponse(io.BytesIO):
+    pass
+
+
+class FakeYoutubeDL:
+    """Serves byte ranges of `data` the way ydl.urlopen does for ranged requests"""
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+
+    def urlopen(self, request):
+        start, end = request.headers["Range"][len("bytes="):].split("-")
+        start, end = int(start), int(end)
+        self.ranges.append((start, end))
+        if start >= len(self.data):
+            raise HTTPError(FakeHTTPResponse(416))
+        return FakeResponse(self.data[start:end + 1])
+
+
+class FakeHTTPResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Range Not Satisfiable"
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class TestAudioStreaming(unittest.TestCase):
+    """Test cases for streaming audio download and decoding"""
+
+    def test_stream_audio_reads_all_ranges(self):
+        """Test that the stream yields the whole file using ranged requests"""
+        data = bytes(range(256)) * 10
+        ydl = FakeYoutubeDL(data)
+        info = {"url": "https://example.com/audio", "filesize": len(data)}
+
+        streamed = b"".join(stream_audio(ydl, info, chunk_size=1000))
+
+        self.assertEqual(streamed, data)
+        self.assertEqual(ydl.ranges, [(0, 999), (1000, 1999), (2000, 2999)])
+
+    def test_stream_audio_unknown_size(self):
+        """Test that streaming stops at the end of a file with unknown size"""
+        data = b"x" * 2000
+        ydl = FakeYoutubeDL(data)
+
+        streamed = b"".join(stream_audio(ydl, {"url": "https://example.com/audio"}, chunk_size=1000))
+
+        self.assertEqual(streamed, data)
+
+    def test_is_streamable(self):
+        """Test that only plain HTTP(S) formats are streamed"""
+        self.assertTrue(is_streamable({"protocol": "https", "url": "https://example.com/audio"}))
+        self.assertFalse(is_streamable({"protocol": "m3u8_native", "url": "https://example.com/audio.m3u8"}))
+        self.assertFalse(is_streamable({"protocol": "https"}))
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is not installed")
+    def test_decode_audio_from_memory(self):
+        """Test that encoded audio piped through ffmpeg comes back as 16 kHz float PCM"""
+        samples = (np.sin(np.linspace(0, 2000 * np.pi, 16000)) * 10000).astype(np.int16)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(samples.tobytes())
+        encoded = buffer.getvalue()
+
+        audio = decode_audio(encoded[i:i + 4096] for i in range(0, len(encoded), 4096))
+
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(len(audio), 16000)
+        self.assertLessEqual(float(np.abs(audio).max()), 1.0)
@@ -0,0 +1,145 @@
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+
+from ..api.utils import VideoRejectedError
+from ..models import QuizGenerationBatch, QuizGenerationJob
+
+User = get_user_model()
+
+PLAYLIST_URL = 'https://www.youtube.com/playlist?list=PLabcdefghij12345'
+
+
+def probe(url):
+    if url.endswith('dQw4w9WgXcQ'):
+        raise VideoRejectedError('Video is too long (180 min); the limit is 120 min.')
+    return {
+        'video_id': url[-11:],
+        'title': 'Test Video',
+        'duration': 300,
+        'filesize': None,
+        'model_name': 'base',
+    }
+
+
+@override_settings(QUIZ_MAX_ACTIVE_JOBS_PER_USER=5, QUIZ_MAX_ACTIVE_JOBS=10)
+class QuizBatchTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.create_batch_url = reverse('create_quiz_batch')
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+        # Metadata requests would hit YouTube
+        probe_patcher = patch('app_quiz.api.utils.probe_video', side_effect=probe)
+        self.probe_video = probe_patcher.start()
+        self.addCleanup(probe_patcher.stop)
+
+    def test_create_batch_from_urls(self):
+        """Test that one job per admissible video is created and rejected videos are reported"""
+        urls = [
+            'https://youtu.be/TxHM390wrRk',
+            'https://www.youtube.com/watch?v=TxHM390wrRk',
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://www.youtube.com/shorts/aaaaaaaaaaa',
+        ]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.create_batch_url, {'urls': urls}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        batch = QuizGenerationBatch.objects.get(pk=response.data['id'])
+        self.assertEqual(
+            sorted(batch.jobs.values_list('video_id', flat=True)), ['TxHM390wrRk', 'aaaaaaaaaaa']
+        )
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(response.data['rejected'][0]['url'], 'https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        self.assertEqual(response.data['progress']['total'], 2)
+        self.assertEqual(response.data['progress']['queued'], 2)
+
+    def test_create_batch_probes_concurrently(self):
+        """Test that the URLs of a batch are probed at the same time rather than one after another"""
+        urls = ['https://youtu.be/aaaaaaaaaaa', 'https://youtu.be/bbbbbbbbbbb', 'https://youtu.be/ccccccccccc']
+        # Only passes if all three probes are in flight together
+        barrier = threading.Barrier(len(urls), timeout=5)
+
+        def waiting_probe(url):
+            barrier.wait()
+            return probe(url)
+
+        self.probe_video.side_effect = waiting_probe
+        response = self.client.post(self.create_batch_url, {'urls': urls}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(sorted(job['video_id'] for job in response.data['jobs']),
+                         ['aaaaaaaaaaa', 'bbbbbbbbbbb', 'ccccccccccc'])
+
+    def test_create_batch_from_playlist(self):
+        """Test that a playlist is expanded with one request and checked against the limits"""
+        entries = [
+            {'id': 'TxHM390wrRk', 'title': 'One', 'duration': 300,
+             'url': 'https://www.youtube.com/watch?v=TxHM390wrRk'},
+            {'id': 'aaaaaaaaaaa', 'title': 'Live', 'duration': None, 'live_status': 'is_live',
+             'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa'},
+        ]
+
+        with patch('app_quiz.api.views.expand_playlist', return_value=('Course', entries)) as expand:
+            response = self.client.post(self.create_batch_url, {'playlist_url': PLAYLIST_URL}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        expand.assert_called_once_with(PLAYLIST_URL)
+        self.probe_video.assert_not_called()
+        self.assertEqual(response.data['title'], 'Course')
+        self.assertEqual([job['video_id'] for job in response.data['jobs']], ['TxHM390wrRk'])
+        self.assertEqual(len(response.data['rejected']), 1)
+
+    def test_create_batch_requires_urls_or_playlist(self):
+        """Test that exactly one of urls and playlist_url must be given"""
+        neither = self.client.post(self.create_batch_url, {}, format='json')
+        both = self.client.post(
+            self.create_batch_url,
+            {'urls': ['https://youtu.be/TxHM390wrRk'], 'playlist_url': PLAYLIST_URL},
+            format='json',
+        )
+
+        self.assertEqual(neither.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(both.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_batch_without_admissible_video(self):
+        """Test that a batch where every video is rejected is not created"""
+        response = self.client.post(
+            self.create_batch_url, {'urls': ['https://youtu.be/dQw4w9WgXcQ']}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(QuizGenerationBatch.objects.exists())
+
+    def test_batch_progress(self):
+        """Test that the batch endpoint aggregates the status of its jobs"""
+        batch = QuizGenerationBatch.objects.create(owner=self.user)
+        for job_status in ['done', 'failed', 'transcribing', 'queued']:
+            QuizGenerationJob.objects.create(
+                owner=self.user, batch=batch, status=job_status,
+                video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+
+        response = self.client.get(reverse('quiz_batch_detail', args=[batch.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['progress']['total'], 4)
+        self.assertEqual(response.data['progress']['finished'], 2)
+        self.assertEqual(response.data['progress']['percent'], 50)
+        self.assertEqual(response.data['progress']['transcribing'], 1)
+
+    def test_batch_hidden_from_other_users(self):
+        """Test that batches of other users are not visible"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        batch = QuizGenerationBatch.objects.create(owner=other)
+
+        response = self.client.get(reverse('quiz_batch_detail', args=[batch.pk]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,31 @@
+import unittest
+
+from ..management.commands.benchmark_pipeline import compare_results
+
+
+def report(**stages):
+    return {"results": [{"fixture": "synthetic-30s.webm", "stages": stages}]}
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Test cases for detecting regressions between benchmark reports"""
+
+    def test_slower_stage_is_a_regression(self):
+        """Test that only stages slower than the tolerance are reported"""
+        previous = report(decode=0.10, inference=2.0)
+        current = report(decode=0.11, inference=3.0)
+
+        self.assertEqual(
+            compare_results(previous, current, tolerance=0.2),
+            [("synthetic-30s.webm", "inference", 2.0, 3.0)],
+        )
+
+    def test_new_fixtures_and_stages_are_ignored(self):
+        """Test that fixtures or stages missing from the earlier run don't count"""
+        previous = report(inference=2.0)
+        current = {"results": [
+            {"fixture": "synthetic-30s.webm", "stages": {"inference": 2.0, "vad": 0.5}},
+            {"fixture": "lecture.m4a", "stages": {"inference": 9.0}},
+        ]}
+
+        self.assertEqual(compare_results(previous, current, tolerance=0.2), [])
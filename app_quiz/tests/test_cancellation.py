@@ -0,0 +1,133 @@
+import os
+import time
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from whisper.audio import SAMPLE_RATE
+
+from ..api.jobs import cancel_job, run_job
+from ..api.utils import TranscriptionCancelled, download_and_transcribe
+from ..models import QuizGenerationJob
+from .test_checkpoints import VIDEO_URL, FakePipelineYoutubeDL
+
+User = get_user_model()
+
+
+class CancelJobEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(owner=self.user, video_url=VIDEO_URL)
+        self.url = reverse('quiz_job_detail', args=[self.job.pk])
+
+    def test_delete_cancels_job(self):
+        """Test that DELETE cancels an unfinished job and publishes the new status"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.CANCELLED)
+        self.assertIsNotNone(self.job.finished_at)
+        self.assertEqual(self.job.events.last().data['status'], QuizGenerationJob.Status.CANCELLED)
+
+    def test_delete_finished_job(self):
+        """Test that finished jobs cannot be cancelled"""
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.DONE)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_delete_other_users_job(self):
+        """Test that users cannot cancel jobs of others"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.delete(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.QUEUED)
+
+
+@override_settings(QUIZ_CANCEL_POLL_SECONDS=0.01)
+class RunCancelledJobTests(TransactionTestCase):
+    def test_running_job_stops(self):
+        """Test that a running job notices the cancellation and keeps its cancelled status"""
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        job = QuizGenerationJob.objects.create(owner=user, video_url=VIDEO_URL)
+
+        def fake_download_and_transcribe(url, progress, cancelled, **kwargs):
+            progress('downloading')
+            cancel_job(job.pk)
+            deadline = time.monotonic() + 5
+            while not cancelled() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if cancelled():
+                raise TranscriptionCancelled("Transcription was cancelled.")
+            return 'hello', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe):
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.Status.CANCELLED)
+        self.assertEqual(job.transcript, '')
+
+    def test_cancelled_after_transcription_skips_generation(self):
+        """Test that a job cancelled once its transcript is ready makes no question generation calls"""
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        job = QuizGenerationJob.objects.create(owner=user, video_url=VIDEO_URL)
+
+        def fake_download_and_transcribe(url, progress, cancelled, **kwargs):
+            cancel_job(job.pk)
+            deadline = time.monotonic() + 5
+            while not cancelled() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return 'hello', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe), \
+                patch('app_quiz.api.jobs.generate_questions') as generate:
+            run_job(job.pk)
+
+        generate.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.Status.CANCELLED)
+        self.assertEqual(job.transcript, '')
+
+
+@override_settings(
+    WHISPER_STREAMING=True, WHISPER_VAD_ENABLED=False, CAPTIONS_ENABLED=False, WHISPER_STREAM_SEGMENTS=True,
+)
+class PipelineCancellationTests(TestCase):
+    def test_transcription_stops_between_windows(self):
+        """Test that the pipeline stops after the current window and removes its scratch files"""
+        windows = []
+        checkpoint = {}
+
+        def transcribe(audio, model_name, language, on_segments):
+            for start in range(3):
+                windows.append(start)
+                on_segments([{"start": float(start), "end": start + 1.0, "text": " word"}])
+            return {"text": " word word word", "segments": [], "language": "en"}
+
+        def progress(stage, **info):
+            if stage == "checkpoint":
+                checkpoint.update(info)
+
+        with patch("app_quiz.api.utils.yt_dlp.YoutubeDL", FakePipelineYoutubeDL), \
+                patch("app_quiz.api.utils.load_audio_from_info", return_value=np.zeros(3 * SAMPLE_RATE, np.float32)), \
+                patch("app_quiz.api.utils.transcribe_audio", transcribe), \
+                self.assertRaises(TranscriptionCancelled):
+            download_and_transcribe(
+                VIDEO_URL, progress=progress, checkpoint={}, cancelled=lambda: len(windows) >= 2)
+
+        self.assertEqual(windows, [0, 1])
+        self.assertFalse(os.path.exists(checkpoint["scratch_dir"]))
@@ -0,0 +1,149 @@
+import io
+from contextlib import contextmanager
+
+from django.test import SimpleTestCase, override_settings
+
+from ..api.captions import (
+    caption_quality_ok,
+    fetch_caption_transcript,
+    parse_srv,
+    parse_vtt,
+    segments_to_text,
+    select_caption_track,
+)
+
+ROLLING_VTT = """WEBVTT
+Kind: captions
+Language: en
+
+00:00:00.000 --> 00:00:02.000 align:start position:0%
+welcome<00:00:00.500><c> to</c><00:00:01.000><c> the</c><00:00:01.500><c> lesson</c>
+
+00:00:02.000 --> 00:00:02.010 align:start position:0%
+welcome to the lesson
+
+00:00:02.010 --> 00:00:04.000 align:start position:0%
+welcome to the lesson
+today we talk about cells
+"""
+
+SRV3 = """<?xml version="1.0" encoding="utf-8" ?>
+<timedtext format="3"><body>
+<p t="0" d="1500">Hello &amp; welcome</p>
+<p t="1500" d="2000"><s>to</s><s> biology</s></p>
+</body></timedtext>
+"""
+
+
+def caption_info(subtitles=None, automatic_captions=None, language="en", duration=60):
+    return {
+        "language": language,
+        "duration": duration,
+        "subtitles": subtitles or {},
+        "automatic_captions": automatic_captions or {},
+    }
+
+
+def track(ext, url):
+    return [{"ext": ext, "url": url}]
+
+
+class FakeYDL:
+    def __init__(self, content):
+        self.content = content
+        self.urls = []
+
+    @contextmanager
+    def urlopen(self, url):
+        self.urls.append(url)
+        yield io.BytesIO(self.content.encode("utf-8"))
+
+
+class TestCaptionParsing(SimpleTestCase):
+    """Test cases for turning caption files into segments"""
+
+    def test_parse_vtt_drops_rolling_duplicates(self):
+        """Test that lines repeated by rolling automatic captions appear once"""
+        segments = parse_vtt(ROLLING_VTT)
+
+        self.assertEqual([segment["text"] for segment in segments], [
+            "welcome to the lesson",
+            "today we talk about cells",
+        ])
+        self.assertEqual(segments[1]["start"], 2.01)
+        self.assertEqual(segments[1]["end"], 4.0)
+
+    def test_parse_srv3(self):
+        """Test that srv3 paragraphs become segments in seconds"""
+        segments = parse_srv(SRV3)
+
+        self.assertEqual(segments, [
+            {"start": 0.0, "end": 1.5, "text": "Hello & welcome"},
+            {"start": 1.5, "end": 3.5, "text": "to biology"},
+        ])
+
+    def test_segments_to_text_strips_annotations(self):
+        """Test that sound annotations are not part of the transcript"""
+        segments = [{"text": "[Music]"}, {"text": "hello  there"}, {"text": "♪♪ (applause) bye"}]
+
+        self.assertEqual(segments_to_text(segments), "hello there bye")
+
+
+class TestCaptionSelection(SimpleTestCase):
+    """Test cases for choosing and accepting a caption track"""
+
+    def test_manual_track_is_preferred(self):
+        """Test that uploaded subtitles win over automatic captions"""
+        info = caption_info(
+            subtitles={"en-US": track("vtt", "manual")},
+            automatic_captions={"en-orig": track("vtt", "auto")},
+        )
+
+        selected = select_caption_track(info)
+
+        self.assertEqual(selected["kind"], "manual")
+        self.assertEqual(selected["language"], "en-US")
+        self.assertEqual(selected["url"], "manual")
+
+    def test_automatic_track_only_in_original_language(self):
+        """Test that machine-translated automatic captions are never used"""
+        info = caption_info(automatic_captions={"de": track("vtt", "translated")}, language="en")
+
+        self.assertIsNone(select_caption_track(info))
+
+        info["automatic_captions"]["en-orig"] = track("srv3", "original")
+        self.assertEqual(select_caption_track(info)["url"], "original")
+
+    @override_settings(CAPTIONS_ALLOW_AUTOMATIC=False)
+    def test_automatic_track_can_be_disabled(self):
+        """Test that automatic captions are ignored when disabled"""
+        info = caption_info(automatic_captions={"en-orig": track("vtt", "auto")})
+
+        self.assertIsNone(select_caption_track(info))
+
+    @override_settings(CAPTIONS_MIN_WORDS_PER_MINUTE=40)
+    def test_sparse_captions_are_rejected(self):
+        """Test that tracks covering only part of the video fail the quality policy"""
+        segments = [{"text": "[Music]"}, {"text": "only a few words here"}]
+
+        self.assertFalse(caption_quality_ok(segments, duration=600))
+        self.assertTrue(caption_quality_ok(segments * 10, duration=60))
+        self.assertFalse(caption_quality_ok([{"text": "[Music]"}], duration=None))
+
+    def test_fetch_caption_transcript(self):
+        """Test that an acceptable track is downloaded and parsed"""
+        ydl = FakeYDL(SRV3)
+        info = caption_info(subtitles={"en": track("srv3", "https://captions")}, duration=6)
+
+        segments, selected = fetch_caption_transcript(ydl, info)
+
+        self.assertEqual(ydl.urls, ["https://captions"])
+        self.assertEqual(selected["kind"], "manual")
+        self.assertEqual(segments_to_text(segments), "Hello & welcome to biology")
+
+    def test_fetch_caption_transcript_rejects_broken_track(self):
+        """Test that an unparsable track falls back to Whisper"""
+        ydl = FakeYDL("<timedtext")
+        info = caption_info(subtitles={"en": track("srv3", "https://captions")})
+
+        self.assertEqual(fetch_caption_transcript(ydl, info), (None, None))
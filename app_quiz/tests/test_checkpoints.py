@@ -0,0 +1,156 @@
+import io
+import shutil
+from unittest.mock import patch
+
+import numpy as np
+import yt_dlp
+from django.test import SimpleTestCase, TestCase, override_settings
+from whisper.audio import SAMPLE_RATE
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import ExtractorError
+
+from ..api.audio import stream_audio
+from ..api.retries import is_transient_error
+from ..api.utils import download_and_transcribe
+
+VIDEO_URL = "https://www.youtube.com/watch?v=TxHM390wrRk"
+
+
+class FakeHTTPResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Error"
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+class BrokenResponse(io.BytesIO):
+    """Delivers `limit` bytes, then fails like a reset connection"""
+
+    def __init__(self, data, limit):
+        super().__init__(data)
+        self.limit = limit
+
+    def read(self, size=-1):
+        if self.tell() >= self.limit:
+            raise TransportError("Connection reset by peer")
+        return super().read(min(size, self.limit - self.tell()))
+
+
+class FlakyYoutubeDL:
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+
+    def urlopen(self, request):
+        start, end = request.headers["Range"][len("bytes="):].split("-")
+        start, end = int(start), int(end)
+        self.ranges.append((start, end))
+        if len(self.ranges) == 1:
+            return BrokenResponse(self.data[start:end + 1], limit=300)
+        return io.BytesIO(self.data[start:end + 1])
+
+
+@override_settings(QUIZ_DOWNLOAD_RETRIES=3, QUIZ_DOWNLOAD_RETRY_BACKOFF_SECONDS=0)
+class RetryTests(SimpleTestCase):
+    """Test cases for retrying transient download failures"""
+
+    def test_transient_errors(self):
+        """Test that throttling, expired URLs and network errors are retried, missing videos not"""
+        forbidden = HTTPError(FakeHTTPResponse(403))
+        self.assertTrue(is_transient_error(forbidden))
+        self.assertTrue(is_transient_error(yt_dlp.DownloadError("ERROR", exc_info=(HTTPError, forbidden, None))))
+        self.assertTrue(is_transient_error(ExtractorError("Unable to download", cause=TransportError("timed out"))))
+        self.assertFalse(is_transient_error(HTTPError(FakeHTTPResponse(404))))
+        self.assertFalse(is_transient_error(ExtractorError("Private video", expected=True)))
+        self.assertFalse(is_transient_error(ValueError("boom")))
+
+    def test_stream_audio_resumes_interrupted_range(self):
+        """Test that a broken range is requested again from the first missing byte"""
+        data = bytes(range(256)) * 4
+        ydl = FlakyYoutubeDL(data)
+
+        streamed = b"".join(stream_audio(ydl, {"url": "https://example.com/audio", "filesize": len(data)}, 1000))
+
+        self.assertEqual(streamed, data)
+        self.assertEqual(ydl.ranges, [(0, 999), (300, 999), (1000, 1999)])
+
+
+class FakePipelineYoutubeDL:
+    extracted = 0
+
+    def __init__(self, options):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def extract_info(self, url, download=False):
+        FakePipelineYoutubeDL.extracted += 1
+        return {"id": "TxHM390wrRk", "title": "Cells", "duration": 4}
+
+
+@override_settings(
+    WHISPER_STREAMING=True, WHISPER_VAD_ENABLED=False, CAPTIONS_ENABLED=False, WHISPER_STREAM_SEGMENTS=True,
+)
+class PipelineCheckpointTests(TestCase):
+    """Test cases for resuming an interrupted transcription from its checkpoint"""
+
+    def setUp(self):
+        FakePipelineYoutubeDL.extracted = 0
+        self.audio = np.arange(4 * SAMPLE_RATE, dtype=np.float32) % 100 / 32768.0
+
+    def run_pipeline(self, checkpoint, transcribe, crash=False):
+        saved = dict(checkpoint)
+        remove_scratch = shutil.rmtree
+
+        def keep_or_remove_scratch(path, **kwargs):
+            if not crash:  # A dying worker leaves its scratch directory behind
+                remove_scratch(path, **kwargs)
+
+        def progress(stage, **info):
+            if stage == "checkpoint":
+                saved.update(info)
+
+        with patch("app_quiz.api.utils.yt_dlp.YoutubeDL", FakePipelineYoutubeDL), \
+                patch("app_quiz.api.utils.load_audio_from_info", return_value=self.audio), \
+                patch("app_quiz.api.utils.transcribe_audio", transcribe), \
+                patch("app_quiz.api.utils.shutil.rmtree", keep_or_remove_scratch):
+            try:
+                result = download_and_transcribe(VIDEO_URL, progress=progress, checkpoint=checkpoint)
+            except RuntimeError:
+                result = None
+        return result, saved
+
+    def test_resume_after_interruption(self):
+        """Test that a resumed run skips download and transcribed audio and keeps earlier segments"""
+        def crash_after_first_window(audio, model_name, language, on_segments):
+            on_segments([{"start": 0.0, "end": 2.0, "text": " Cells divide."}])
+            raise RuntimeError("worker died")
+
+        result, checkpoint = self.run_pipeline({}, crash_after_first_window, crash=True)
+        self.addCleanup(shutil.rmtree, checkpoint["scratch_dir"], ignore_errors=True)
+
+        self.assertIsNone(result)
+        self.assertEqual(checkpoint["metadata"], {"title": "Cells", "duration": 4})
+        self.assertEqual(checkpoint["transcribed_seconds"], 2.0)
+        self.assertTrue(checkpoint["audio"].endswith(".npy"))
+
+        received = []
+
+        def transcribe_rest(audio, model_name, language, on_segments):
+            received.append(audio)
+            on_segments([{"start": 0.5, "end": 1.5, "text": " They grow."}])
+            return {"text": " They grow.", "segments": [], "language": "en"}
+
+        result, checkpoint = self.run_pipeline(checkpoint, transcribe_rest)
+
+        self.assertEqual(result, ("Cells divide. They grow.", "Cells"))
+        self.assertEqual(FakePipelineYoutubeDL.extracted, 1)
+        np.testing.assert_array_equal(received[0], self.audio[2 * SAMPLE_RATE:])
+        self.assertEqual(checkpoint["segments"][-1], {"start": 2.5, "end": 3.5, "text": "They grow."})
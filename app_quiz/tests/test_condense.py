@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..api.condense import (
+    condense_transcript,
+    drop_repeated_sentences,
+    rank_sentences,
+    remove_disfluencies,
+    split_pieces,
+)
+from ..api.jobs import run_job
+from ..api.tokens import count_tokens
+from ..models import QuizGenerationJob
+
+User = get_user_model()
+
+
+class CondenseTranscriptTests(SimpleTestCase):
+    """Test cases for shortening transcripts before question generation"""
+
+    def test_removes_disfluencies(self):
+        """Test that hesitations and stuttered words are removed, other words kept"""
+        self.assertEqual(
+            remove_disfluencies("Um, so the the the mitochondria is, uh, the powerhouse of the cell."),
+            "so the mitochondria is, the powerhouse of the cell.",
+        )
+        self.assertEqual(remove_disfluencies("I think I think it works."), "I think it works.")
+        self.assertEqual(remove_disfluencies("Ähm, er hat es gesagt."), "er hat es gesagt.")
+
+    def test_keeps_meaningful_repetitions(self):
+        """Test that grammatical doubled words, repeated names and numbers are left alone"""
+        for sentence in [
+            "By then we had had enough.",
+            "He said that that was wrong.",
+            "Frauen, die die Zeitung lesen, wissen mehr.",
+            "Start spreading the news, New York New York.",
+            "The sequence goes 1 1 2 3 5 8.",
+        ]:
+            with self.subTest(sentence=sentence):
+                self.assertEqual(remove_disfluencies(sentence), sentence)
+
+    def test_drops_repeated_sentences(self):
+        """Test that exact and near repeats are dropped and distinct sentences kept"""
+        sentences = [
+            "Cells divide by mitosis.",
+            "The cell membrane controls what enters the cell and what leaves it.",
+            "Cells divide by mitosis!",
+            "The cell membrane controls what enters the cell and what leaves it again.",
+            "Meiosis produces gametes.",
+        ]
+
+        self.assertEqual(drop_repeated_sentences(sentences), [sentences[0], sentences[1], sentences[4]])
+
+    def test_drops_sponsor_reads(self):
+        """Test that ad reads are removed while related words in the content survive"""
+        text, stats = condense_transcript(
+            "This video is sponsored by NordVPN. Use code QUIZ for ten percent off. "
+            "Clients subscribe to a topic and receive its messages.",
+            token_budget=None,
+        )
+
+        self.assertEqual(text, "Clients subscribe to a topic and receive its messages.")
+        self.assertEqual(stats["dropped_sentences"], 2)
+        self.assertLess(stats["output_tokens"], stats["input_tokens"])
+
+    def test_fits_token_budget_in_original_order(self):
+        """Test that the most salient sentences within the budget are kept in transcript order"""
+        salient = [
+            "Photosynthesis turns light into glucose.",
+            "Chlorophyll makes photosynthesis possible by absorbing light.",
+            "Glucose from photosynthesis feeds the plant.",
+        ]
+        transcript = " ".join([salient[0], "It is what it is.", salient[1], "You can see that, right.", salient[2]])
+        budget = sum(count_tokens(sentence) for sentence in salient)
+
+        text, stats = condense_transcript(transcript, token_budget=budget)
+
+        self.assertEqual(text, " ".join(salient))
+        self.assertLess(stats["output_tokens"], stats["input_tokens"])
+
+    def test_rank_prefers_topic_words(self):
+        """Test that sentences about recurring topics outrank small talk"""
+        sentences = ["Enzymes speed up reactions.", "Okay so yeah.", "Enzymes lower activation energy of reactions."]
+
+        self.assertEqual(rank_sentences(sentences)[-1], 1)
+
+    def test_condenses_unpunctuated_transcript(self):
+        """Test that automatic captions without punctuation are cut into word runs and condensed"""
+        topics = ['enzymes lower the activation energy of reactions', 'cells divide by mitosis into two cells',
+                  'um the membrane controls what enters the cell', 'uh ribosomes build proteins from amino acids']
+        words = ' '.join(f'{topics[index % 4]} part {index}' for index in range(200))
+        transcript = f'{words} this video is sponsored by nordvpn {words.upper()}'
+        budget = count_tokens(transcript) // 4
+
+        text, stats = condense_transcript(transcript, token_budget=budget)
+
+        self.assertLessEqual(stats['output_tokens'], budget)
+        self.assertGreater(stats['output_tokens'], budget // 2)
+        self.assertNotIn('sponsored', text)
+        self.assertNotIn(' um ', f' {text.lower()} ')
+        pieces = split_pieces(transcript)
+        self.assertLessEqual(max(len(piece.split()) for piece in pieces), 30)
+        self.assertGreater(stats['dropped_sentences'], len(pieces) // 2)
+        self.assertLess(stats['dropped_sentences'], len(pieces))
+
+    def test_nothing_left(self):
+        """Test that a transcript consisting only of fillers is passed on unchanged"""
+        text, stats = condense_transcript("Um. Uh.", token_budget=None)
+
+        self.assertEqual(text, "Um. Uh.")
+        self.assertEqual(stats["dropped_sentences"], 0)
+
+
+@override_settings(QUIZ_QUESTION_BACKEND='local', QUIZ_CONDENSE_ENABLED=True, QUIZ_CONDENSE_TOKEN_BUDGET=None)
+class RunJobCondenseTests(TestCase):
+    def test_job_reports_token_counts(self):
+        """Test that questions are generated from the condensed transcript and the token counts are stored"""
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        job = QuizGenerationJob.objects.create(owner=user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        transcript = "Um, enzymes enzymes enzymes speed up reactions. Check the link in the description."
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', return_value=(transcript, 'Enzymes')), \
+                patch('app_quiz.api.jobs.generate_questions', wraps=lambda text, title, progress: {
+                    'title': title, 'description': text, 'questions': [
+                        {'question_title': 'What speeds up reactions?', 'question_options': ['Enzymes', 'Salt'],
+                         'answer': 'Enzymes'}]}) as generate:
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(generate.call_args.args[0], "enzymes speed up reactions.")
+        self.assertEqual(job.transcript, transcript)
+        self.assertEqual(job.stats['condense_input_tokens'], count_tokens(transcript))
+        self.assertEqual(job.stats['condense_output_tokens'], count_tokens("enzymes speed up reactions."))
+        self.assertEqual(job.stats['condense_dropped_sentences'], 1)
@@ -0,0 +1,25 @@
+import unittest
+
+from ..api.evaluation import normalize_words, word_error_rate
+
+
+class TestWordErrorRate(unittest.TestCase):
+    """Test cases for scoring transcripts against a reference"""
+
+    def test_normalization_ignores_case_and_punctuation(self):
+        """Test that case and punctuation do not count as errors"""
+        self.assertEqual(normalize_words("Hello, World! It's me."), ["hello", "world", "it's", "me"])
+        self.assertEqual(word_error_rate("Hello, world.", "hello world"), 0.0)
+
+    def test_counts_substitutions_insertions_and_deletions(self):
+        """Test that every kind of edit counts once per word"""
+        reference = "the cell is the unit of life"
+
+        self.assertAlmostEqual(word_error_rate(reference, "the cell is a unit of life"), 1 / 7)
+        self.assertAlmostEqual(word_error_rate(reference, "the cell is the basic unit of life"), 1 / 7)
+        self.assertAlmostEqual(word_error_rate(reference, "cell is the unit of"), 2 / 7)
+
+    def test_empty_reference(self):
+        """Test that an empty reference only matches an empty hypothesis"""
+        self.assertEqual(word_error_rate("", ""), 0.0)
+        self.assertEqual(word_error_rate("", "noise"), 1.0)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..api.jobs import EventBuffer, delete_expired_events, publish_event, set_job_status
+from ..models import QuizGenerationJob, QuizJobEvent
+
+User = get_user_model()
+
+
+@override_settings(QUIZ_EVENTS_POLL_SECONDS=0.01)
+class QuizJobEventStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        self.url = reverse('quiz_job_events', args=[self.job.pk])
+        self.token = str(AccessToken.for_user(self.user))
+
+    def read_stream(self, response):
+        async def collect():
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        return async_to_sync(collect)().decode()
+
+    def test_stream_until_job_is_done(self):
+        """Test that download progress, segments and the final status are streamed in order"""
+        set_job_status(self.job.pk, QuizGenerationJob.Status.DOWNLOADING)
+        publish_event(self.job.pk, 'download', downloaded_bytes=512, total_bytes=1024)
+        publish_event(self.job.pk, 'segment', segments=[{'start': 0.0, 'end': 2.5, 'text': 'Hello'}])
+        set_job_status(self.job.pk, QuizGenerationJob.Status.DONE)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = self.read_stream(response)
+        kinds = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+        self.assertEqual(kinds, ['status', 'download', 'segment', 'status'])
+        self.assertIn('data: {"segments": [{"start": 0.0, "end": 2.5, "text": "Hello"}]}', body)
+
+    def test_stream_resumes_after_last_event_id(self):
+        """Test that reconnecting clients only get events they have not seen"""
+        publish_event(self.job.pk, 'segment', segments=[{'start': 0.0, 'end': 1.0, 'text': 'Seen'}])
+        seen = self.job.events.get().pk
+        publish_event(self.job.pk, 'segment', segments=[{'start': 1.0, 'end': 2.0, 'text': 'New'}])
+        set_job_status(self.job.pk, QuizGenerationJob.Status.DONE)
+
+        self.client.cookies['access_token'] = self.token
+        response = self.client.get(self.url, HTTP_LAST_EVENT_ID=str(seen))
+
+        body = self.read_stream(response)
+        self.assertNotIn('Seen', body)
+        self.assertIn('New', body)
+
+    def test_stream_of_finished_job_closes(self):
+        """Test that a stream opened after the last event ends right away"""
+        set_job_status(self.job.pk, QuizGenerationJob.Status.FAILED, error='boom')
+        last = self.job.events.last().pk
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}', HTTP_LAST_EVENT_ID=str(last))
+
+        self.assertEqual(self.read_stream(response), 'retry: 2000\n\n')
+
+    def test_stream_requires_authentication(self):
+        """Test that anonymous clients and other users cannot follow the job"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+
+        anonymous = self.client.get(self.url)
+        foreign = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other)}')
+
+        self.assertEqual(anonymous.status_code, 401)
+        self.assertEqual(foreign.status_code, 404)
+
+
+class QuizJobEventStorageTests(TestCase):
+    """Test cases for keeping the event table small"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+
+    def test_buffer_merges_events_between_flushes(self):
+        """Test that segments are merged into one event and only the latest download progress is written"""
+        with self.assertNumQueries(1):
+            with EventBuffer(self.job.pk, interval=60) as events:
+                for second in range(3):
+                    events.add('download', downloaded_bytes=second, total_bytes=2)
+                    events.add('segment', segments=[{'start': second, 'end': second + 1, 'text': str(second)}])
+
+        download, segment = self.job.events.all()
+        self.assertEqual(download.data, {'downloaded_bytes': 2, 'total_bytes': 2})
+        self.assertEqual([item['text'] for item in segment.data['segments']], ['0', '1', '2'])
+
+    def test_buffer_flushes_after_interval(self):
+        """Test that events are written while the job runs once the interval has passed"""
+        events = EventBuffer(self.job.pk, interval=0)
+
+        events.add('segment', segments=[{'start': 0.0, 'end': 1.0, 'text': 'Hello'}])
+
+        self.assertEqual(self.job.events.get().kind, 'segment')
+
+    def test_delete_expired_events(self):
+        """Test that only events of jobs finished longer than the retention ago are deleted"""
+        running = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        recent = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        for job in (self.job, running, recent):
+            publish_event(job.pk, 'segment', segments=[])
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(
+            status=QuizGenerationJob.Status.DONE, finished_at=timezone.now() - timedelta(hours=2))
+        QuizGenerationJob.objects.filter(pk=recent.pk).update(
+            status=QuizGenerationJob.Status.FAILED, finished_at=timezone.now())
+
+        deleted = delete_expired_events(retention_seconds=3600, force=True)
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            sorted(QuizJobEvent.objects.values_list('job_id', flat=True)), sorted([running.pk, recent.pk]))
+        self.assertIsNone(delete_expired_events(retention_seconds=3600))
@@ -0,0 +1,186 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from rest_framework import status
+from rest_framework.test import APITestCase, APIClient
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from ..api.jobs import find_interrupted_jobs, run_job
+from ..models import QuizGenerationJob
+
+User = get_user_model()
+
+QUIZ_PAYLOAD = {
+    'title': 'Test Video',
+    'description': 'A quiz',
+    'questions': [{'question_title': 'Hello?', 'question_options': ['hello', 'world'], 'answer': 'hello'}],
+}
+
+
+@override_settings(QUIZ_QUESTION_BACKEND='local')
+class QuizGenerationJobTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+
+    def get_job_url(self, job):
+        return reverse('quiz_job_detail', args=[job.pk])
+
+    def test_job_status_for_owner(self):
+        """Test that the owner can poll the job status"""
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(self.get_job_url(self.job))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], self.job.pk)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.QUEUED)
+        self.assertIsNone(response.data['quiz_url'])
+
+    def test_job_status_hidden_from_other_users(self):
+        """Test that jobs of other users are not visible"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(self.get_job_url(self.job))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_job_status_unauthenticated(self):
+        """Test that polling a job requires authentication"""
+        response = self.client.get(self.get_job_url(self.job))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_run_job_success(self):
+        """Test that a finished job stores the transcript and is marked done"""
+        stages = []
+
+        def fake_download_and_transcribe(url, progress, **kwargs):
+            progress('downloading')
+            stages.append(QuizGenerationJob.objects.get(pk=self.job.pk).status)
+            progress('transcribing')
+            stages.append(QuizGenerationJob.objects.get(pk=self.job.pk).status)
+            return 'hello world', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(stages, ['downloading', 'transcribing'])
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.DONE)
+        self.assertEqual(self.job.transcript, 'hello world')
+        self.assertEqual(self.job.video_title, 'Test Video')
+        self.assertIsNotNone(self.job.finished_at)
+        self.assertEqual(self.job.quiz.title, 'Test Video')
+        self.assertEqual(self.job.quiz.questions.get().answer, 'hello')
+        self.assertEqual(self.job.quiz.owner, self.user)
+
+    def test_run_job_failure(self):
+        """Test that pipeline errors mark the job as failed"""
+        with patch('app_quiz.api.jobs.download_and_transcribe', side_effect=RuntimeError('boom')):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.FAILED)
+        self.assertEqual(self.job.error, 'boom')
+
+    @override_settings(QUIZ_CONDENSE_ENABLED=False)
+    def test_run_job_records_stats(self):
+        """Test that measurements reported by the pipeline end up in job.stats"""
+        def fake_download_and_transcribe(url, progress, **kwargs):
+            progress('transcribing', audio_seconds=600.0, skipped_seconds=120.0)
+            return 'hello world', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe), \
+                patch('app_quiz.api.jobs.generate_questions', return_value=QUIZ_PAYLOAD):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.stats, {'audio_seconds': 600.0, 'skipped_seconds': 120.0})
+
+    @override_settings(QUIZ_CONDENSE_ENABLED=False)
+    def test_run_job_publishes_live_events(self):
+        """Test that segments and download progress become events instead of stats"""
+        def fake_download_and_transcribe(url, progress, **kwargs):
+            progress('download', downloaded_bytes=10, total_bytes=20)
+            progress('segment', segments=[{'start': 0.0, 'end': 1.0, 'text': 'hello'}])
+            return 'hello', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe), \
+                patch('app_quiz.api.jobs.generate_questions', return_value=QUIZ_PAYLOAD):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.stats, {})
+        self.assertEqual(
+            list(self.job.events.values_list('kind', flat=True)), ['download', 'segment', 'status'])
+        self.assertEqual(self.job.events.last().data['status'], QuizGenerationJob.Status.DONE)
+
+    def test_run_job_saves_and_resumes_checkpoint(self):
+        """Test that checkpoints are stored on the job, passed back on resume and cleared when done"""
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(
+            status=QuizGenerationJob.Status.TRANSCRIBING, checkpoint={'scratch_dir': '/tmp/job'})
+        received = []
+
+        def fake_download_and_transcribe(url, progress, checkpoint, **kwargs):
+            received.append(checkpoint)
+            progress('checkpoint', transcribed_seconds=30.0)
+            received.append(QuizGenerationJob.objects.get(pk=self.job.pk).checkpoint)
+            return 'hello world', 'Test Video'
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', fake_download_and_transcribe):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(received, [
+            {'scratch_dir': '/tmp/job'},
+            {'scratch_dir': '/tmp/job', 'transcribed_seconds': 30.0},
+        ])
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.DONE)
+        self.assertEqual(self.job.checkpoint, {})
+
+    def test_find_interrupted_jobs(self):
+        """Test that only started jobs without recent progress or a live lease count as interrupted"""
+        now = timezone.now()
+        stale = now - timedelta(hours=1)
+        started = {'status': QuizGenerationJob.Status.DOWNLOADING, 'started_at': stale}
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(**started)
+        done = QuizGenerationJob.objects.create(
+            owner=self.user, video_url=self.job.video_url, status=QuizGenerationJob.Status.DONE, started_at=stale)
+        waiting = QuizGenerationJob.objects.create(owner=self.user, video_url=self.job.video_url)
+        leased = QuizGenerationJob.objects.create(
+            owner=self.user, video_url=self.job.video_url, lease_expires_at=now + timedelta(minutes=1), **started)
+        QuizGenerationJob.objects.filter(pk__in=[self.job.pk, done.pk, waiting.pk, leased.pk]).update(updated_at=stale)
+        fresh = QuizGenerationJob.objects.create(owner=self.user, video_url=self.job.video_url, **started)
+
+        interrupted = list(find_interrupted_jobs(stale_seconds=60))
+
+        self.assertEqual(interrupted, [self.job])
+        self.assertNotIn(fresh, interrupted)
+
+    def test_resume_command_only_requeues(self):
+        """Test that resume_quiz_jobs queues interrupted jobs for the workers instead of running them"""
+        stale = timezone.now() - timedelta(hours=1)
+        QuizGenerationJob.objects.filter(pk=self.job.pk).update(
+            status=QuizGenerationJob.Status.TRANSCRIBING, started_at=stale, worker='gone:1', updated_at=stale,
+            checkpoint={'audio': '/tmp/job/audio.webm'})
+        output = StringIO()
+
+        with patch('app_quiz.api.jobs.run_job') as run:
+            call_command('resume_quiz_jobs', stale_seconds=60, stdout=output)
+
+        run.assert_not_called()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.QUEUED)
+        self.assertIsNone(self.job.started_at)
+        self.assertEqual(self.job.worker, '')
+        self.assertEqual(self.job.checkpoint, {'audio': '/tmp/job/audio.webm'})
+        self.assertIn('Queued 1 job(s) again', output.getvalue())
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.metrics import Counter, Histogram, Registry
+from core.middleware import REQUEST_DURATION, MetricsMiddleware
+from ..models import QuizGenerationJob
+
+User = get_user_model()
+
+
+class RegistryTests(SimpleTestCase):
+    """Test cases for recording and rendering metrics"""
+
+    def setUp(self):
+        self.registry = Registry()
+        self.requests = Counter("test_requests_total", "Requests.", ["view"], registry=self.registry)
+        self.latency = Histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1), registry=self.registry)
+
+    def test_render_counters_and_histograms(self):
+        """Test that values are rendered in the Prometheus text format with cumulative buckets"""
+        self.requests.inc(view="list")
+        self.requests.inc(2, view="list")
+        self.latency.observe(0.05)
+        self.latency.observe(0.5)
+        self.latency.observe(3)
+
+        text = self.registry.render()
+
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{view="list"} 3', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("test_latency_seconds_count 3", text)
+
+    def test_label_names_are_checked(self):
+        """Test that unknown or missing labels are rejected"""
+        with self.assertRaises(ValueError):
+            self.requests.inc(method="GET")
+
+    def test_snapshots_of_other_processes_are_added(self):
+        """Test that values written by other processes are summed with the live ones"""
+        self.requests.inc(view="list")
+        self.latency.observe(0.05)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            other = self.registry.snapshot()
+            with open(os.path.join(directory, "metrics-999999.json"), "w") as file:
+                json.dump(other, file)
+            self.registry.flush()  # This process' own file is replaced by its live values
+
+            text = self.registry.render()
+
+        self.assertIn('test_requests_total{view="list"} 2', text)
+        self.assertIn("test_latency_seconds_count 2", text)
+
+
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+
+    def test_view_latency_and_queue_depth(self):
+        """Test that API views are timed and the job queue is reported on /metrics"""
+        QuizGenerationJob.objects.create(owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        self.client.force_authenticate(user=self.user)
+        self.client.get(reverse('quiz-list'))
+
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('quizly_http_request_duration_seconds_count{view="QuizViewSet.list",method="GET",status="200"}', text)
+        self.assertIn('quizly_jobs{status="queued"} 1', text)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Test that a configured token is required to scrape"""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class MetricsMiddlewareTests(SimpleTestCase):
+    def test_async_requests_stay_async(self):
+        """Test that the middleware runs natively in an async chain and still times the view"""
+        async def get_response(request):
+            return HttpResponse(status=204)
+
+        middleware = MetricsMiddleware(get_response)
+        request = RequestFactory().get('/')
+        request._metrics_view = 'JobEvents.get'
+
+        with patch.object(REQUEST_DURATION, 'observe') as observe:
+            response = async_to_sync(middleware)(request)
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(observe.call_args.kwargs, {'view': 'JobEvents.get', 'method': 'GET', 'status': 204})
+
+    def test_sync_requests_stay_sync(self):
+        """Test that a sync chain gets a plain callable"""
+        middleware = MetricsMiddleware(lambda request: HttpResponse())
+
+        self.assertFalse(iscoroutinefunction(middleware))
+        self.assertEqual(middleware(RequestFactory().get('/')).status_code, 200)
@@ -0,0 +1,97 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from ..api.jobs import run_job
+from ..api.persistence import save_generated_quiz
+from ..api.serializers import QuizSerializer
+from ..models import Question, Quiz, QuizGenerationJob
+
+VIDEO_URL = 'https://www.youtube.com/watch?v=TxHM390wrRk'
+
+
+def payload(questions=3, **changes):
+    return {
+        'title': 'Plants',
+        'description': 'About photosynthesis',
+        'questions': [
+            {
+                'question_title': f'Question {number}?',
+                'question_options': ['Light', 'Water', 'Salt', 'Sand'],
+                'answer': 'Light',
+            }
+            for number in range(questions)
+        ],
+        **changes,
+    }
+
+
+class SaveGeneratedQuizTests(TestCase):
+    """Test cases for storing a generated quiz in one transaction"""
+
+    def test_quiz_and_questions_in_two_inserts(self):
+        """Test that the quiz and all its questions are written with one insert each"""
+        # SAVEPOINT and RELEASE (the test runs inside a transaction) plus two INSERTs; nothing is read back
+        with self.assertNumQueries(4):
+            quiz, _ = save_generated_quiz(payload(questions=20), VIDEO_URL)
+
+        self.assertEqual(quiz.video_url, VIDEO_URL)
+        self.assertEqual(Question.objects.filter(quiz=quiz).count(), 20)
+
+    def test_returns_representation_of_stored_quiz(self):
+        """Test that the returned data, built without reading back, matches the stored quiz"""
+        quiz, data = save_generated_quiz(payload(), VIDEO_URL)
+
+        self.assertEqual(list(data), list(QuizSerializer.Meta.fields))
+        self.assertEqual(data, QuizSerializer(Quiz.objects.prefetch_related('questions').get(pk=quiz.pk)).data)
+        self.assertEqual([question['question_title'] for question in data['questions']],
+                         ['Question 0?', 'Question 1?', 'Question 2?'])
+
+    def test_invalid_payload_writes_nothing(self):
+        """Test that one invalid question rejects the whole quiz"""
+        invalid = payload()
+        invalid['questions'][2]['answer'] = 'Fire'
+
+        with self.assertRaises(ValidationError) as context:
+            save_generated_quiz(invalid, VIDEO_URL)
+
+        self.assertIn('answer', context.exception.detail['questions'][2])
+        self.assertFalse(Quiz.objects.exists())
+
+        for broken in (payload(questions=0), payload(title=''), payload(description=None)):
+            with self.assertRaises(ValidationError):
+                save_generated_quiz(broken, VIDEO_URL)
+        self.assertFalse(Question.objects.exists())
+
+    def test_invalid_quiz_fails_job(self):
+        """Test that a job whose generated quiz does not validate fails and keeps its transcript"""
+        user = get_user_model().objects.create_user(
+            username='testuser', email='test@example.com', password='testpass123')
+        job = QuizGenerationJob.objects.create(owner=user, video_url=VIDEO_URL)
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', return_value=('Plants need light.', 'Plants')), \
+                patch('app_quiz.api.jobs.generate_questions', return_value=payload(questions=0)):
+            run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizGenerationJob.Status.FAILED)
+        self.assertIn('Generated quiz is invalid', job.error)
+        self.assertEqual(job.transcript, 'Plants need light.')
+        self.assertFalse(Quiz.objects.exists())
+
+
+class BenchmarkQuizPersistenceTests(TestCase):
+    def test_benchmark_runs_and_cleans_up(self):
+        """Test that the benchmark reports both paths and leaves no quizzes behind"""
+        output = StringIO()
+
+        call_command('benchmark_quiz_persistence', quizzes=3, questions=2, repeat=1, stdout=output)
+
+        report = output.getvalue()
+        self.assertIn('naive', report)
+        self.assertIn('bulk is', report)
+        self.assertFalse(Quiz.objects.exists())
@@ -0,0 +1,117 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+from ..api.utils import (
+    VideoRejectedError,
+    expand_playlist,
+    get_metadata_client,
+    normalize_playlist_url,
+    probe_video,
+    select_model_for_duration,
+)
+
+VIDEO_URL = "https://www.youtube.com/watch?v=TxHM390wrRk"
+
+
+@override_settings(
+    QUIZ_MAX_VIDEO_SECONDS=3600,
+    QUIZ_MAX_AUDIO_BYTES=100 * 1024 * 1024,
+    QUIZ_TRANSCRIPTION_BUDGET_SECONDS=60,
+    WHISPER_MODEL_REALTIME_FACTORS={'small': 0.3, 'base': 0.1, 'tiny': 0.05},
+)
+class ProbeVideoTests(SimpleTestCase):
+    """Test cases for the metadata probe and admission limits"""
+
+    def probe(self, **info):
+        ydl = MagicMock()
+        ydl.extract_info.return_value = {"id": "TxHM390wrRk", "title": "Test", **info}
+        with patch("app_quiz.api.utils.get_metadata_client", return_value=ydl):
+            result = probe_video(VIDEO_URL)
+        ydl.extract_info.assert_called_once_with(VIDEO_URL, download=False)
+        return result
+
+    def test_accepts_video_within_limits(self):
+        """Test that a short video passes and reports its metadata"""
+        result = self.probe(duration=180, filesize=3 * 1024 * 1024)
+
+        self.assertEqual(result["video_id"], "TxHM390wrRk")
+        self.assertEqual(result["duration"], 180)
+        self.assertEqual(result["model_name"], "small")
+
+    def test_rejects_live_stream(self):
+        """Test that live streams are rejected"""
+        with self.assertRaises(VideoRejectedError):
+            self.probe(duration=None, is_live=True, live_status="is_live")
+
+    def test_rejects_too_long_video(self):
+        """Test that videos over QUIZ_MAX_VIDEO_SECONDS are rejected"""
+        with self.assertRaises(VideoRejectedError):
+            self.probe(duration=2 * 3600)
+
+    def test_rejects_unknown_duration(self):
+        """Test that videos without a known duration are rejected"""
+        with self.assertRaises(VideoRejectedError):
+            self.probe()
+
+    def test_rejects_large_audio(self):
+        """Test that approximate file sizes over the limit are rejected"""
+        with self.assertRaises(VideoRejectedError):
+            self.probe(duration=600, filesize_approx=500 * 1024 * 1024)
+
+    def test_model_selected_by_duration_budget(self):
+        """Test that longer videos get smaller, faster models"""
+        self.assertEqual(select_model_for_duration(120), "small")
+        self.assertEqual(select_model_for_duration(600), "base")
+        self.assertEqual(select_model_for_duration(1200), "tiny")
+        self.assertEqual(select_model_for_duration(3600), "tiny")
+
+
+@override_settings(QUIZ_BATCH_MAX_VIDEOS=2)
+class PlaylistTests(SimpleTestCase):
+    """Test cases for playlist URLs and the shared metadata client"""
+
+    def test_normalize_playlist_url(self):
+        """Test that playlist URLs are reduced to their canonical form"""
+        self.assertEqual(
+            normalize_playlist_url("youtube.com/playlist?list=PLabcdefghij12345&si=x"),
+            "https://www.youtube.com/playlist?list=PLabcdefghij12345",
+        )
+        with self.assertRaises(ValueError):
+            normalize_playlist_url(VIDEO_URL)
+
+    def test_expand_playlist(self):
+        """Test that one flat request yields canonical video URLs and skips unusable entries"""
+        ydl = MagicMock()
+        ydl.extract_info.return_value = {
+            "title": "Course",
+            "entries": [
+                {"id": "TxHM390wrRk", "title": "One", "duration": 60},
+                {"id": None, "title": "[Private video]"},
+                {"id": "dQw4w9WgXcQ", "title": "Two", "duration": 90},
+                {"id": "aaaaaaaaaaa", "title": "Three", "duration": 30},
+            ],
+        }
+        with patch("app_quiz.api.utils.get_metadata_client", return_value=ydl) as get_client:
+            title, entries = expand_playlist("https://www.youtube.com/playlist?list=PLabcdefghij12345")
+
+        get_client.assert_called_once_with(flat=True)
+        self.assertEqual(title, "Course")
+        self.assertEqual([entry["url"] for entry in entries], [
+            "https://www.youtube.com/watch?v=TxHM390wrRk",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        ])
+
+    def test_metadata_client_is_reused(self):
+        """Test that each thread keeps one long-lived YoutubeDL per mode"""
+        with patch("app_quiz.api.utils.yt_dlp.YoutubeDL", side_effect=lambda options: MagicMock(options=options)):
+            with patch("app_quiz.api.utils._metadata_clients", threading.local()):
+                video = get_metadata_client()
+                self.assertIs(get_metadata_client(), video)
+                flat = get_metadata_client(flat=True)
+
+        self.assertIsNot(flat, video)
+        self.assertTrue(video.options["noplaylist"])
+        self.assertEqual(flat.options["extract_flat"], "in_playlist")
+        self.assertEqual(flat.options["playlistend"], 2)
+        self.assertFalse(flat.options["noplaylist"])
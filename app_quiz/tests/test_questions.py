@@ -0,0 +1,274 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..api.jobs import run_job
+from ..api.questions import (
+    LocalBackend,
+    QuestionGenerationError,
+    generate_questions,
+    get_backend,
+    reduce_questions,
+    validate_payload,
+)
+from ..models import GeneratedQuestions, Quiz, QuizGenerationJob
+
+User = get_user_model()
+
+TRANSCRIPT = (
+    "Photosynthesis converts sunlight into chemical energy. Plants store that energy as glucose. "
+    "Chlorophyll absorbs mostly blue and red light. Oxygen is released as a byproduct. "
+    "Without photosynthesis there would be no breathable atmosphere."
+)
+QUESTION_SETTINGS = dict(
+    QUIZ_QUESTION_BACKEND='local',
+    QUIZ_QUESTION_COUNT=3,
+    QUIZ_QUESTION_OPTIONS=4,
+    QUIZ_LOCAL_BACKEND_LATENCY_SECONDS=0,
+)
+local_generate = LocalBackend.generate
+
+
+def question(title, options=('a', 'b', 'c', 'd'), answer='a'):
+    return {'question_title': title, 'question_options': list(options), 'answer': answer}
+
+
+class ValidatePayloadTests(SimpleTestCase):
+    """Test cases for checking LLM output before it is stored"""
+
+    def test_drops_unusable_questions(self):
+        """Test that malformed and repeated questions are dropped and the rest is cut to the count"""
+        payload = {
+            'description': ' About plants ',
+            'questions': [
+                question('What do plants store?'),
+                question('what do plants store?'),
+                question('Answer not an option?', answer='e'),
+                question('Too few options?', options=('a', 'b', 'c')),
+                question('Repeated options?', options=('a', 'A', 'b', 'c')),
+                {'question_title': 'No options?', 'answer': 'a'},
+                'not a question',
+                question('Which gas is released?'),
+                question('One too many?'),
+            ],
+        }
+
+        result = validate_payload(payload, 'Plants', count=2, options=4)
+
+        self.assertEqual(result['title'], 'Plants')
+        self.assertEqual(result['description'], 'About plants')
+        self.assertEqual(
+            [item['question_title'] for item in result['questions']],
+            ['What do plants store?', 'Which gas is released?'],
+        )
+
+    def test_no_usable_questions(self):
+        """Test that a payload without any usable question is an error"""
+        with self.assertRaises(QuestionGenerationError):
+            validate_payload({'questions': [question('Bad?', answer='z')]}, 'Plants', count=2, options=4)
+        with self.assertRaises(QuestionGenerationError):
+            validate_payload(['not', 'an', 'object'], 'Plants', count=2, options=4)
+
+
+@override_settings(QUIZ_LOCAL_BACKEND_LATENCY_SECONDS=0)
+class LocalBackendTests(SimpleTestCase):
+    """Test cases for the offline stand-in backend"""
+
+    def test_deterministic_valid_questions(self):
+        """Test that the same transcript always yields the same valid questions"""
+        first = LocalBackend().generate(TRANSCRIPT, 'Plants', 3, 4)
+        second = LocalBackend().generate(TRANSCRIPT, 'Plants', 3, 4)
+
+        self.assertEqual(first, second)
+        result = validate_payload(first, 'Plants', 3, 4)
+        self.assertEqual(len(result['questions']), 3)
+        self.assertEqual(result['questions'][0]['answer'], 'Photosynthesis')
+        self.assertIn('_____ converts sunlight', result['questions'][0]['question_title'])
+
+    def test_short_transcript(self):
+        """Test that missing distractors are filled in and an empty transcript is an error"""
+        result = validate_payload(LocalBackend().generate('hello world', '', 3, 4), '', 3, 4)
+        self.assertEqual(len(result['questions']), 1)
+
+        with self.assertRaises(QuestionGenerationError):
+            LocalBackend().generate('... ?', '', 3, 4)
+
+
+class GetBackendTests(SimpleTestCase):
+    """Test cases for choosing the question generation backend"""
+
+    @override_settings(QUIZ_QUESTION_BACKEND='gemini', GEMINI_API_KEY=None)
+    def test_gemini_without_key(self):
+        """Test that the Gemini backend without an API key is a configuration error, not a silent fallback"""
+        with self.assertRaises(ImproperlyConfigured):
+            get_backend()
+
+    @override_settings(QUIZ_QUESTION_BACKEND='gemini', GEMINI_API_KEY='key')
+    def test_gemini_with_key(self):
+        """Test that the Gemini backend is used when configured"""
+        self.assertEqual(get_backend().name, f'gemini:{settings.GEMINI_MODEL}')
+
+
+@override_settings(**QUESTION_SETTINGS)
+class GenerateQuestionsTests(TestCase):
+    def test_identical_input_is_cached(self):
+        """Test that generating questions for the same input again is answered from the cache"""
+        stages = []
+
+        def progress(stage, **info):
+            stages.append((stage, info.get('question_source')))
+
+        with patch.object(LocalBackend, 'generate', autospec=True, side_effect=local_generate) as generate:
+            first = generate_questions(TRANSCRIPT, 'Plants', progress=progress)
+            second = generate_questions(TRANSCRIPT, 'Plants', progress=progress)
+            generate_questions(TRANSCRIPT, 'Other title')
+
+        self.assertEqual(first, second)
+        self.assertEqual(generate.call_count, 2)
+        self.assertEqual(
+            stages, [('generating', None), ('questions', 'backend'), ('generating', None), ('questions', 'cache')])
+        self.assertEqual(GeneratedQuestions.objects.get(payload=first).hits, 1)
+
+    def test_prompt_version_is_part_of_the_key(self):
+        """Test that questions cached for an older prompt are not reused"""
+        generate_questions(TRANSCRIPT, 'Plants')
+
+        with patch('app_quiz.api.questions.PROMPT_VERSION', 'next'), \
+                patch.object(LocalBackend, 'generate', autospec=True, side_effect=local_generate) as generate:
+            generate_questions(TRANSCRIPT, 'Plants')
+
+        generate.assert_called_once()
+        self.assertEqual(GeneratedQuestions.objects.count(), 2)
+
+
+@override_settings(**QUESTION_SETTINGS)
+class RunJobQuestionsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.job = QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+
+    def test_job_creates_quiz(self):
+        """Test that a finished job links a quiz with the generated questions"""
+        with patch('app_quiz.api.jobs.download_and_transcribe', return_value=(TRANSCRIPT, 'Plants')):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.DONE)
+        self.assertEqual(self.job.quiz.title, 'Plants')
+        self.assertEqual(self.job.quiz.video_url, self.job.video_url)
+        self.assertEqual(self.job.quiz.questions.count(), 3)
+        self.assertEqual(self.job.stats['question_source'], 'backend')
+        self.assertIn(
+            QuizGenerationJob.Status.GENERATING, [event.data.get('status') for event in self.job.events.all()])
+
+    def test_generation_failure_fails_job(self):
+        """Test that a backend error marks the job as failed without a quiz"""
+        with patch('app_quiz.api.jobs.download_and_transcribe', return_value=(TRANSCRIPT, 'Plants')), \
+                patch.object(LocalBackend, 'generate', side_effect=QuestionGenerationError('quota exceeded')):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.FAILED)
+        self.assertEqual(self.job.error, 'quota exceeded')
+        self.assertIsNone(self.job.quiz)
+
+    def test_cancelled_during_generation(self):
+        """Test that a job cancelled while its questions are generated keeps no quiz"""
+        def generate(backend, transcript, title, count, options):
+            QuizGenerationJob.objects.filter(pk=self.job.pk).update(status=QuizGenerationJob.Status.CANCELLED)
+            return local_generate(backend, transcript, title, count, options)
+
+        with patch('app_quiz.api.jobs.download_and_transcribe', return_value=(TRANSCRIPT, 'Plants')), \
+                patch.object(LocalBackend, 'generate', autospec=True, side_effect=generate):
+            run_job(self.job.pk)
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, QuizGenerationJob.Status.CANCELLED)
+        self.assertIsNone(self.job.quiz)
+        self.assertFalse(Quiz.objects.exists())
+
+
+@override_settings(**QUESTION_SETTINGS, QUIZ_QUESTION_CHUNK_TOKENS=15, QUIZ_QUESTION_MAX_CONCURRENCY=2)
+class MapReduceTests(TestCase):
+    """Test cases for splitting long transcripts over concurrent requests"""
+
+    def setUp(self):
+        # The executor is sized on first use; give each test a fresh one
+        patcher = patch('app_quiz.api.questions._llm_executor', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunks_generated_concurrently(self):
+        """Test that every chunk gets its own request, at most QUIZ_QUESTION_MAX_CONCURRENCY at a time"""
+        lock = threading.Lock()
+        running, peak, parts = [0], [0], []
+
+        def generate(backend, transcript, title, count, options, part=None):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                parts.append(part)
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return local_generate(backend, transcript, title, count, options, part)
+
+        stats = {}
+        with patch.object(LocalBackend, 'generate', autospec=True, side_effect=generate):
+            payload = generate_questions(TRANSCRIPT, 'Plants', progress=lambda stage, **info: stats.update(info))
+
+        chunks = stats['question_chunks']
+        self.assertGreater(chunks, 2)
+        self.assertEqual(sorted(parts), [(index, chunks) for index in range(1, chunks + 1)])
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(len(payload['questions']), 3)
+
+    def test_failed_chunks_are_skipped(self):
+        """Test that the quiz is built from the chunks that succeeded"""
+        def generate(backend, transcript, title, count, options, part=None):
+            if part[0] == 1:
+                raise QuestionGenerationError('invalid JSON')
+            return local_generate(backend, transcript, title, count, options, part)
+
+        with patch.object(LocalBackend, 'generate', autospec=True, side_effect=generate):
+            payload = generate_questions(TRANSCRIPT, 'Plants')
+
+        self.assertNotIn('Photosynthesis', [item['answer'] for item in payload['questions']])
+        self.assertTrue(payload['questions'])
+
+    def test_unexpected_chunk_errors_are_skipped(self):
+        """Test that a chunk failing with a transport error is skipped like any failed chunk"""
+        def generate(backend, transcript, title, count, options, part=None):
+            if part[0] == 2:
+                raise TimeoutError('The read operation timed out')
+            return local_generate(backend, transcript, title, count, options, part)
+
+        with patch.object(LocalBackend, 'generate', autospec=True, side_effect=generate):
+            payload = generate_questions(TRANSCRIPT, 'Plants')
+
+        self.assertTrue(payload['questions'])
+
+    def test_reduce_spreads_and_deduplicates(self):
+        """Test that questions are taken from all chunks in turn and near-duplicates dropped"""
+        first = {'title': 'Plants', 'description': 'Part one', 'questions': [
+            question('What do plants store as energy?', answer='a'),
+            question('What do leaves absorb?', answer='b'),
+        ]}
+        second = {'title': 'Plants', 'description': 'Part two', 'questions': [
+            question('What do plants store as energy?', answer='a'),
+            question('Which gas is released?', answer='c'),
+        ]}
+
+        result = reduce_questions([first, second], count=3)
+
+        self.assertEqual(result['description'], 'Part one')
+        self.assertEqual(
+            [item['question_title'] for item in result['questions']],
+            ['What do plants store as energy?', 'What do leaves absorb?', 'Which gas is released?'],
+        )
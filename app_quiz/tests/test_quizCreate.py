@@ -1,8 +1,11 @@
+from unittest.mock import patch
+
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from ..models import Quiz, Question
+from ..api.utils import VideoRejectedError
+from ..models import Quiz, Question, QuizGenerationJob
 
 User = get_user_model()
 
@@ -13,6 +16,17 @@ class QuizCreateTests(APITestCase):
         self.create_quiz_url = reverse(
             'create_quiz_from_url')  # /api/createQuiz/
 
+        # Metadata probe would hit YouTube; answer with a short video instead
+        probe_patcher = patch('app_quiz.api.views.probe_video', return_value={
+            'video_id': 'TxHM390wrRk',
+            'title': 'Test Video',
+            'duration': 300,
+            'filesize': 5 * 1024 * 1024,
+            'model_name': 'base',
+        })
+        self.probe_video = probe_patcher.start()
+        self.addCleanup(probe_patcher.stop)
+
         # Test user data
         self.user_data = {
             'username': 'testuser',
@@ -489,3 +503,73 @@ class QuizCreateTests(APITestCase):
         self.assertIsNotNone(response.data['id'])
         self.assertIsNotNone(response.data['created_at'])
         self.assertIsNotNone(response.data['updated_at'])
+
+    def test_create_quiz_returns_accepted_job(self):
+        """Test that creating a quiz queues a job and answers with 202 right away"""
+        user = self.authenticate_user()
+
+        with patch('app_quiz.api.views.enqueue_job') as enqueue_job:
+            response = self.client.post(
+                self.create_quiz_url, {'url': 'https://www.youtube.com/watch?v=TxHM390wrRk'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], QuizGenerationJob.Status.QUEUED)
+        self.assertIsNone(response.data['quiz'])
+
+        job = QuizGenerationJob.objects.get(pk=response.data['id'])
+        self.assertEqual(job.owner, user)
+        self.assertEqual(job.duration, 300)
+        self.assertEqual(job.model_name, 'base')
+        enqueue_job.assert_called_once_with(job)
+
+    def test_create_quiz_unauthenticated(self):
+        """Test creating a quiz without authentication"""
+        response = self.client.post(
+            self.create_quiz_url, {'url': 'https://www.youtube.com/watch?v=TxHM390wrRk'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(QuizGenerationJob.objects.exists())
+
+    def test_create_quiz_invalid_url(self):
+        """Test creating a quiz with an invalid URL"""
+        self.authenticate_user()
+
+        response = self.client.post(self.create_quiz_url, {'url': 'not-a-valid-url'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('url', response.data)
+
+    def test_create_quiz_normalizes_youtube_url(self):
+        """Test that the job stores the canonical YouTube URL"""
+        self.authenticate_user()
+
+        with patch('app_quiz.api.views.enqueue_job'):
+            response = self.client.post(
+                self.create_quiz_url, {'url': 'https://youtu.be/TxHM390wrRk?si=MQFw2eEIvF4LeD3S'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['video_url'], 'https://www.youtube.com/watch?v=TxHM390wrRk')
+
+    def test_create_quiz_non_youtube_url(self):
+        """Test creating a quiz from a URL that is not a YouTube video"""
+        self.authenticate_user()
+
+        response = self.client.post(
+            self.create_quiz_url, {'url': 'https://www.example.com/video'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('url', response.data)
+
+    def test_create_quiz_rejected_by_probe(self):
+        """Test that videos over the admission limits are rejected before a job is created"""
+        self.authenticate_user()
+        self.probe_video.side_effect = VideoRejectedError('Live streams are not supported.')
+
+        with patch('app_quiz.api.views.enqueue_job') as enqueue_job:
+            response = self.client.post(
+                self.create_quiz_url, {'url': 'https://www.youtube.com/watch?v=TxHM390wrRk'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('url', response.data)
+        self.assertFalse(QuizGenerationJob.objects.exists())
+        enqueue_job.assert_not_called()
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from ..models import Question, Quiz
+
+User = get_user_model()
+
+
+class QuizViewSetTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        self.quizzes = [self.create_quiz(self.user, f'Mine {number}') for number in range(3)]
+        self.foreign = self.create_quiz(self.other, 'Theirs')
+        self.client.force_authenticate(user=self.user)
+
+    def create_quiz(self, owner, title):
+        quiz = Quiz.objects.create(
+            owner=owner, title=title, description='A quiz', video_url='https://www.youtube.com/watch?v=TxHM390wrRk')
+        Question.objects.create(quiz=quiz, question_title='Hello?', question_options=['hello', 'world'],
+                                answer='hello')
+        return quiz
+
+    def test_list_only_own_quizzes(self):
+        """Test that the list holds the caller's quizzes, newest first, and no one else's"""
+        response = self.client.get(reverse('quiz-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([quiz['title'] for quiz in response.data], ['Mine 2', 'Mine 1', 'Mine 0'])
+
+    def test_list_queries_filter_by_owner(self):
+        """Test that the list reads the caller's rows with one filtered query plus the question prefetch"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('quiz-list'))
+
+        quiz_queries = [query['sql'] for query in queries if 'FROM "app_quiz_quiz"' in query['sql']]
+        self.assertEqual(len(quiz_queries), 1)
+        self.assertIn('"app_quiz_quiz"."owner_id" =', quiz_queries[0])
+        self.assertEqual(sum('FROM "app_quiz_question"' in query['sql'] for query in queries), 1)
+
+    def test_foreign_quiz_not_found(self):
+        """Test that another user's quiz can neither be read nor deleted"""
+        url = reverse('quiz-detail', args=[self.foreign.pk])
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Quiz.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_own_quiz_detail(self):
+        """Test that the owner can read and delete their quiz"""
+        url = reverse('quiz-detail', args=[self.quizzes[0].pk])
+
+        self.assertEqual(self.client.get(url).data['questions'][0]['answer'], 'hello')
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Quiz.objects.filter(pk=self.quizzes[0].pk).exists())
+
+    def test_unauthenticated(self):
+        """Test that quizzes are not listed without credentials"""
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(self.client.get(reverse('quiz-list')).status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..api.scheduler import choose_next_job, claim_next_job
+from ..models import QuizGenerationJob
+
+User = get_user_model()
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+SCHEDULER_SETTINGS = dict(
+    WHISPER_MODEL_REALTIME_FACTORS={'tiny': 0.1},
+    QUIZ_JOB_OVERHEAD_SECONDS=10,
+    QUIZ_SCHEDULER_AGING_RATE=0.5,
+)
+
+
+def queued_job(job_id, owner_id, duration, waited_seconds=0):
+    return {
+        "id": job_id,
+        "owner_id": owner_id,
+        "duration": duration,
+        "model_name": "tiny",
+        "created_at": NOW - timedelta(seconds=waited_seconds),
+    }
+
+
+@override_settings(**SCHEDULER_SETTINGS)
+class ChooseNextJobTests(SimpleTestCase):
+    """Test cases for the shortest-job-first, per-user round-robin policy"""
+
+    def test_shortest_job_first(self):
+        """Test that a short video overtakes a long one queued just before it"""
+        queue = [queued_job(1, 1, duration=3 * 60 * 60, waited_seconds=10), queued_job(2, 1, duration=300)]
+
+        job, decision = choose_next_job(queue, {}, {}, NOW)
+
+        self.assertEqual(job["id"], 2)
+        self.assertEqual(decision["reason"], "shortest")
+        self.assertEqual(decision["expected_seconds"], 40)
+
+    def test_long_jobs_age(self):
+        """Test that a long job wins once it has waited long enough"""
+        # Expected 1090s vs 40s: the long job needs (1090 - 40) / 0.5 = 2100s more waiting
+        queue = [queued_job(1, 1, duration=10800, waited_seconds=2200), queued_job(2, 1, duration=300)]
+
+        job, decision = choose_next_job(queue, {}, {}, NOW)
+
+        self.assertEqual(job["id"], 1)
+        self.assertEqual(decision["reason"], "aged")
+        self.assertEqual(decision["queue_wait_seconds"], 2200)
+
+    def test_users_take_turns(self):
+        """Test that a user with running jobs waits for users without"""
+        queue = [queued_job(1, 1, duration=60), queued_job(2, 2, duration=3600)]
+
+        job, _ = choose_next_job(queue, {1: 1}, {1: NOW}, NOW)
+        self.assertEqual(job["id"], 2)
+
+        # Equal running counts: whoever was served least recently goes first
+        job, _ = choose_next_job(queue, {}, {1: NOW, 2: NOW - timedelta(minutes=5)}, NOW)
+        self.assertEqual(job["id"], 2)
+
+    def test_empty_queue(self):
+        """Test that nothing is chosen from an empty queue"""
+        self.assertEqual(choose_next_job([], {}, {}, NOW), (None, None))
+
+
+@override_settings(**SCHEDULER_SETTINGS)
+class ClaimNextJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+
+    def create_job(self, duration, **fields):
+        return QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk',
+            duration=duration, model_name='tiny', **fields)
+
+    def test_claim_marks_job_started(self):
+        """Test that claimed jobs are started once and record the scheduler decision"""
+        long_job = self.create_job(3600)
+        short_job = self.create_job(60)
+
+        self.assertEqual(claim_next_job(), short_job.pk)
+        self.assertEqual(claim_next_job(), long_job.pk)
+        self.assertIsNone(claim_next_job())
+
+        short_job.refresh_from_db()
+        self.assertIsNotNone(short_job.started_at)
+        self.assertEqual(short_job.stats["scheduler"]["reason"], "shortest")
+        self.assertEqual(short_job.stats["scheduler"]["queued_jobs"], 2)
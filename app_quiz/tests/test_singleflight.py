@@ -0,0 +1,193 @@
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+
+from ..api.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for in-flight request deduplication"""
+
+    def run_followers(self, flight, key, fn, callers, release):
+        """Start followers, release the leader once all of them attached and collect outcomes"""
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + 2
+        while flight.shared < callers and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers for the same key wait for the first one"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work(broadcast):
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return "transcript"
+
+        leader = threading.Thread(target=lambda: flight.do("video", work))
+        leader.start()
+        started.wait(2)
+
+        results, errors = self.run_followers(flight, "video", work, 5, release)
+        leader.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["transcript"] * 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(flight.shared, 5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_is_shared(self):
+        """Test that followers receive the leader's exception"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(broadcast):
+            started.set()
+            release.wait(2)
+            raise RuntimeError("download failed")
+
+        leader_errors = []
+
+        def lead():
+            try:
+                flight.do("video", work)
+            except RuntimeError as error:
+                leader_errors.append(error)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait(2)
+
+        results, errors = self.run_followers(flight, "video", work, 3, release)
+        leader.join()
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(len(leader_errors), 1)
+
+    def test_progress_broadcast_to_followers(self):
+        """Test that followers get the current stage and later progress events"""
+        flight = SingleFlight()
+        downloading = threading.Event()
+        follower_attached = threading.Event()
+        follower_events = []
+
+        def work(broadcast):
+            broadcast("downloading")
+            downloading.set()
+            follower_attached.wait(2)
+            broadcast("transcribing")
+            return "transcript"
+
+        def follower_listener(stage, **info):
+            follower_events.append(stage)
+            follower_attached.set()
+
+        leader = threading.Thread(target=lambda: flight.do("video", work))
+        leader.start()
+        downloading.wait(2)
+
+        self.assertEqual(flight.do("video", work, listener=follower_listener), "transcript")
+        leader.join()
+
+        self.assertEqual(follower_events, ["downloading", "transcribing"])
+
+    def test_sequential_calls_run_again(self):
+        """Test that the key is released once the work finishes"""
+        flight = SingleFlight()
+        calls = []
+
+        flight.do("video", lambda broadcast: calls.append(1))
+        flight.do("video", lambda broadcast: calls.append(1))
+
+        self.assertEqual(len(calls), 2)
+
+    def test_cancelled_only_when_every_caller_gave_up(self):
+        """Test that shared work is cancelled only once the leader and all followers cancelled"""
+        flight = SingleFlight()
+        started = threading.Event()
+        follower_attached = threading.Event()
+        leader_cancelled = threading.Event()
+        follower_cancelled = threading.Event()
+        observed = []
+
+        def work(broadcast):
+            started.set()
+            follower_attached.wait(2)
+            observed.append(flight.cancelled("video"))
+            leader_cancelled.set()
+            observed.append(flight.cancelled("video"))
+            follower_cancelled.set()
+            observed.append(flight.cancelled("video"))
+            return "transcript"
+
+        leader = threading.Thread(target=lambda: flight.do("video", work, cancelled=leader_cancelled.is_set))
+        leader.start()
+        started.wait(2)
+
+        follower = threading.Thread(target=lambda: flight.do(
+            "video", work, listener=lambda stage, **info: None, cancelled=follower_cancelled.is_set))
+        follower.start()
+        while flight.shared == 0:
+            time.sleep(0.01)
+        follower_attached.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(observed, [False, False, True])
+        self.assertFalse(flight.cancelled("video"))
+
+    def test_cancelled_follower_stops_waiting(self):
+        """Test that a cancelled follower gives up while the leader keeps running"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        follower_cancelled = threading.Event()
+        follower_events = []
+
+        def work(broadcast):
+            started.set()
+            release.wait(2)
+            broadcast("transcribing")
+            return "transcript"
+
+        leader_results = []
+        leader = threading.Thread(target=lambda: leader_results.append(flight.do("video", work)))
+        leader.start()
+        started.wait(2)
+
+        follower_cancelled.set()
+        with self.assertRaises(CancelledError):
+            flight.do("video", work, listener=lambda stage, **info: follower_events.append(stage),
+                      cancelled=follower_cancelled.is_set, poll_seconds=0.01)
+
+        self.assertFalse(flight.cancelled("video"))
+        release.set()
+        leader.join()
+
+        self.assertEqual(leader_results, ["transcript"])
+        self.assertEqual(follower_events, [])
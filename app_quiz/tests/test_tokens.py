@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from ..api.tokens import chunk_text, count_tokens
+
+
+class ChunkTextTests(SimpleTestCase):
+    """Test cases for token-bounded transcript chunks"""
+
+    def test_chunks_end_at_sentences(self):
+        """Test that chunks keep whole sentences, stay within the limit and keep all words"""
+        text = " ".join(f"Sentence number {index} talks about topic {index}." for index in range(20))
+
+        chunks = chunk_text(text, 30)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 30)
+            self.assertTrue(chunk.startswith("Sentence number") and chunk.endswith("."))
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_long_sentence_is_cut_between_words(self):
+        """Test that an unpunctuated transcript is still split"""
+        text = " ".join(["word"] * 100)
+
+        chunks = chunk_text(text, 25)
+
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(sum(len(chunk.split()) for chunk in chunks), 100)
+
+    def test_short_text_is_one_chunk(self):
+        """Test that text within the limit is returned unchanged"""
+        self.assertEqual(chunk_text("Hello world. Bye.", 100), ["Hello world. Bye."])
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+from ..api.transcript_cache import TranscriptStore
+from ..api.utils import download_and_transcribe
+from ..models import Transcript
+
+
+class TranscriptStoreTests(TestCase):
+    """Test cases for the persistent transcript cache"""
+
+    def test_put_and_get(self):
+        """Test that a stored transcript is returned and counted as a hit"""
+        store = TranscriptStore()
+        self.assertIsNone(store.get("TxHM390wrRk", "tiny"))
+
+        store.put("TxHM390wrRk", "tiny", None, "hello world", "Test Video")
+
+        self.assertEqual(store.get("TxHM390wrRk", "tiny"), ("hello world", "Test Video"))
+        self.assertEqual(store.stats()["hits"], 1)
+        self.assertEqual(store.stats()["misses"], 1)
+        self.assertEqual(Transcript.objects.get().hits, 1)
+
+    def test_key_includes_model_and_language(self):
+        """Test that model name and language are part of the cache key"""
+        store = TranscriptStore()
+        store.put("TxHM390wrRk", "tiny", "en", "hello world")
+
+        self.assertIsNone(store.get("TxHM390wrRk", "base", "en"))
+        self.assertIsNone(store.get("TxHM390wrRk", "tiny", "de"))
+        self.assertIsNotNone(store.get("TxHM390wrRk", "tiny", "en"))
+
+    def test_expired_entries_are_misses(self):
+        """Test that entries older than max_age are dropped"""
+        store = TranscriptStore(max_age=60)
+        store.put("TxHM390wrRk", "tiny", None, "hello world")
+        Transcript.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertIsNone(store.get("TxHM390wrRk", "tiny"))
+        self.assertFalse(Transcript.objects.exists())
+
+    def test_least_recently_used_evicted_over_size_budget(self):
+        """Test that the store evicts least recently used entries when over max_bytes"""
+        store = TranscriptStore(max_bytes=25)
+        store.put("aaaaaaaaaaa", "tiny", None, "x" * 10)
+        store.put("bbbbbbbbbbb", "tiny", None, "x" * 10)
+        store.get("aaaaaaaaaaa", "tiny")
+
+        store.put("ccccccccccc", "tiny", None, "x" * 10)
+
+        remaining = set(Transcript.objects.values_list("video_id", flat=True))
+        self.assertEqual(remaining, {"aaaaaaaaaaa", "ccccccccccc"})
+
+    def test_download_and_transcribe_uses_cache(self):
+        """Test that a cached video is served without yt-dlp for any URL shape"""
+        TranscriptStore().put("TxHM390wrRk", "tiny", None, "cached text", "Cached Video")
+
+        with patch("app_quiz.api.utils.yt_dlp.YoutubeDL") as youtube_dl:
+            result = download_and_transcribe("https://youtu.be/TxHM390wrRk?si=MQFw2eEIvF4LeD3S", model_name="tiny")
+
+        self.assertEqual(result, ("cached text", "Cached Video"))
+        youtube_dl.assert_not_called()
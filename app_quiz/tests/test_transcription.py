@@ -0,0 +1,192 @@
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from ..api.transcription import (
+    escalate_weak_segments,
+    transcribe_audio,
+    find_cut_points,
+    find_weak_regions,
+    make_windows,
+    stitch_segments,
+)
+
+SR = 16000
+
+
+def tone(seconds):
+    return (np.sin(np.linspace(0, 440 * 2 * np.pi * seconds, int(seconds * SR))) * 0.5).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class TestChunkedTranscription(unittest.TestCase):
+    """Test cases for splitting audio into chunks and stitching the transcripts"""
+
+    def test_short_audio_is_not_split(self):
+        """Test that audio shorter than one chunk stays in one piece"""
+        audio = tone(5)
+        self.assertEqual(find_cut_points(audio, chunk_seconds=10, search_seconds=2), [0, len(audio)])
+
+    def test_cuts_snap_to_silence(self):
+        """Test that cut points move to the nearest pause"""
+        audio = np.concatenate([tone(9), silence(1), tone(9), silence(1), tone(9)])
+
+        cuts = find_cut_points(audio, chunk_seconds=10, search_seconds=2)
+
+        self.assertEqual(cuts[0], 0)
+        self.assertEqual(cuts[-1], len(audio))
+        self.assertEqual(len(cuts), 4)
+        for cut, pause_start in zip(cuts[1:-1], (9, 19)):
+            self.assertGreaterEqual(cut, pause_start * SR)
+            self.assertLess(cut, (pause_start + 1) * SR)
+
+    def test_short_first_chunk(self):
+        """Test that a shorter first chunk is cut earlier for quick first results"""
+        audio = np.concatenate([tone(2), silence(1), tone(27)])
+
+        cuts = find_cut_points(audio, chunk_seconds=10, search_seconds=1, first_chunk_seconds=2.5)
+
+        self.assertGreaterEqual(cuts[1], 2 * SR)
+        self.assertLess(cuts[1], 3 * SR)
+        self.assertEqual(len(cuts), 5)
+
+    def test_windows_overlap_neighbours(self):
+        """Test that windows extend into their neighbours by the overlap"""
+        windows = make_windows([0, 10 * SR, 20 * SR], overlap_seconds=1, total=20 * SR)
+
+        self.assertEqual(windows, [
+            (0, 11 * SR, 0, 10 * SR),
+            (9 * SR, 20 * SR, 10 * SR, 20 * SR),
+        ])
+
+    def test_stitch_drops_overlap_duplicates(self):
+        """Test that segments transcribed in two windows appear once with absolute timestamps"""
+        windows = make_windows([0, 10 * SR, 20 * SR], overlap_seconds=1, total=20 * SR)
+        first = [
+            {"start": 0.0, "end": 4.0, "text": " One."},
+            {"start": 8.5, "end": 10.8, "text": " Two."},
+        ]
+        second = [
+            # Same sentence seen again at the start of the next window
+            {"start": 0.0, "end": 1.8, "text": " Two."},
+            {"start": 2.0, "end": 6.0, "text": " Three."},
+        ]
+
+        segments = stitch_segments([first, second], windows)
+
+        self.assertEqual([segment["text"] for segment in segments], [" One.", " Two.", " Three."])
+        self.assertEqual([segment["id"] for segment in segments], [0, 1, 2])
+        self.assertAlmostEqual(segments[2]["start"], 11.0)
+        self.assertAlmostEqual(segments[2]["end"], 15.0)
+
+
+def segment(start, end, text, avg_logprob=-0.2, no_speech_prob=0.01):
+    return {"start": start, "end": end, "text": text, "avg_logprob": avg_logprob, "no_speech_prob": no_speech_prob}
+
+
+class FakeRegistry:
+    def __init__(self, segments):
+        self.segments = segments
+        self.calls = []
+
+    @contextmanager
+    def acquire(self, model_name):
+        test_registry = self
+
+        class Model:
+            device = SimpleNamespace(type="cpu")
+
+            def transcribe(self, audio, language=None, fp16=True):
+                test_registry.fp16 = fp16
+                test_registry.calls.append((model_name, len(audio) / SR, language))
+                return {"segments": test_registry.segments}
+
+        yield Model()
+
+
+@override_settings(
+    WHISPER_PARALLEL_WORKERS=0,
+    WHISPER_ESCALATION_LOGPROB_THRESHOLD=-0.8,
+    WHISPER_ESCALATION_NO_SPEECH_THRESHOLD=0.6,
+    WHISPER_ESCALATION_MERGE_GAP_SECONDS=1.0,
+    WHISPER_ESCALATION_PADDING_SECONDS=0.5,
+)
+class TestModelEscalation(SimpleTestCase):
+    """Test cases for re-transcribing weak segments with a larger model"""
+
+    def test_find_weak_regions(self):
+        """Test that unsure segments are merged and likely silence is ignored"""
+        segments = [
+            segment(0, 2, " Sure."),
+            segment(2, 4, " Unsure.", avg_logprob=-1.2),
+            segment(4.5, 6, " Also unsure.", avg_logprob=-0.9),
+            segment(6, 8, " Music.", avg_logprob=-1.5, no_speech_prob=0.9),
+            segment(10, 12, " Unsure again.", avg_logprob=-1.0),
+        ]
+
+        self.assertEqual(find_weak_regions(segments, -0.8, 0.6, 1.0), [(2, 6), (10, 12)])
+
+    def test_escalation_replaces_only_weak_segments(self):
+        """Test that the larger model's segments replace the weak ones with absolute timestamps"""
+        result = {
+            "text": " One. Tow. Three.",
+            "language": "en",
+            "segments": [segment(0, 2, " One."), segment(2, 4, " Tow.", avg_logprob=-1.3), segment(4, 6, " Three.")],
+        }
+        registry = FakeRegistry([segment(0.5, 2.5, " Two.")])
+
+        with patch("app_quiz.api.transcription.model_registry", registry):
+            escalated = escalate_weak_segments(np.zeros(6 * SR, dtype=np.float32), result, "small")
+
+        self.assertEqual(registry.calls, [("small", 3.0, "en")])
+        self.assertFalse(registry.fp16)
+        self.assertEqual(escalated["text"], " One. Two. Three.")
+        self.assertEqual([item["id"] for item in escalated["segments"]], [0, 1, 2])
+        self.assertAlmostEqual(escalated["segments"][1]["start"], 2.0)
+        self.assertEqual(escalated["escalated_seconds"], 2)
+
+    def test_confident_transcript_is_not_escalated(self):
+        """Test that the larger model is not used when every segment is confident"""
+        result = {"text": " One.", "language": "en", "segments": [segment(0, 2, " One.")]}
+        registry = FakeRegistry([])
+
+        with patch("app_quiz.api.transcription.model_registry", registry):
+            escalated = escalate_weak_segments(np.zeros(2 * SR, dtype=np.float32), result, "small")
+
+        self.assertEqual(registry.calls, [])
+        self.assertEqual(escalated["escalated_seconds"], 0.0)
+        self.assertEqual(escalated["text"], " One.")
+
+
+@override_settings(
+    WHISPER_PARALLEL_WORKERS=0,
+    WHISPER_ESCALATION_MODEL=None,
+    WHISPER_CHUNK_SECONDS=10,
+    WHISPER_CHUNK_SEARCH_SECONDS=1,
+    WHISPER_CHUNK_OVERLAP_SECONDS=0,
+    WHISPER_STREAM_FIRST_CHUNK_SECONDS=5,
+)
+class TestSegmentStreaming(SimpleTestCase):
+    """Test cases for handing out segments while transcription is still running"""
+
+    def test_segments_reported_per_window(self):
+        """Test that every window's segments are reported in order with absolute timestamps"""
+        registry = FakeRegistry([segment(0.5, 1.5, " Hi.")])
+
+        reported = []
+        with patch("app_quiz.api.transcription.model_registry", registry):
+            result = transcribe_audio(tone(15), "tiny", on_segments=reported.append)
+
+        first_window, second_window = [call[1] for call in registry.calls]
+        self.assertAlmostEqual(first_window, 5.0, delta=1.0)
+        self.assertAlmostEqual(first_window + second_window, 15.0)
+        self.assertEqual(len(reported), 2)
+        self.assertAlmostEqual(reported[1][0]["start"], first_window + 0.5)
+        self.assertEqual(result["text"], " Hi. Hi.")
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from ..api.vad import SpeechTimeline, detect_speech_regions, trim_silence
+
+SR = 16000
+
+
+def tone(seconds, frequency=1000, amplitude=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.float32)
+
+
+def silence(seconds):
+    return np.random.default_rng(0).normal(0, 1e-4, int(seconds * SR)).astype(np.float32)
+
+
+class TestVoiceActivityDetection(unittest.TestCase):
+    """Test cases for trimming silence before transcription"""
+
+    def test_speech_regions_found_between_silence(self):
+        """Test that regions cover the loud speech-band parts only"""
+        audio = np.concatenate([silence(5), tone(3), silence(4), tone(2), silence(5)])
+
+        regions = detect_speech_regions(audio, padding_seconds=0)
+
+        self.assertEqual(len(regions), 2)
+        self.assertAlmostEqual(regions[0][0] / SR, 5, delta=0.1)
+        self.assertAlmostEqual(regions[0][1] / SR, 8, delta=0.1)
+        self.assertAlmostEqual(regions[1][0] / SR, 12, delta=0.1)
+        self.assertAlmostEqual(regions[1][1] / SR, 14, delta=0.1)
+
+    def test_low_frequency_hum_is_not_speech(self):
+        """Test that loud energy outside the speech band is skipped"""
+        audio = np.concatenate([silence(2), tone(5, frequency=60), silence(2), tone(2), silence(2)])
+
+        regions = detect_speech_regions(audio, padding_seconds=0)
+
+        self.assertEqual(len(regions), 1)
+        self.assertAlmostEqual(regions[0][0] / SR, 9, delta=0.1)
+
+    def test_short_pauses_stay_inside_region(self):
+        """Test that pauses shorter than min_silence_seconds do not split a region"""
+        audio = np.concatenate([silence(2), tone(2), silence(0.5), tone(2), silence(2)])
+
+        self.assertEqual(len(detect_speech_regions(audio, min_silence_seconds=1.0)), 1)
+
+    def test_trim_silence_reports_skipped_seconds(self):
+        """Test that trimming returns the speech audio and how much was cut"""
+        audio = np.concatenate([silence(10), tone(4), silence(6)])
+
+        speech, timeline, skipped = trim_silence(audio, padding_seconds=0)
+
+        self.assertAlmostEqual(len(speech) / SR, 4, delta=0.1)
+        self.assertAlmostEqual(skipped, 16, delta=0.1)
+
+    def test_timeline_restores_original_timestamps(self):
+        """Test that timestamps in trimmed audio map back to the original recording"""
+        timeline = SpeechTimeline([(10 * SR, 14 * SR), (20 * SR, 25 * SR)])
+
+        segments = timeline.restore_segments([
+            {"start": 0.5, "end": 3.0, "text": " One."},
+            {"start": 4.5, "end": 8.0, "text": " Two."},
+        ])
+
+        self.assertAlmostEqual(segments[0]["start"], 10.5)
+        self.assertAlmostEqual(segments[0]["end"], 13.0)
+        self.assertAlmostEqual(segments[1]["start"], 20.5)
+        self.assertAlmostEqual(segments[1]["end"], 24.0)
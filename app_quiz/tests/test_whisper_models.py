@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+import torch
+from whisper.model import ModelDimensions, Whisper
+
+from ..api.whisper_models import WhisperModelRegistry, quantize_model, transcribe_options
+
+
+class FakeLoader:
+    """Stand-in for whisper.load_model that records how often it is called"""
+
+    def __init__(self, delay=0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, name, device=None):
+        self.calls.append((name, device))
+        time.sleep(self.delay)
+        return object()
+
+
+class TestWhisperModelRegistry(unittest.TestCase):
+    """Test cases for the process-wide Whisper model registry"""
+
+    def test_model_loaded_once_and_reused(self):
+        """Test that repeated lookups reuse the loaded model"""
+        loader = FakeLoader()
+        registry = WhisperModelRegistry(loader=loader)
+
+        first = registry.get("tiny", "cpu")
+        second = registry.get("tiny", "cpu")
+
+        self.assertIs(first, second)
+        self.assertEqual(loader.calls, [("tiny", "cpu")])
+        self.assertEqual(registry.stats()["loads"], 1)
+        self.assertEqual(registry.stats()["hits"], 1)
+
+    def test_models_keyed_by_name_and_device(self):
+        """Test that different names and devices get separate models"""
+        loader = FakeLoader()
+        registry = WhisperModelRegistry(loader=loader)
+
+        registry.get("tiny", "cpu")
+        registry.get("base", "cpu")
+        registry.get("tiny", "cuda")
+
+        self.assertEqual(len(loader.calls), 3)
+        self.assertEqual(len(registry.stats()["loaded"]), 3)
+
+    def test_concurrent_first_use_loads_once(self):
+        """Test that threads racing on a cold model share a single load"""
+        loader = FakeLoader(delay=0.05)
+        registry = WhisperModelRegistry(loader=loader)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get("tiny", "cpu")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(loader.calls), 1)
+        self.assertEqual(len({id(model) for model in results}), 1)
+
+    def test_idle_models_are_evicted(self):
+        """Test that models unused for longer than the idle timeout are dropped"""
+        loader = FakeLoader()
+        registry = WhisperModelRegistry(loader=loader, idle_timeout=0.01)
+        registry._start_reaper = lambda: None
+
+        registry.get("tiny", "cpu")
+        time.sleep(0.02)
+
+        self.assertEqual(registry.evict_idle(), 1)
+        self.assertEqual(registry.stats()["loaded"], [])
+
+        registry.get("tiny", "cpu")
+        self.assertEqual(len(loader.calls), 2)
+
+    def test_model_in_use_is_not_evicted(self):
+        """Test that a model held via acquire() survives eviction"""
+        registry = WhisperModelRegistry(loader=FakeLoader(), idle_timeout=0.01)
+        registry._start_reaper = lambda: None
+
+        with registry.acquire("tiny", "cpu"):
+            time.sleep(0.02)
+            self.assertEqual(registry.evict_idle(), 0)
+
+
+class TestCpuProfile(unittest.TestCase):
+    """Test cases for the CPU inference profile"""
+
+    def test_quantize_model(self):
+        """Test that all Linear layers are quantized and the model still decodes"""
+        dims = ModelDimensions(
+            n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+            n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1,
+        )
+        model = Whisper(dims)
+        # Whisper allocates the decoder's positional embedding uninitialized; real checkpoints overwrite it
+        torch.nn.init.normal_(model.decoder.positional_embedding, std=0.01)
+        model = quantize_model(model)
+
+        linear_layers = [module for module in model.modules() if type(module) is torch.nn.Linear]
+        quantized = [module for module in model.modules() if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)]
+        self.assertEqual(linear_layers, [])
+        self.assertEqual(len(quantized), 16)
+        self.assertEqual(transcribe_options(model), {"fp16": False})
+
+        result = model.transcribe(
+            np.zeros(16000, dtype=np.float32), language="en", temperature=0, **transcribe_options(model)
+        )
+        self.assertIn("text", result)
@@ -0,0 +1,139 @@
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..api.jobs import (
+    dispatch_queued_jobs,
+    enqueue_job,
+    requeue_expired_leases,
+    run_next_job,
+    run_worker,
+    start_job_dispatcher,
+)
+from ..models import QuizGenerationJob
+
+User = get_user_model()
+
+
+class WorkerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpass123')
+
+    def create_job(self, **fields):
+        return QuizGenerationJob.objects.create(
+            owner=self.user, video_url='https://www.youtube.com/watch?v=TxHM390wrRk', **fields)
+
+
+@override_settings(QUIZ_JOB_LEASE_SECONDS=60)
+class RunNextJobTests(WorkerTestCase):
+    def test_claim_leases_job(self):
+        """Test that the claimed job records its worker and lease before it runs"""
+        job = self.create_job()
+
+        with patch('app_quiz.api.jobs.run_job') as run_job:
+            self.assertEqual(run_next_job("host:1"), job.pk)
+
+        run_job.assert_called_once_with(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.worker, "host:1")
+        self.assertAlmostEqual(
+            (job.lease_expires_at - job.started_at).total_seconds(), 60, delta=1)
+
+    def test_empty_queue(self):
+        """Test that nothing runs when no job is queued"""
+        with patch('app_quiz.api.jobs.run_job') as run_job:
+            self.assertIsNone(run_next_job("host:1"))
+        run_job.assert_not_called()
+
+    def test_expired_lease_is_requeued(self):
+        """Test that a job whose worker stopped renewing its lease is queued and runs again"""
+        now = timezone.now()
+        crashed = self.create_job(
+            status=QuizGenerationJob.Status.TRANSCRIBING, started_at=now - timedelta(minutes=5),
+            worker="host:1", lease_expires_at=now - timedelta(seconds=1), checkpoint={"metadata": {"id": "x"}})
+        alive = self.create_job(
+            status=QuizGenerationJob.Status.TRANSCRIBING, started_at=now,
+            worker="host:2", lease_expires_at=now + timedelta(seconds=60))
+        done = self.create_job(
+            status=QuizGenerationJob.Status.DONE, started_at=now - timedelta(minutes=5),
+            worker="host:3", lease_expires_at=now - timedelta(seconds=1))
+
+        self.assertEqual(requeue_expired_leases(), [crashed.pk])
+
+        crashed.refresh_from_db()
+        self.assertEqual(crashed.status, QuizGenerationJob.Status.QUEUED)
+        self.assertIsNone(crashed.started_at)
+        self.assertEqual(crashed.worker, "")
+        self.assertEqual(crashed.checkpoint, {"metadata": {"id": "x"}})
+        self.assertEqual(crashed.events.last().data["status"], QuizGenerationJob.Status.QUEUED)
+        for job in (alive, done):
+            job.refresh_from_db()
+            self.assertIsNotNone(job.lease_expires_at)
+
+        with patch('app_quiz.api.jobs.run_job'):
+            self.assertEqual(run_next_job("host:4"), crashed.pk)
+
+
+class RunWorkerTests(WorkerTestCase):
+    @override_settings(QUIZ_WORKER_POLL_SECONDS=0)
+    def test_worker_stops_after_current_job(self):
+        """Test that a worker keeps running jobs until asked to stop, and survives errors"""
+        stop = threading.Event()
+        calls = []
+
+        def fake_run_next_job(worker):
+            calls.append(worker)
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+            if len(calls) == 3:
+                stop.set()
+            return len(calls)
+
+        with patch('app_quiz.api.jobs.run_next_job', side_effect=fake_run_next_job):
+            run_worker("host:1", stop)
+
+        self.assertEqual(calls, ["host:1"] * 3)
+
+    @override_settings(QUIZ_RUN_JOBS_IN_PROCESS=False)
+    def test_enqueue_leaves_jobs_to_workers(self):
+        """Test that web processes don't run jobs when dedicated workers are used"""
+        job = self.create_job()
+
+        with patch('app_quiz.api.jobs.get_executor') as get_executor:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                enqueue_job(job)
+
+        self.assertEqual(callbacks, [])
+        get_executor.assert_not_called()
+
+
+@override_settings(QUIZ_RUN_JOBS_IN_PROCESS=True, QUIZ_JOB_MAX_WORKERS=2)
+class DispatchQueuedJobsTests(WorkerTestCase):
+    def test_dispatch_after_restart(self):
+        """Test that queued and requeued jobs get claimers without new submissions, up to the free workers"""
+        now = timezone.now()
+        self.create_job()
+        self.create_job(
+            status=QuizGenerationJob.Status.DOWNLOADING, started_at=now - timedelta(minutes=5),
+            worker="gone:1", lease_expires_at=now - timedelta(seconds=1))
+        self.create_job()
+
+        with patch('app_quiz.api.jobs._claimers', 0), patch('app_quiz.api.jobs.get_executor') as get_executor:
+            self.assertEqual(dispatch_queued_jobs(), 2)
+            # Both workers have a claimer now
+            self.assertEqual(dispatch_queued_jobs(), 0)
+
+        self.assertEqual(get_executor.return_value.submit.call_count, 2)
+        self.assertEqual(QuizGenerationJob.objects.filter(status=QuizGenerationJob.Status.QUEUED).count(), 3)
+
+    @override_settings(QUIZ_RUN_JOBS_IN_PROCESS=False)
+    def test_no_dispatcher_with_dedicated_workers(self):
+        """Test that web processes start no dispatcher when run_quiz_workers processes the queue"""
+        with patch('app_quiz.api.jobs.threading.Thread') as thread:
+            start_job_dispatcher()
+
+        thread.assert_not_called()
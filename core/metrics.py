@@ -0,0 +1,244 @@
+"""
+Minimal Prometheus-style metrics shared by all apps.
+
+Metrics live in plain dicts of the current process, so recording a value costs
+a lock and a dict update. When settings.METRICS_DIR is set, every process
+periodically writes a snapshot to METRICS_DIR/metrics-<pid>.json and the
+/metrics endpoint adds up the snapshots of all processes (web workers, job
+workers), so counters stay correct no matter which process served a request.
+"""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        self._registry = registry or REGISTRY
+        self._registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): self._copy(value) for key, value in self._values.items()}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def _copy(self, value):
+        return value
+
+
+class Counter(Metric):
+    """Monotonically increasing count, e.g. requests or failures."""
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self._registry.touch()
+
+
+class Histogram(Metric):
+    """Distribution of observed values, e.g. latencies, in cumulative buckets."""
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            entry["buckets"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+        self._registry.touch()
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _copy(self, value):
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+
+class Registry:
+    """
+    Knows all metrics of the process and renders the combined exposition text.
+
+    Collectors are callables returning gauge samples computed at scrape time,
+    as (name, documentation, [(labels_dict, value), ...]) tuples.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self):
+        return {
+            name: {
+                "type": metric.type,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", [])),
+                "samples": metric.snapshot(),
+            }
+            for name, metric in self._metrics.items()
+        }
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def touch(self):
+        # Start the background writer lazily, once per process (again after a fork)
+        if not settings.METRICS_DIR or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True).start()
+
+    def flush(self):
+        """
+        Write this process' snapshot to settings.METRICS_DIR, atomically.
+        """
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f"metrics-{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            self.flush()
+
+    def collect(self):
+        """
+        Merge the snapshots of all processes with this process' live values.
+        """
+        combined = {}
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR:
+            own = os.path.join(settings.METRICS_DIR, f"metrics-{os.getpid()}.json")
+            for path in glob.glob(os.path.join(settings.METRICS_DIR, "metrics-*.json")):
+                if path == own:
+                    continue
+                try:
+                    with open(path) as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue  # Being replaced right now; picked up on the next scrape
+
+        for snapshot in snapshots:
+            for name, metric in snapshot.items():
+                target = combined.setdefault(name, {**metric, "samples": {}})
+                for key, value in metric["samples"].items():
+                    current = target["samples"].get(key)
+                    if metric["type"] == "counter":
+                        target["samples"][key] = (current or 0) + value
+                    elif current is None:
+                        target["samples"][key] = {**value, "buckets": list(value["buckets"])}
+                    else:
+                        current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                        current["sum"] += value["sum"]
+                        current["count"] += value["count"]
+        return combined
+
+    def render(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name, metric in sorted(self.collect().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["samples"].items()):
+                labels = dict(zip(metric["labelnames"], json.loads(key)))
+                if metric["type"] == "counter":
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip([*metric["buckets"], "+Inf"], value["buckets"]):
+                    cumulative += count
+                    bucket_labels = format_labels({**labels, "le": bound if bound == "+Inf" else format_value(bound)})
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(value['sum'])}")
+                lines.append(f"{name}_count{format_labels(labels)} {value['count']}")
+
+        for collector in list(self._collectors):
+            name, documentation, samples = collector()
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + "}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+# A forked child starts with a copy of the parent's values; drop them so nothing is counted twice
+os.register_at_fork(after_in_child=REGISTRY.reset)
+atexit.register(REGISTRY.flush)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -63,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -101,6 +103,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Web and worker processes write concurrently: readers shouldn't wait for writers,
+        # and write transactions take the lock up front instead of failing on upgrade
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;',
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -160,3 +169,91 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+
+# Whisper transcription
+WHISPER_MODEL_NAME = 'tiny'
+WHISPER_DEVICE = None  # None lets Whisper pick CUDA when available
+WHISPER_PRELOAD_MODELS = []  # e.g. ['tiny'] to load models when the app starts
+WHISPER_MODEL_IDLE_TIMEOUT = 30 * 60  # seconds; None keeps loaded models forever
+WHISPER_CPU_PROFILE = False  # CPU-only nodes: load models on CPU with the tuning below
+WHISPER_CPU_QUANTIZE = True  # int8 dynamic quantization of the Linear layers (CPU profile only)
+WHISPER_CPU_THREADS = None  # torch intra-op threads per process; None divides the cores by concurrent jobs
+WHISPER_CPU_INTEROP_THREADS = 1  # torch inter-op threads per process
+WHISPER_STREAMING = True  # pipe downloaded audio straight into ffmpeg instead of writing a file first
+WHISPER_PARALLEL_WORKERS = 0  # >1 transcribes long audio in chunks on a process pool of this size
+WHISPER_CHUNK_SECONDS = 5 * 60  # nominal chunk length for parallel transcription
+WHISPER_CHUNK_SEARCH_SECONDS = 10  # look this far around each nominal cut for a pause
+WHISPER_CHUNK_OVERLAP_SECONDS = 2  # context shared between neighbouring chunks
+WHISPER_ESCALATION_MODEL = None  # e.g. 'small' to re-transcribe low-confidence segments with a larger model
+WHISPER_ESCALATION_LOGPROB_THRESHOLD = -0.8  # segments with a lower avg_logprob are escalated
+WHISPER_ESCALATION_NO_SPEECH_THRESHOLD = 0.6  # ...unless they are probably silence or music
+WHISPER_ESCALATION_MERGE_GAP_SECONDS = 1.0  # weak segments closer than this are re-transcribed together
+WHISPER_ESCALATION_PADDING_SECONDS = 0.5  # context added around each escalated region
+WHISPER_STREAM_SEGMENTS = True  # transcribe in windows and report segments while the rest is still running
+WHISPER_STREAM_FIRST_CHUNK_SECONDS = 30  # short first window, so the first text arrives within seconds
+WHISPER_VAD_ENABLED = False  # skip silence and music beds before transcription
+WHISPER_VAD_MIN_SILENCE_SECONDS = 1.0  # shorter pauses stay inside a speech region
+CAPTIONS_ENABLED = True  # use existing YouTube captions instead of Whisper when acceptable
+CAPTIONS_ALLOW_AUTOMATIC = True  # accept YouTube's auto-generated captions in the original language
+CAPTIONS_MIN_WORDS_PER_MINUTE = 40  # sparser tracks are treated as incomplete and rejected
+QUIZ_SCRATCH_DIR = None  # parent of per-job scratch dirs, e.g. '/dev/shm'; None uses the system temp dir
+
+# Transcript cache (keyed by YouTube video id, model and language)
+TRANSCRIPT_CACHE_MAX_BYTES = 200 * 1024 * 1024  # total transcript text kept
+TRANSCRIPT_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds; None keeps transcripts forever
+
+# Question generation
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+GEMINI_MODEL = 'gemini-2.5-flash'
+GEMINI_TIMEOUT_SECONDS = 120  # per request
+GEMINI_RETRIES = 3  # attempts per request, for rate limits and server errors
+QUIZ_QUESTION_BACKEND = 'gemini'  # 'local': offline stand-in, set explicitly for tests and load tests
+QUIZ_QUESTION_COUNT = 10  # questions per quiz
+QUIZ_QUESTION_OPTIONS = 4  # answer options per question
+QUIZ_QUESTION_CHUNK_TOKENS = 6000  # longer transcripts are split and their parts sent concurrently
+QUIZ_QUESTION_OVERSAMPLE = 1.5  # candidate questions requested per final question when split
+QUIZ_QUESTION_MAX_CONCURRENCY = 4  # LLM requests in flight per process
+QUIZ_TOKEN_ENCODING = 'cl100k_base'  # tiktoken encoding used to measure transcripts
+QUIZ_CONDENSE_ENABLED = True  # drop fillers, repeats and sponsor reads before question generation
+QUIZ_CONDENSE_TOKEN_BUDGET = 24000  # keep the most salient sentences up to this many tokens; None keeps all
+QUIZ_LOCAL_BACKEND_LATENCY_SECONDS = 0  # simulated LLM latency of the local backend
+QUESTION_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds; None keeps generated questions forever
+
+# Background quiz generation
+QUIZ_JOB_MAX_WORKERS = 2  # concurrent download/transcription jobs per process
+QUIZ_RUN_JOBS_IN_PROCESS = True  # False when `manage.py run_quiz_workers` processes the queue
+QUIZ_JOB_DISPATCH_SECONDS = 10  # in-process mode: how often queued and requeued jobs are picked up
+QUIZ_WORKER_POLL_SECONDS = 1.0  # how often idle workers look for queued jobs
+QUIZ_JOB_LEASE_SECONDS = 60  # a job whose worker stops renewing its lease this long is queued again
+QUIZ_MAX_ACTIVE_JOBS_PER_USER = 3  # queued or running jobs per user before new requests get a 429
+QUIZ_MAX_ACTIVE_JOBS = 2 * (os.cpu_count() or 1)  # queued or running jobs overall; transcription is CPU-bound
+QUIZ_JOB_OVERHEAD_SECONDS = 15  # download and setup time per job, for scheduling and Retry-After estimates
+QUIZ_SCHEDULER_AGING_RATE = 0.5  # expected seconds of work forgiven per second a job waits
+QUIZ_BATCH_MAX_VIDEOS = 50  # videos per batch request, also caps playlist expansion
+QUIZ_MAX_ACTIVE_BATCH_JOBS_PER_USER = QUIZ_BATCH_MAX_VIDEOS  # queued or running batch jobs per user
+QUIZ_PROBE_MAX_CONCURRENCY = 8  # metadata probes in flight per process for batch requests
+QUIZ_DOWNLOAD_PROGRESS_INTERVAL = 1.0  # seconds between download progress events
+QUIZ_EVENTS_POLL_SECONDS = 0.5  # how often the event stream checks for new job events
+QUIZ_EVENTS_HEARTBEAT_SECONDS = 15  # keep-alive comments so proxies don't close idle streams
+QUIZ_EVENTS_FLUSH_SECONDS = 2.0  # progress events are written at most this often; segments in between are merged
+QUIZ_EVENTS_RETENTION_SECONDS = 60 * 60  # events of finished jobs are deleted after this long
+QUIZ_CANCEL_POLL_SECONDS = 1.0  # how quickly running jobs notice a cancellation
+QUIZ_JOB_STALE_SECONDS = 15 * 60  # started jobs without progress or lease for this long count as interrupted
+QUIZ_DOWNLOAD_RETRIES = 4  # attempts for metadata and media requests failing with transient errors
+QUIZ_DOWNLOAD_RETRY_BACKOFF_SECONDS = 2  # first retry delay, doubled per attempt
+QUIZ_DOWNLOAD_RETRY_MAX_BACKOFF_SECONDS = 30
+
+# Admission limits checked against video metadata before anything is downloaded
+QUIZ_MAX_VIDEO_SECONDS = 2 * 60 * 60
+QUIZ_MAX_AUDIO_BYTES = 200 * 1024 * 1024
+QUIZ_TRANSCRIPTION_BUDGET_SECONDS = 60  # target transcription time used to pick the model size
+WHISPER_MODEL_REALTIME_FACTORS = {  # processing seconds per audio second, most accurate model first
+    'base': 0.12,
+    'tiny': 0.05,
+}
+
+# Metrics exposed on /metrics
+METRICS_DIR = None  # shared directory for per-process snapshots; set it when running several processes
+METRICS_FLUSH_SECONDS = 5  # how often each process writes its snapshot
+METRICS_TOKEN = None  # bearer token required for /metrics, None leaves it open
+METRICS_VIEW_MODULES = ['app_quiz.api.views', 'app_auth.api.views']  # views whose latency is recorded
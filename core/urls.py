@@ -21,6 +21,8 @@ from django.conf.urls.static import static
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+from .views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('app_auth.api.urls')),
@@ -30,6 +32,9 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
     path("api/schema/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+
+    # Prometheus scrape endpoint
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
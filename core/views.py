@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .metrics import REGISTRY
+
+
+@require_GET
+def metrics(request):
+    """
+    Expose all metrics in the Prometheus text format.
+
+    When settings.METRICS_TOKEN is set, scrapers have to send it as a bearer token.
+    """
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not constant_time_compare(request.headers.get("Authorization", ""), expected):
+            return HttpResponseForbidden()
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
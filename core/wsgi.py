@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Jobs left queued by the previous process, or whose lease expired, run without waiting for new submissions
+from app_quiz.api.jobs import start_job_dispatcher  # noqa: E402
+
+start_job_dispatcher()